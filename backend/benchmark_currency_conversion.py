@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+"""
+Compare scalar and bulk currency conversion.
+
+Converts N random amounts (random source currencies and dates over the last
+year) into one reporting currency twice: with CurrencyConverter.convert_amount
+per amount, and with one CurrencyConverter.convert_many call. Checks that both
+give identical Decimals and reports the time for each.
+
+Rates come from the database (exchange_rates). With --synthetic the
+benchmark generates daily rates in memory instead, so it runs without data.
+
+Usage:
+    python benchmark_currency_conversion.py [--amounts 10000] [--to GBP]
+                                            [--runs 3] [--synthetic]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BACKEND_DIR)
+os.environ["DJANGO_SETTINGS_MODULE"] = "grandgold_settings"
+
+SYNTHETIC_CURRENCIES = {"GBP": Decimal("1"), "AED": Decimal("4.67"), "INR": Decimal("105.3"), "USD": Decimal("1.27")}
+
+
+def synthetic_matrix(days):
+    """Daily GBP -> X rates with a small random walk"""
+    from django.utils import timezone
+    from saleor_extensions.currency.rates import RateMatrix
+
+    start = timezone.now() - timedelta(days=days)
+    pairs = {}
+    for code, rate in SYNTHETIC_CURRENCIES.items():
+        if code == "GBP":
+            continue
+        dates, rates = pairs.setdefault(("GBP", code), ([], []))
+        for day in range(days + 1):
+            rate = (rate * Decimal(str(1 + random.uniform(-0.005, 0.005)))).quantize(Decimal("0.00000001"))
+            dates.append(start + timedelta(days=day))
+            rates.append(rate)
+    return RateMatrix("synthetic", pairs, base="GBP")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--amounts", type=int, default=10000)
+    parser.add_argument("--to", default="GBP", help="Reporting currency")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--synthetic", action="store_true", help="Use generated rates instead of the database")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        # Keep the installed matrix for the whole run
+        os.environ["CURRENCY_RATE_CHECK_INTERVAL"] = str(10**9)
+
+    import django
+
+    django.setup()
+    from django.utils import timezone
+    from saleor_extensions.currency import rates
+    from saleor_extensions.currency.services import CurrencyConverter
+
+    random.seed(args.seed)
+    if args.synthetic:
+        rates._matrix = synthetic_matrix(365)
+        rates._checked_at = time.monotonic()
+    matrix = rates.get_matrix()
+    codes = sorted({code for pair in matrix.pairs for code in pair}) or [args.to]
+    print(f"{len(matrix.pairs)} currency pairs, {sum(len(d) for d, _ in matrix.pairs.values())} rates, codes {codes}")
+
+    now = timezone.now()
+    amounts = [Decimal(random.randint(100, 10_000_000)) / 100 for _ in range(args.amounts)]
+    sources = [random.choice(codes) for _ in range(args.amounts)]
+    dates = [now - timedelta(days=random.uniform(0, 365)) for _ in range(args.amounts)]
+
+    scalar_times, bulk_times = [], []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        scalar = [
+            CurrencyConverter.convert_amount(amount, source, args.to, when)
+            for amount, source, when in zip(amounts, sources, dates)
+        ]
+        scalar_times.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        bulk = CurrencyConverter.convert_many(amounts, sources, args.to, dates)
+        bulk_times.append(time.perf_counter() - started)
+
+        if bulk != scalar:
+            mismatches = sum(1 for a, b in zip(bulk, scalar) if a != b)
+            raise SystemExit(f"convert_many disagrees with convert_amount on {mismatches} amounts")
+
+    scalar_best, bulk_best = min(scalar_times), min(bulk_times)
+    print(f"convert_amount x{args.amounts}: {scalar_best * 1000:.1f}ms ({scalar_best / args.amounts * 1e6:.2f}us/amount)")
+    print(f"convert_many   x{args.amounts}: {bulk_best * 1000:.1f}ms ({bulk_best / args.amounts * 1e6:.2f}us/amount)")
+    print(f"speed-up: {scalar_best / bulk_best:.1f}x, {sum(value is None for value in bulk)} amounts without a rate")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+"""
+Compare request latency with and without database connection reuse.
+
+Each mode runs in a fresh interpreter with its own settings environment. A
+thread pool (like gunicorn gthread workers) sends GraphQL requests through the
+real WSGI handler, so Django opens and closes connections exactly as it does
+in production (close_old_connections on request start and finish). Reports
+p50/p90/p99 latency and throughput per mode.
+
+Modes:
+    fresh       DB_CONN_MAX_AGE=0, a new connection per request (old default)
+    persistent  DB_CONN_MAX_AGE=60 with health checks
+    pool        DB_POOL=1, psycopg 3 pool (skipped if psycopg_pool is missing)
+
+Needs DATABASE_URL. Point it at PgBouncer and pass --pgbouncer to measure
+transaction pooling mode.
+
+Usage:
+    python benchmark_db_connections.py [--requests 500] [--concurrency 8]
+                                       [--modes fresh,persistent,pool]
+                                       [--query "{ branches { id } }"]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+MODES = {
+    "fresh": {"DB_CONN_MAX_AGE": "0", "DB_POOL": "0"},
+    "persistent": {"DB_CONN_MAX_AGE": "60", "DB_POOL": "0"},
+    "pool": {"DB_CONN_MAX_AGE": "0", "DB_POOL": "1"},
+}
+
+LOAD_SNIPPET = r"""
+import io, json, sys, time
+from concurrent.futures import ThreadPoolExecutor
+from wsgiref.util import setup_testing_defaults
+
+import grandgold_wsgi
+from django.conf import settings
+
+if sys.argv[4] == "pool" and not settings.DB_POOL:
+    print("BENCHMARK " + json.dumps({"skipped": "psycopg_pool is not installed"}))
+    sys.exit(0)
+
+application = grandgold_wsgi.application
+body = json.dumps({"query": sys.argv[3]}).encode("utf-8")
+
+
+def request():
+    environ = {
+        "REQUEST_METHOD": "POST",
+        "PATH_INFO": "/graphql/",
+        "CONTENT_TYPE": "application/json",
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.input": io.BytesIO(body),
+    }
+    setup_testing_defaults(environ)
+    status = {}
+
+    def start_response(code, headers, exc_info=None):
+        status["code"] = code
+
+    started = time.perf_counter()
+    response = application(environ, start_response)
+    b"".join(response)
+    response.close()  # fires request_finished, as a WSGI server would
+    return time.perf_counter() - started, status.get("code", "")
+
+
+requests, concurrency = int(sys.argv[1]), int(sys.argv[2])
+with ThreadPoolExecutor(concurrency) as pool:
+    # Warm-up: schema, document cache, first connections
+    list(pool.map(lambda _: request(), range(concurrency)))
+    started = time.perf_counter()
+    results = list(pool.map(lambda _: request(), range(requests)))
+    elapsed = time.perf_counter() - started
+
+print("BENCHMARK " + json.dumps({
+    "latencies": [latency for latency, _ in results],
+    "errors": sum(1 for _, code in results if not code.startswith("200")),
+    "elapsed": elapsed,
+}))
+"""
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_mode(mode, args):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE="grandgold_settings", **MODES[mode])
+    if args.pgbouncer:
+        env["DB_PGBOUNCER"] = "1"
+    result = subprocess.run(
+        [sys.executable, "-c", LOAD_SNIPPET, str(args.requests), str(args.concurrency), args.query, mode],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    for line in result.stdout.splitlines():
+        if line.startswith("BENCHMARK "):
+            return json.loads(line[len("BENCHMARK "):])
+    raise RuntimeError(f"{mode} run failed (exit {result.returncode}):\n{result.stderr[-2000:]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--modes", default="fresh,persistent,pool")
+    parser.add_argument("--query", default="{ branches { id name } }")
+    parser.add_argument("--pgbouncer", action="store_true", help="Set DB_PGBOUNCER=1 for every mode")
+    args = parser.parse_args()
+
+    if "DATABASE_URL" not in os.environ:
+        parser.error("DATABASE_URL must be set")
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}, query {args.query!r}")
+    for mode in args.modes.split(","):
+        sample = run_mode(mode.strip(), args)
+        if "skipped" in sample:
+            print(f"{mode:>10}: skipped ({sample['skipped']})")
+            continue
+        latencies = [value * 1000 for value in sample["latencies"]]
+        print(
+            f"{mode:>10}: p50 {percentile(latencies, 0.50):7.1f}ms  "
+            f"p90 {percentile(latencies, 0.90):7.1f}ms  "
+            f"p99 {percentile(latencies, 0.99):7.1f}ms  "
+            f"{len(latencies) / sample['elapsed']:7.1f} req/s  "
+            f"({sample['errors']} errors)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+"""
+Measure time-to-first-request for a fresh worker process.
+
+Each run starts a new interpreter, as a gunicorn worker would without
+preloading. It imports the WSGI module and serves one request through the
+WSGI callable. Import time and first-request time are reported separately,
+so regressions in module-level work (schema assembly, DB repair) show up.
+
+Usage:
+    python benchmark_worker_startup.py [--runs 5] [--module grandgold_wsgi]
+                                       [--path /graphql/] [--query "{ __typename }"]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+WORKER_SNIPPET = r"""
+import io, json, sys, time
+started = time.perf_counter()
+module = __import__(sys.argv[1])
+imported = time.perf_counter()
+
+from wsgiref.util import setup_testing_defaults
+body = json.dumps({"query": sys.argv[3]}).encode("utf-8")
+environ = {
+    "REQUEST_METHOD": "POST" if sys.argv[2].startswith("/graphql") else "GET",
+    "PATH_INFO": sys.argv[2],
+    "CONTENT_TYPE": "application/json",
+    "CONTENT_LENGTH": str(len(body)),
+    "wsgi.input": io.BytesIO(body),
+}
+setup_testing_defaults(environ)
+status = {}
+def start_response(code, headers, exc_info=None):
+    status["code"] = code
+b"".join(module.application(environ, start_response))
+served = time.perf_counter()
+print("BENCHMARK " + json.dumps({
+    "import_s": imported - started,
+    "first_request_s": served - imported,
+    "status": status.get("code"),
+}))
+"""
+
+
+def run_worker(module, path, query):
+    result = subprocess.run(
+        [sys.executable, "-c", WORKER_SNIPPET, module, path, query],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    for line in result.stdout.splitlines():
+        if line.startswith("BENCHMARK "):
+            return json.loads(line[len("BENCHMARK "):])
+    raise RuntimeError(f"Worker failed (exit {result.returncode}):\n{result.stderr[-2000:]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--module", default="grandgold_wsgi")
+    parser.add_argument("--path", default="/graphql/")
+    parser.add_argument("--query", default="{ __typename }")
+    args = parser.parse_args()
+
+    samples = []
+    for index in range(args.runs):
+        sample = run_worker(args.module, args.path, args.query)
+        samples.append(sample)
+        print(
+            f"run {index + 1}: import {sample['import_s']:.3f}s, "
+            f"first request {sample['first_request_s']:.3f}s ({sample['status']})"
+        )
+
+    for key in ("import_s", "first_request_s"):
+        values = [sample[key] for sample in samples]
+        print(f"{key}: median {statistics.median(values):.3f}s, max {max(values):.3f}s")
+    totals = [sample["import_s"] + sample["first_request_s"] for sample in samples]
+    print(f"time to first request: median {statistics.median(totals):.3f}s")
+
+
+if __name__ == "__main__":
+    main()
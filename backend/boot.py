@@ -0,0 +1,74 @@
+"""
+Process bootstrap helpers shared by the WSGI entrypoints, the GraphQL schema
+module, the release command and the gunicorn config.
+
+Stdlib only and safe to import before Django is configured.
+"""
+
+import glob
+import os
+
+# Shared libraries Saleor's optional dependencies need at import time:
+# python-magic (libmagic) and grpc (libstdc++).
+NIX_LIBRARIES = ("libmagic.so*", "libstdc++.so.6")
+_RESOLVED_FLAG = "GG_LIBRARY_PATH_RESOLVED"
+
+
+def _library_on_path(pattern, ld_path):
+    for directory in filter(None, ld_path.split(":")):
+        if glob.glob(os.path.join(directory, pattern)):
+            return True
+    return False
+
+
+def ensure_library_path():
+    """
+    Add Nix store directories for NIX_LIBRARIES to LD_LIBRARY_PATH.
+
+    Replaces `find /nix/store ...` subprocesses: the start command usually sets
+    LD_LIBRARY_PATH already, in which case this only checks the listed
+    directories. Otherwise it globs /nix/store/*/lib once per library. The
+    result is recorded in the environment, so child processes and later
+    callers skip the work.
+    """
+    if os.environ.get(_RESOLVED_FLAG) == "1":
+        return os.environ.get("LD_LIBRARY_PATH", "")
+
+    ld_path = os.environ.get("LD_LIBRARY_PATH", "")
+    for pattern in NIX_LIBRARIES:
+        if _library_on_path(pattern, ld_path):
+            continue
+        matches = glob.glob(os.path.join("/nix/store", "*", "lib", pattern))
+        if matches:
+            directory = os.path.dirname(sorted(matches)[0])
+            ld_path = f"{ld_path}:{directory}" if ld_path else directory
+
+    if ld_path:
+        os.environ["LD_LIBRARY_PATH"] = ld_path
+    os.environ[_RESOLVED_FLAG] = "1"
+    return ld_path
+
+
+def memory_usage(pid="self"):
+    """
+    Memory of a process in bytes, from /proc/<pid>/smaps_rollup (Linux only)
+
+    Returns {'rss', 'pss', 'shared', 'private'}; shared pages are those still
+    shared with other processes (e.g. copy-on-write pages inherited from the
+    gunicorn master). Empty dict where smaps_rollup is unavailable.
+    """
+    values = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 3 and parts[0].endswith(":") and parts[2] == "kB":
+                    values[parts[0][:-1]] = int(parts[1]) * 1024
+    except (OSError, ValueError):
+        return {}
+    return {
+        "rss": values.get("Rss", 0),
+        "pss": values.get("Pss", 0),
+        "shared": values.get("Shared_Clean", 0) + values.get("Shared_Dirty", 0),
+        "private": values.get("Private_Clean", 0) + values.get("Private_Dirty", 0),
+    }
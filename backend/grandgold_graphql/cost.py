@@ -0,0 +1,281 @@
+"""
+Static cost and depth analysis for GraphQL operations.
+
+Runs on the validated document before execution. Every object a field can
+return costs 1 (scalars cost 0) unless overridden per field, plus the cost of
+its own selections; list fields multiply that by the number of items they can
+return. That multiplier comes from a `first`/`last`/`limit` argument (or its
+default value), from GRAPHQL_LIST_SIZES for unbounded list fields, or
+GRAPHQL_DEFAULT_LIST_SIZE otherwise. Introspection fields cost nothing but
+still count towards the depth.
+
+Settings:
+    GRAPHQL_MAX_QUERY_COST: Reject operations estimated above this (default 5000)
+    GRAPHQL_MAX_QUERY_DEPTH: Reject operations nested deeper than this (default 15,
+        always enforced)
+    GRAPHQL_DEFAULT_LIST_SIZE: Assumed length of unbounded lists (default 100)
+    GRAPHQL_LIST_SIZES: Per-field list length overrides, e.g. {'Query.branches': 50}
+    GRAPHQL_FIELD_COSTS: Per-field cost overrides, e.g. {'Query.dashboardKpis': 10}
+    GRAPHQL_COST_RATE_LIMIT: Cost points each client may spend per minute
+        (default 0, disabled)
+    GRAPHQL_COST_ENFORCE: Reject operations over GRAPHQL_MAX_QUERY_COST or the
+        rate limit; when False costs are only reported (default False)
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from graphql.language import ast
+from graphql.type.definition import GraphQLList, GraphQLNonNull, GraphQLObjectType, GraphQLInterfaceType
+
+PAGINATION_ARGUMENTS = ("first", "last", "limit")
+RATE_LIMIT_WINDOW = 60
+RATE_LIMIT_KEY_PREFIX = "graphql:cost:v1"
+
+DEFAULT_MAX_QUERY_COST = 5000
+DEFAULT_MAX_QUERY_DEPTH = 15
+DEFAULT_LIST_SIZE = 100
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _unwrap(graphql_type):
+    """Return ``(named_type, is_list)`` for a possibly wrapped output type."""
+    is_list = False
+    while isinstance(graphql_type, (GraphQLNonNull, GraphQLList)):
+        if isinstance(graphql_type, GraphQLList):
+            is_list = True
+        graphql_type = graphql_type.of_type
+    return graphql_type, is_list
+
+
+def _value(node, variables):
+    if isinstance(node, ast.Variable):
+        return variables.get(node.name.value)
+    if isinstance(node, ast.IntValue):
+        return int(node.value)
+    return None
+
+
+def _selection_depth(selection_set, fragments, seen_fragments=frozenset()):
+    """Nesting depth below a field, from the document alone (for introspection fields)."""
+    if selection_set is None:
+        return 0
+    deepest = 0
+    for selection in selection_set.selections:
+        if isinstance(selection, ast.Field):
+            deepest = max(deepest, 1 + _selection_depth(selection.selection_set, fragments, seen_fragments))
+        elif isinstance(selection, ast.InlineFragment):
+            deepest = max(deepest, _selection_depth(selection.selection_set, fragments, seen_fragments))
+        elif isinstance(selection, ast.FragmentSpread):
+            name = selection.name.value
+            fragment = fragments.get(name)
+            if fragment is not None and name not in seen_fragments:
+                deepest = max(
+                    deepest, _selection_depth(fragment.selection_set, fragments, seen_fragments | {name})
+                )
+    return deepest
+
+
+class CostAnalysis:
+    """Estimated cost and depth of one operation."""
+
+    def __init__(self, schema, document, variables=None, operation_name=None):
+        self.schema = schema
+        self.variables = dict(variables or {})
+        self.fragments = {}
+        self.operation = None
+        for definition in document.definitions:
+            if isinstance(definition, ast.FragmentDefinition):
+                self.fragments[definition.name.value] = definition
+            elif isinstance(definition, ast.OperationDefinition):
+                if operation_name is None or (definition.name and definition.name.value == operation_name):
+                    self.operation = self.operation or definition
+
+        self.field_costs = _setting("GRAPHQL_FIELD_COSTS", {}) or {}
+        self.list_sizes = _setting("GRAPHQL_LIST_SIZES", {}) or {}
+        self.default_list_size = _setting("GRAPHQL_DEFAULT_LIST_SIZE", DEFAULT_LIST_SIZE)
+        self.cost = 0
+        self.depth = 0
+        if self.operation is not None:
+            self._apply_variable_defaults()
+            root = {
+                "query": schema.get_query_type(),
+                "mutation": schema.get_mutation_type(),
+                "subscription": schema.get_subscription_type(),
+            }.get(self.operation.operation)
+            if root is not None:
+                self.cost = self._selection_cost(root, self.operation.selection_set, 1, None)
+
+    def _apply_variable_defaults(self):
+        for definition in self.operation.variable_definitions or []:
+            name = definition.variable.name.value
+            if self.variables.get(name) is None and isinstance(definition.default_value, ast.IntValue):
+                self.variables[name] = int(definition.default_value.value)
+
+    def _fields(self, parent_type, selection_set, seen_fragments):
+        """Flatten fields selected on ``parent_type``, expanding fragments."""
+        for selection in selection_set.selections:
+            if isinstance(selection, ast.Field):
+                yield parent_type, selection
+            elif isinstance(selection, ast.InlineFragment):
+                fragment_type = parent_type
+                if selection.type_condition is not None:
+                    fragment_type = self.schema.get_type(selection.type_condition.name.value) or parent_type
+                yield from self._fields(fragment_type, selection.selection_set, seen_fragments)
+            elif isinstance(selection, ast.FragmentSpread):
+                name = selection.name.value
+                fragment = self.fragments.get(name)
+                if fragment is None or name in seen_fragments:
+                    continue
+                fragment_type = self.schema.get_type(fragment.type_condition.name.value) or parent_type
+                yield from self._fields(fragment_type, fragment.selection_set, seen_fragments | {name})
+
+    def _page_size(self, field_node, field_def):
+        provided = {argument.name.value: argument.value for argument in field_node.arguments or []}
+        for name in PAGINATION_ARGUMENTS:
+            if name in provided:
+                value = _value(provided[name], self.variables)
+            elif field_def is not None and name in field_def.args:
+                value = field_def.args[name].default_value
+            else:
+                continue
+            if isinstance(value, int) and value >= 0:
+                return value
+        return None
+
+    def _selection_cost(self, parent_type, selection_set, depth, page_size):
+        """
+        Cost of a selection set, per parent item.
+
+        ``page_size`` is a pagination argument taken by the parent field (a
+        Relay connection's ``first``) that bounds the lists selected below it.
+        """
+        self.depth = max(self.depth, depth)
+        total = 0
+        for field_parent, field_node in self._fields(parent_type, selection_set, frozenset()):
+            name = field_node.name.value
+            if name.startswith("__"):
+                self.depth = max(self.depth, depth + _selection_depth(field_node.selection_set, self.fragments))
+                continue
+            fields = getattr(field_parent, "fields", None) or {}
+            field_def = fields.get(name) if isinstance(field_parent, (GraphQLObjectType, GraphQLInterfaceType)) else None
+            if field_def is None:
+                continue
+
+            field_type, is_list = _unwrap(field_def.type)
+            key = f"{field_parent.name}.{name}"
+            has_children = field_node.selection_set is not None
+            cost = self.field_costs.get(key, 1 if has_children else 0)
+
+            own_page_size = self._page_size(field_node, field_def)
+            if is_list:
+                multiplier = own_page_size if own_page_size is not None else page_size
+                if multiplier is None:
+                    multiplier = self.list_sizes.get(key, self.default_list_size)
+                child_page_size = None
+            else:
+                multiplier = 1
+                child_page_size = own_page_size
+
+            if has_children:
+                cost += self._selection_cost(field_type, field_node.selection_set, depth + 1, child_page_size)
+            total += multiplier * cost
+        return total
+
+
+def analyse(schema, document, variables=None, operation_name=None):
+    return CostAnalysis(schema, document, variables, operation_name)
+
+
+def _client_key(context):
+    user = getattr(context, "user", None)
+    if user is not None and getattr(user, "is_authenticated", False):
+        return f"user:{user.pk}"
+    request = getattr(context, "request", None)
+    meta = getattr(request, "META", {}) or {}
+    # The rightmost hop is the one appended by our own proxy; anything left of
+    # it is client-supplied and can be varied to dodge the budget.
+    forwarded = meta.get("HTTP_X_FORWARDED_FOR", "")
+    return "ip:" + (forwarded.split(",")[-1].strip() or meta.get("REMOTE_ADDR", "unknown"))
+
+
+def spend(context, cost):
+    """
+    Charge ``cost`` to the caller's per-minute budget.
+
+    Returns ``(spent, limit)`` for the current window; ``limit`` is 0 when
+    throttling is disabled.
+    """
+    limit = _setting("GRAPHQL_COST_RATE_LIMIT", 0)
+    if not limit:
+        return 0, 0
+    window = int(time.time() // RATE_LIMIT_WINDOW)
+    key = f"{RATE_LIMIT_KEY_PREFIX}:{_client_key(context)}:{window}"
+    if cache.add(key, cost, RATE_LIMIT_WINDOW * 2):
+        return cost, limit
+    try:
+        return cache.incr(key, cost), limit
+    except ValueError:
+        cache.set(key, cost, RATE_LIMIT_WINDOW * 2)
+        return cost, limit
+
+
+def _depth_violation(depth, max_depth):
+    if depth > max_depth:
+        return "QUERY_TOO_DEEP", f"Query depth {depth} exceeds the maximum of {max_depth}", 400
+    return None
+
+
+def check_depth(schema, document, operation_name=None):
+    """
+    Enforce only GRAPHQL_MAX_QUERY_DEPTH (used for introspection queries).
+
+    Returns None or ``(code, message, status)``.
+    """
+    analysis = analyse(schema, document, None, operation_name)
+    return _depth_violation(analysis.depth, _setting("GRAPHQL_MAX_QUERY_DEPTH", DEFAULT_MAX_QUERY_DEPTH))
+
+
+def check(schema, document, context, variables=None, operation_name=None):
+    """
+    Analyse an operation and enforce the configured limits.
+
+    Returns ``(extensions, violation)``: ``extensions`` is reported on the
+    response; ``violation`` is None or ``(code, message, status)``.
+    """
+    analysis = analyse(schema, document, variables, operation_name)
+    max_cost = _setting("GRAPHQL_MAX_QUERY_COST", DEFAULT_MAX_QUERY_COST)
+    max_depth = _setting("GRAPHQL_MAX_QUERY_DEPTH", DEFAULT_MAX_QUERY_DEPTH)
+    extensions = {
+        "requestedQueryCost": analysis.cost,
+        "maximumAvailable": max_cost,
+        "depth": analysis.depth,
+        "maximumDepth": max_depth,
+    }
+    violation = _depth_violation(analysis.depth, max_depth)
+    if violation is not None:
+        return extensions, violation
+    if not _setting("GRAPHQL_COST_ENFORCE", False):
+        return extensions, None
+
+    if analysis.cost > max_cost:
+        return extensions, (
+            "QUERY_TOO_COMPLEX",
+            f"Query cost {analysis.cost} exceeds the maximum of {max_cost}",
+            400,
+        )
+
+    spent, limit = spend(context, analysis.cost)
+    if limit:
+        extensions["throttle"] = {"spent": spent, "limit": limit, "windowSeconds": RATE_LIMIT_WINDOW}
+        if spent > limit:
+            return extensions, (
+                "THROTTLED",
+                f"Query cost budget of {limit} per {RATE_LIMIT_WINDOW}s exceeded; retry later",
+                429,
+            )
+    return extensions, None
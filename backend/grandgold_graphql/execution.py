@@ -0,0 +1,428 @@
+"""
+Query execution for the Grand Gold /graphql/ entrypoint.
+
+- Parsed and validated query documents are kept in a per-process LRU cache keyed
+  by the SHA-256 of the query text, so repeated operations skip parse/validate.
+- Automatic Persisted Queries (Apollo APQ): a request may send
+  `extensions.persistedQuery.sha256Hash` without `query`. Unknown hashes get a
+  `PersistedQueryNotFound` error, and the client retries with the full query,
+  which registers it. Registered query text is kept in the Django cache, so
+  every worker can serve it once that cache is shared (saleor_extensions.caching).
+- Introspection-only queries (root fields `__schema`/`__type`) are answered
+  from memory: the encoded response is computed once per schema version
+  (schema_hash) and normalised document, and served with an ETag, so
+  `If-None-Match` gets a 304. They skip the cost limit but not the depth limit.
+- Queries whose root fields are all replica-safe (saleor_extensions.db_routing)
+  run against the read replica; mutations pin the caller to the primary.
+
+Settings:
+    GRAPHQL_DOCUMENT_CACHE_SIZE: Parsed documents kept per process (default 500)
+    GRAPHQL_APQ_TIMEOUT: Seconds a persisted query is kept in the Django cache
+        (default 86400, None for no expiry)
+"""
+
+import contextlib
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.cache import cache
+from graphql import parse, validate
+from graphql.error import GraphQLError
+from graphql.execution import execute
+from graphql.language import ast
+from graphql.language.printer import print_ast
+from graphql.language.source import Source
+from graphql.utils.schema_printer import print_schema
+from graphql.utils.introspection_query import introspection_query
+
+from grandgold_graphql import cost, instrumentation
+from saleor_extensions import db_routing
+
+PERSISTED_QUERY_NOT_FOUND = "PersistedQueryNotFound"
+PERSISTED_QUERY_NOT_SUPPORTED = "PersistedQueryNotSupported"
+APQ_KEY_PREFIX = "graphql:apq:v1"
+DEFAULT_DOCUMENT_CACHE_SIZE = 500
+DEFAULT_APQ_TIMEOUT = 60 * 60 * 24
+INTROSPECTION_CACHE_SIZE = 64
+INTROSPECTION_FIELDS = frozenset(("__schema", "__type", "__typename"))
+
+
+class QueryError(Exception):
+    """A request that cannot be executed; rendered as a GraphQL error response."""
+
+    def __init__(self, message, code=None, status=400, extensions=None):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+        self.status = status
+        self.extensions = extensions
+
+
+class LRUCache:
+    """Thread-safe LRU with hit/miss counters."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._documents = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            document = self._documents.get(key)
+            if document is None:
+                self.misses += 1
+                return None
+            self._documents.move_to_end(key)
+            self.hits += 1
+            return document
+
+    def put(self, key, document):
+        with self._lock:
+            self._documents[key] = document
+            self._documents.move_to_end(key)
+            while len(self._documents) > self.max_size:
+                self._documents.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._documents.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._documents), "hits": self.hits, "misses": self.misses}
+
+
+# Parsed, validated query documents by query hash
+document_cache = LRUCache(
+    getattr(settings, "GRAPHQL_DOCUMENT_CACHE_SIZE", DEFAULT_DOCUMENT_CACHE_SIZE)
+)
+# Encoded introspection responses by ETag
+introspection_cache = LRUCache(INTROSPECTION_CACHE_SIZE)
+# Hash of the printed (normalised) document by query hash
+_normalised_hashes = LRUCache(INTROSPECTION_CACHE_SIZE)
+
+
+def query_hash(query):
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+
+def _apq_key(sha256_hash):
+    return f"{APQ_KEY_PREFIX}:{sha256_hash}"
+
+
+def resolve_query(payload):
+    """
+    Return ``(query, sha256_hash)`` for a request payload, applying APQ rules.
+
+    ``query`` is None for a hash-only persisted query; its text is looked up
+    only if the document is not already cached in this process.
+    """
+    query = payload.get("query")
+    extensions = payload.get("extensions") or {}
+    persisted = extensions.get("persistedQuery") if isinstance(extensions, dict) else None
+
+    if not persisted:
+        if not query:
+            raise QueryError("Missing 'query' in request body")
+        return query, query_hash(query)
+
+    if persisted.get("version", 1) != 1 or not persisted.get("sha256Hash"):
+        raise QueryError(PERSISTED_QUERY_NOT_SUPPORTED, "PERSISTED_QUERY_NOT_SUPPORTED")
+    sha256_hash = persisted["sha256Hash"]
+
+    if query:
+        if query_hash(query) != sha256_hash:
+            raise QueryError("provided sha does not match query", "PERSISTED_QUERY_HASH_MISMATCH")
+        cache.set(
+            _apq_key(sha256_hash),
+            query,
+            getattr(settings, "GRAPHQL_APQ_TIMEOUT", DEFAULT_APQ_TIMEOUT),
+        )
+    return query, sha256_hash
+
+
+def get_document(schema, query, sha256_hash):
+    """
+    Return ``(document, validation_errors)``, parsing and validating on a cache miss.
+
+    Only valid documents are cached. Raises GraphQLError on a syntax error and
+    QueryError for an unknown persisted query.
+    """
+    document = document_cache.get(sha256_hash)
+    if document is not None:
+        return document, []
+
+    if query is None:
+        query = cache.get(_apq_key(sha256_hash))
+        if query is None:
+            # Apollo's persisted-query link expects this as a normal GraphQL error (HTTP 200)
+            raise QueryError(PERSISTED_QUERY_NOT_FOUND, "PERSISTED_QUERY_NOT_FOUND", status=200)
+
+    document = parse(Source(query, name="GraphQL request"))
+    errors = validate(schema, document)
+    if errors:
+        return None, errors
+    document_cache.put(sha256_hash, document)
+    return document, []
+
+
+def execute_request(schema, payload, context):
+    """
+    Execute a GraphQL request payload against ``schema``.
+
+    Returns a namespace with ``data``, ``errors`` (GraphQLError instances,
+    empty on success) and ``extensions``. Successful introspection responses
+    carry a pre-encoded ``body`` and an ``etag`` instead of ``data``. Raises QueryError for requests that
+    cannot be executed (missing query, unknown or mismatched persisted query,
+    over the cost/depth limits).
+    """
+    query, sha256_hash = resolve_query(payload)
+    try:
+        document, errors = get_document(schema, query, sha256_hash)
+    except GraphQLError as e:
+        return _response(None, [e])
+    if errors:
+        return _response(None, errors)
+
+    variables = payload.get("variables")
+    operation_name = payload.get("operationName")
+
+    operation = _operation(document, operation_name)
+    if _is_introspection(operation):
+        return _introspection_response(schema, document, sha256_hash, operation, variables, operation_name)
+
+    trace = instrumentation.start_request(context)
+    cost_extensions, violation = cost.check(schema, document, context, variables, operation_name)
+    extensions = {"cost": cost_extensions}
+    if violation is not None:
+        code, message, status = violation
+        raise QueryError(message, code, status=status, extensions=extensions)
+
+    middleware = None
+    with contextlib.ExitStack() as stack:
+        if trace is not None:
+            stack.enter_context(trace.capture_sql())
+            middleware = [instrumentation.InstrumentationMiddleware(trace)]
+        result = _execute_routed(schema, document, operation, context, variables, operation_name, middleware)
+    if trace is not None:
+        duration = trace.finish(operation_name)
+        if trace.include_fields:
+            extensions["trace"] = trace.as_extension(duration)
+    if operation is not None and operation.operation == "mutation":
+        # Read-your-writes: this caller's next reads must not hit a lagging replica
+        db_routing.pin_primary(getattr(context, "user", None))
+    return _response(result.data, list(result.errors or []), extensions)
+
+
+def _execute_routed(schema, document, operation, context, variables, operation_name, middleware):
+    """Execute on the replica when the whole operation may read from it, else on the primary."""
+    use_replica = (
+        context is not None
+        and operation is not None
+        and operation.operation == "query"
+        and all(
+            isinstance(selection, ast.Field)
+            and (selection.name.value in INTROSPECTION_FIELDS or db_routing.is_replica_field(selection.name.value))
+            for selection in operation.selection_set.selections
+        )
+        and db_routing.allow_replica(getattr(context, "user", None))
+    )
+
+    def run():
+        return execute(
+            schema,
+            document,
+            context_value=context,
+            variable_values=variables,
+            operation_name=operation_name,
+            middleware=middleware,
+        )
+
+    if use_replica:
+        with db_routing.replica_reads() as on_replica:
+            context.allow_replica = on_replica
+            result = run()
+    else:
+        result = run()
+
+    if use_replica and context.allow_replica and _replica_failed(result):
+        # Read-only, so safe to run again on the primary
+        db_routing.mark_replica_down(result.errors[0])
+        context.allow_replica = False
+        result = run()
+    return result
+
+
+def _replica_failed(result):
+    return any(
+        isinstance(getattr(error, "original_error", None), db_routing.REPLICA_ERRORS)
+        for error in result.errors or []
+    )
+
+
+def _response(data, errors, extensions=None, body=None, etag=None):
+    return SimpleNamespace(data=data, errors=errors, extensions=extensions or {}, body=body, etag=etag)
+
+
+# --- Introspection ---
+
+_schema_hashes = {}
+
+
+def schema_hash(schema):
+    """SHA-256 of the printed schema SDL; identifies the schema version."""
+    key = id(schema)
+    digest = _schema_hashes.get(key)
+    if digest is None:
+        digest = _schema_hashes[key] = hashlib.sha256(print_schema(schema).encode("utf-8")).hexdigest()
+    return digest
+
+
+def _operation(document, operation_name):
+    """The operation ``execute`` will run, or None when it is missing or ambiguous."""
+    operations = [d for d in document.definitions if isinstance(d, ast.OperationDefinition)]
+    if operation_name:
+        operations = [op for op in operations if op.name and op.name.value == operation_name]
+    return operations[0] if len(operations) == 1 else None
+
+
+def _is_introspection(operation):
+    """True when ``operation`` is a query reading only introspection fields."""
+    if operation is None or operation.operation != "query":
+        return False
+    return all(
+        isinstance(selection, ast.Field) and selection.name.value in INTROSPECTION_FIELDS
+        for selection in operation.selection_set.selections
+    )
+
+
+def _introspection_etag(schema, document, sha256_hash, operation, variables):
+    """
+    ETag of an introspection response.
+
+    Built from the printed document, so formatting, comments and unused
+    operations do not matter, and from the variables the operation declares.
+    """
+    normalised = _normalised_hashes.get(sha256_hash)
+    if normalised is None:
+        normalised = query_hash(print_ast(document))
+        _normalised_hashes.put(sha256_hash, normalised)
+    declared = {definition.variable.name.value for definition in operation.variable_definitions or []}
+    key = json.dumps(
+        [
+            schema_hash(schema),
+            normalised,
+            operation.name.value if operation.name else None,
+            {name: value for name, value in (variables or {}).items() if name in declared},
+        ],
+        sort_keys=True,
+        default=str,
+    )
+    return '"' + hashlib.sha256(key.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def _introspection_response(schema, document, sha256_hash, operation, variables, operation_name):
+    """Encoded introspection response; only ``body`` is kept in the cache (``data`` is None)."""
+    etag = _introspection_etag(schema, document, sha256_hash, operation, variables)
+    cached = introspection_cache.get(etag)
+    if cached is not None:
+        return cached
+
+    violation = cost.check_depth(schema, document, operation_name)
+    if violation is not None:
+        code, message, status = violation
+        raise QueryError(message, code, status=status)
+
+    result = execute(schema, document, variable_values=variables, operation_name=operation_name)
+    errors = list(result.errors or [])
+    if errors:
+        return _response(result.data, errors)
+    response = _response(None, [], body=json.dumps({"data": result.data}).encode("utf-8"), etag=etag)
+    introspection_cache.put(etag, response)
+    return response
+
+
+def introspect(schema):
+    """Full introspection result for ``schema`` (served from the introspection cache)."""
+    sha256_hash = query_hash(introspection_query)
+    document, errors = get_document(schema, introspection_query, sha256_hash)
+    if errors:
+        raise errors[0]
+    response = _introspection_response(schema, document, sha256_hash, _operation(document, None), None, None)
+    if response.errors:
+        raise response.errors[0]
+    return json.loads(response.body)["data"]
+
+
+def format_error(error):
+    if isinstance(error, QueryError):
+        formatted = {"message": error.message}
+        if error.code:
+            formatted["extensions"] = {"code": error.code}
+        return formatted
+    try:
+        locations = [{"line": l.line, "column": l.column} for l in (getattr(error, "locations", None) or [])]
+    except Exception:
+        locations = None
+    return {
+        "message": str(error),
+        "locations": locations,
+        "path": getattr(error, "path", None),
+    }
+
+
+class GraphQLContext:
+    """
+    Context for GraphQL execution.
+
+    Saleor's resolvers expect a context with 'app' and 'user' attributes. Since
+    SaleorContext inherits from HttpRequest and can't be instantiated directly,
+    this wraps the request and forwards every other attribute to it.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self.app = getattr(request, "app", None)
+        # Saleor expects this flag for DB routing in some resolvers (e.g. products).
+        # execute_request enables it for read-only operations when a replica is
+        # configured (saleor_extensions.db_routing).
+        self.allow_replica = False
+        user = getattr(request, "user", None)
+        self.user = user if user is not None else _anonymous_user()
+
+    def __getattr__(self, item):
+        return getattr(self.request, item)
+
+
+class _Anonymous:
+    """Fallback anonymous user (must NOT raise AttributeError for permission checks)."""
+
+    is_authenticated = False
+    is_anonymous = True
+    is_staff = False
+    is_active = False
+
+    def has_perm(self, _perm, _obj=None):
+        return False
+
+    def has_perms(self, _perm_list, _obj=None):
+        return False
+
+    def has_module_perms(self, _app_label):
+        return False
+
+
+def _anonymous_user():
+    try:
+        # Prefer Django's built-in AnonymousUser (implements has_perm/has_perms/etc)
+        from django.contrib.auth.models import AnonymousUser
+
+        return AnonymousUser()
+    except Exception:
+        return _Anonymous()
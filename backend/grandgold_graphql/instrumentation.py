@@ -0,0 +1,217 @@
+"""
+Resolver timing and SQL instrumentation for the /graphql/ entrypoint.
+
+A graphene middleware times every resolver and counts the SQL statements
+(and their DB time) it issues, using Django's connection.execute_wrapper.
+Root fields and any field that hit the database are aggregated into
+in-process histograms, labelled by "ParentType.field", and rendered in
+Prometheus text format by /__grandgold__/metrics. Metrics are per process:
+scrape every worker, or aggregate in Prometheus.
+
+Resolver times are the synchronous part of the resolver only. A resolver
+returning a lazy QuerySet has it evaluated inside its timed window, so the
+SQL is attributed to that field; DataLoader batches that run after their
+fields returned are counted in the request totals but not attributed to a
+field.
+
+Sending the `X-Grandgold-Trace: 1` header (staff users, or any user when
+DEBUG is on) adds a per-request trace to the response `extensions`.
+
+Settings:
+    GRAPHQL_METRICS_ENABLED: Turn instrumentation off entirely (default True)
+    GRAPHQL_METRICS_TOKEN: If set, /__grandgold__/metrics requires
+        `Authorization: Bearer <token>`
+"""
+
+import bisect
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import QuerySet
+from promise import Promise
+
+TRACE_HEADER = "HTTP_X_GRANDGOLD_TRACE"
+MAX_LABELS = 500
+OVERFLOW_LABEL = "other"
+
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+
+def is_enabled():
+    return getattr(settings, "GRAPHQL_METRICS_ENABLED", True)
+
+
+class Histogram:
+    """Cumulative histogram keyed by one label, safe to share between threads."""
+
+    def __init__(self, name, documentation, label, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_value, value):
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                if len(self._series) >= MAX_LABELS:
+                    label_value = OVERFLOW_LABEL
+                    series = self._series.get(label_value)
+                if series is None:
+                    series = self._series[label_value] = [[0] * len(self.buckets), 0.0, 0]
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series_items = sorted((key, [list(v[0]), v[1], v[2]]) for key, v in self._series.items())
+        for label_value, (counts, total, count) in series_items:
+            label = _escape(label_value)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{self.label}="{label}",le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{self.label}="{label}",le="+Inf"}} {count}')
+            lines.append(f'{self.name}_sum{{{self.label}="{label}"}} {total}')
+            lines.append(f'{self.name}_count{{{self.label}="{label}"}} {count}')
+        return lines
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+RESOLVER_DURATION = Histogram(
+    "grandgold_graphql_resolver_duration_seconds", "Resolver wall time", "field", DURATION_BUCKETS
+)
+RESOLVER_DB_DURATION = Histogram(
+    "grandgold_graphql_resolver_db_duration_seconds", "Time spent in SQL per resolver", "field", DURATION_BUCKETS
+)
+RESOLVER_DB_QUERIES = Histogram(
+    "grandgold_graphql_resolver_db_queries", "SQL statements per resolver", "field", QUERY_COUNT_BUCKETS
+)
+REQUEST_DURATION = Histogram(
+    "grandgold_graphql_request_duration_seconds", "GraphQL request wall time", "operation", DURATION_BUCKETS
+)
+REQUEST_DB_QUERIES = Histogram(
+    "grandgold_graphql_request_db_queries", "SQL statements per GraphQL request", "operation", QUERY_COUNT_BUCKETS
+)
+
+HISTOGRAMS = (RESOLVER_DURATION, RESOLVER_DB_DURATION, RESOLVER_DB_QUERIES, REQUEST_DURATION, REQUEST_DB_QUERIES)
+
+
+class RequestTrace:
+    """SQL counters and (optionally) per-field timings for one request."""
+
+    def __init__(self, include_fields=False):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.include_fields = include_fields
+        self.fields = []
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_queries += 1
+            self.db_time += time.perf_counter() - started
+
+    @contextmanager
+    def capture_sql(self):
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self.execute_wrapper))
+            yield
+
+    def finish(self, operation_name):
+        duration = time.perf_counter() - self.started
+        operation = operation_name or "anonymous"
+        REQUEST_DURATION.observe(operation, duration)
+        REQUEST_DB_QUERIES.observe(operation, self.db_queries)
+        return duration
+
+    def as_extension(self, duration):
+        return {
+            "durationMs": round(duration * 1000, 3),
+            "dbQueries": self.db_queries,
+            "dbTimeMs": round(self.db_time * 1000, 3),
+            "resolvers": self.fields,
+        }
+
+
+class InstrumentationMiddleware:
+    """graphene/graphql-core middleware recording per-field time and SQL usage."""
+
+    def __init__(self, trace):
+        self.trace = trace
+
+    def resolve(self, next, root, info, **args):
+        trace = self.trace
+        queries_before = trace.db_queries
+        db_time_before = trace.db_time
+        started = time.perf_counter()
+        try:
+            return _evaluate(next(root, info, **args))
+        finally:
+            duration = time.perf_counter() - started
+            queries = trace.db_queries - queries_before
+            if queries or root is None:
+                field = f"{info.parent_type.name}.{info.field_name}"
+                db_time = trace.db_time - db_time_before
+                RESOLVER_DURATION.observe(field, duration)
+                RESOLVER_DB_DURATION.observe(field, db_time)
+                RESOLVER_DB_QUERIES.observe(field, queries)
+                if trace.include_fields:
+                    trace.fields.append({
+                        "path": "/".join(str(part) for part in (info.path or [])),
+                        "field": field,
+                        "durationMs": round(duration * 1000, 3),
+                        "dbQueries": queries,
+                        "dbTimeMs": round(db_time * 1000, 3),
+                    })
+
+
+def _evaluate(result):
+    """Run a resolved lazy QuerySet now; graphql-core would otherwise run it after the field is timed."""
+    value = result
+    if isinstance(result, Promise) and result.is_fulfilled:
+        value = result.get()
+    if isinstance(value, QuerySet):
+        return list(value)
+    return result
+
+
+def trace_requested(context):
+    request = getattr(context, "request", None)
+    meta = getattr(request, "META", {}) or {}
+    if meta.get(TRACE_HEADER) not in ("1", "true"):
+        return False
+    user = getattr(context, "user", None)
+    return bool(settings.DEBUG or getattr(user, "is_staff", False))
+
+
+def start_request(context):
+    """Return a RequestTrace for this request, or None when instrumentation is off."""
+    if not is_enabled():
+        return None
+    return RequestTrace(include_fields=trace_requested(context))
+
+
+def render_prometheus(extra_lines=()):
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    lines.extend(extra_lines)
+    return "\n".join(lines) + "\n"
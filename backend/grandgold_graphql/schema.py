@@ -11,54 +11,30 @@ IMPORTANT:
 # CRITICAL: Set LD_LIBRARY_PATH for libmagic BEFORE any imports
 # This must happen before Saleor imports, as they may trigger libmagic usage
 import os
-try:
-    import subprocess
-    result = subprocess.run(
-        'find /nix/store -name libmagic.so* 2>/dev/null | head -1 | xargs dirname 2>/dev/null',
-        shell=True,
-        capture_output=True,
-        text=True,
-        timeout=3
-    )
-    if result.returncode == 0 and result.stdout.strip():
-        libmagic_dir = result.stdout.strip()
-        current_ld_path = os.environ.get('LD_LIBRARY_PATH', '')
-        if libmagic_dir and libmagic_dir not in current_ld_path:
-            os.environ['LD_LIBRARY_PATH'] = f"{current_ld_path}:{libmagic_dir}" if current_ld_path else libmagic_dir
-except Exception:
-    pass  # Ignore errors - LD_LIBRARY_PATH might already be set
+
+from boot import ensure_library_path
+
+ensure_library_path()
 
 import graphene
 
+from saleor_extensions.debug_log import get_logger
+
+_debug = get_logger("schema")
+
 
 def _log(location: str, message: str, data: dict, hypothesis_id: str, run_id: str = "schema-debug") -> None:
-    # #region agent log
-    import json
-    import os
-    import time
+    _debug.log(location, message, data, hypothesis_id, run_id)
+
+
+# Schema assembly diagnostics are only printed with GG_SCHEMA_VERBOSE=1;
+# warnings and failures are always printed.
+_VERBOSE = os.environ.get("GG_SCHEMA_VERBOSE") == "1"
 
-    try:
-        log_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), ".cursor", "debug.log")
-        if not os.path.exists(os.path.dirname(log_path)):
-            log_path = "/tmp/debug.log"
-        with open(log_path, "a") as f:
-            f.write(
-                json.dumps(
-                    {
-                        "timestamp": int(time.time() * 1000),
-                        "sessionId": "debug-session",
-                        "runId": run_id,
-                        "hypothesisId": hypothesis_id,
-                        "location": location,
-                        "message": message,
-                        "data": data,
-                    }
-                )
-                + "\n"
-            )
-    except Exception:
-        pass
-    # #endregion
+
+def _say(message: str) -> None:
+    if _VERBOSE or message.lstrip().startswith(("⚠️", "❌")):
+        print(message)
 
 
 _log(
@@ -102,15 +78,15 @@ try:
         
         if SaleorQuery and SaleorMutation:
             _SALEOR_AVAILABLE = True
-            print(f"✅ [SCHEMA] Imported SaleorQuery from: {SaleorQuery.__module__}")
-            print(f"✅ [SCHEMA] Imported SaleorMutation from: {SaleorMutation.__module__}")
+            _say(f"✅ [SCHEMA] Imported SaleorQuery from: {SaleorQuery.__module__}")
+            _say(f"✅ [SCHEMA] Imported SaleorMutation from: {SaleorMutation.__module__}")
             # Check fields
             if hasattr(SaleorQuery, '_meta') and hasattr(SaleorQuery._meta, 'fields'):
                 fields = list(SaleorQuery._meta.fields.keys())
-                print(f"✅ [SCHEMA] SaleorQuery has {len(fields)} fields")
-                print(f"   Has products: {'products' in fields}")
-                print(f"   Has orders: {'orders' in fields}")
-                print(f"   Has users: {'users' in fields}")
+                _say(f"✅ [SCHEMA] SaleorQuery has {len(fields)} fields")
+                _say(f"   Has products: {'products' in fields}")
+                _say(f"   Has orders: {'orders' in fields}")
+                _say(f"   Has users: {'users' in fields}")
             _log(
                 "grandgold_graphql/schema.py:import_saleor",
                 "Imported Saleor schema object (strategy 1)",
@@ -127,41 +103,24 @@ try:
         if _local_backup:
             sys.modules['saleor.graphql'] = _local_backup
 except Exception as e1:
-    print(f"⚠️ [SCHEMA] Strategy 1 failed: {e1}")
+    _say(f"⚠️ [SCHEMA] Strategy 1 failed: {e1}")
     # Strategy 2: Import Query/Mutation directly from core.schema
     # Set up libmagic path first to avoid import errors
     try:
-        import os
-        # Try to find libmagic and set LD_LIBRARY_PATH
-        _old_ld_path = os.environ.get('LD_LIBRARY_PATH', '')
-        try:
-            import subprocess
-            result = subprocess.run(
-                'find /nix/store -name libmagic.so* 2>/dev/null | head -1 | xargs dirname 2>/dev/null',
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=3
-            )
-            if result.returncode == 0 and result.stdout.strip():
-                lib_dir = result.stdout.strip()
-                os.environ['LD_LIBRARY_PATH'] = f"{_old_ld_path}:{lib_dir}" if _old_ld_path else lib_dir
-                print(f"🔍 [SCHEMA] Set LD_LIBRARY_PATH for libmagic: {lib_dir}")
-        except Exception as lib_err:
-            pass  # Ignore libmagic path finding errors
-        
+        ensure_library_path()
+
         try:
             # Strategy 2a: Try importing from api (Saleor 3.23+)
             from saleor.graphql.api import Query as SaleorQuery, Mutation as SaleorMutation
             _SALEOR_AVAILABLE = True
-            print(f"✅ [SCHEMA] Strategy 2a succeeded - Imported from api")
-            print(f"   SaleorQuery module: {SaleorQuery.__module__}")
+            _say(f"✅ [SCHEMA] Strategy 2a succeeded - Imported from api")
+            _say(f"   SaleorQuery module: {SaleorQuery.__module__}")
             if hasattr(SaleorQuery, '_meta') and hasattr(SaleorQuery._meta, 'fields'):
                 fields = list(SaleorQuery._meta.fields.keys())
-                print(f"   SaleorQuery has {len(fields)} fields")
-                print(f"   Has products: {'products' in fields}")
-                print(f"   Has orders: {'orders' in fields}")
-                print(f"   Has users: {'users' in fields}")
+                _say(f"   SaleorQuery has {len(fields)} fields")
+                _say(f"   Has products: {'products' in fields}")
+                _say(f"   Has orders: {'orders' in fields}")
+                _say(f"   Has users: {'users' in fields}")
             _log(
                 "grandgold_graphql/schema.py:import_saleor",
                 "Imported Saleor schema from api (strategy 2a)",
@@ -169,19 +128,19 @@ except Exception as e1:
                 "H3",
             )
         except Exception as e2a:
-            print(f"⚠️ [SCHEMA] Strategy 2a failed: {e2a}")
+            _say(f"⚠️ [SCHEMA] Strategy 2a failed: {e2a}")
             # Strategy 2b: Try importing from core.schema (older Saleor versions)
             try:
                 from saleor.graphql.core.schema import Query as SaleorQuery, Mutation as SaleorMutation
                 _SALEOR_AVAILABLE = True
-                print(f"✅ [SCHEMA] Strategy 2b succeeded - Imported from core.schema")
-                print(f"   SaleorQuery module: {SaleorQuery.__module__}")
+                _say(f"✅ [SCHEMA] Strategy 2b succeeded - Imported from core.schema")
+                _say(f"   SaleorQuery module: {SaleorQuery.__module__}")
                 if hasattr(SaleorQuery, '_meta') and hasattr(SaleorQuery._meta, 'fields'):
                     fields = list(SaleorQuery._meta.fields.keys())
-                    print(f"   SaleorQuery has {len(fields)} fields")
-                    print(f"   Has products: {'products' in fields}")
-                    print(f"   Has orders: {'orders' in fields}")
-                    print(f"   Has users: {'users' in fields}")
+                    _say(f"   SaleorQuery has {len(fields)} fields")
+                    _say(f"   Has products: {'products' in fields}")
+                    _say(f"   Has orders: {'orders' in fields}")
+                    _say(f"   Has users: {'users' in fields}")
                 _log(
                     "grandgold_graphql/schema.py:import_saleor",
                     "Imported Saleor core schema (strategy 2b)",
@@ -189,15 +148,8 @@ except Exception as e1:
                     "H3",
                 )
             except Exception as e2b:
-                print(f"⚠️ [SCHEMA] Strategy 2b failed: {e2b}")
+                _say(f"⚠️ [SCHEMA] Strategy 2b failed: {e2b}")
                 raise e2b  # Re-raise to trigger outer except
-        finally:
-            # Restore LD_LIBRARY_PATH
-            if _old_ld_path:
-                os.environ['LD_LIBRARY_PATH'] = _old_ld_path
-            elif 'LD_LIBRARY_PATH' in os.environ and not _old_ld_path:
-                # Only delete if we added it
-                pass  # Keep it for other imports
     except Exception as e2:
         # Strategy 3: Try importing from graphql.schema directly
         try:
@@ -218,14 +170,14 @@ except Exception as e1:
                 if _local_backup:
                     sys.modules['saleor.graphql'] = _local_backup
         except Exception as e3:
-            print(f"⚠️ [SCHEMA] Strategy 3 failed: {e3}")
+            _say(f"⚠️ [SCHEMA] Strategy 3 failed: {e3}")
             _SALEOR_AVAILABLE = False
             SaleorQuery = None
             SaleorMutation = None
-            print(f"❌ [SCHEMA] All import strategies failed!")
-            print(f"   Error 1: {e1}")
-            print(f"   Error 2: {e2}")
-            print(f"   Error 3: {e3}")
+            _say(f"❌ [SCHEMA] All import strategies failed!")
+            _say(f"   Error 1: {e1}")
+            _say(f"   Error 2: {e2}")
+            _say(f"   Error 3: {e3}")
             _log(
                 "grandgold_graphql/schema.py:import_saleor",
                 "Failed to import Saleor core schema (all strategies failed)",
@@ -298,7 +250,11 @@ class GrandGoldQueries(graphene.ObjectType):
     grandgold_db_status = graphene.String(description="Grand Gold DB table/migration status (JSON string)")
 
     def resolve_grandgold_schema_version(self, info):
-        return "grandgold-extended-v1"
+        # Changes whenever the served schema does; clients can key cached
+        # introspection results on it.
+        from grandgold_graphql.execution import schema_hash
+
+        return f"grandgold-extended-v1:{schema_hash(info.schema)}"
 
     def resolve_grandgold_db_status(self, info):
         # NOTE: return JSON string to avoid introducing scalar conflicts.
@@ -362,22 +318,22 @@ def _unique_bases(bases):
 
 # Build query bases - ensure SaleorQuery is first if available
 query_bases = []
-print(f"🔍 [SCHEMA] Building query bases...")
-print(f"   _SALEOR_AVAILABLE: {_SALEOR_AVAILABLE}")
-print(f"   SaleorQuery is None: {SaleorQuery is None}")
-print(f"   SaleorQuery type: {type(SaleorQuery)}")
+_say(f"🔍 [SCHEMA] Building query bases...")
+_say(f"   _SALEOR_AVAILABLE: {_SALEOR_AVAILABLE}")
+_say(f"   SaleorQuery is None: {SaleorQuery is None}")
+_say(f"   SaleorQuery type: {type(SaleorQuery)}")
 
 if _SALEOR_AVAILABLE and SaleorQuery is not None:
     query_bases.append(SaleorQuery)
-    print(f"✅ [SCHEMA] Added SaleorQuery to query_bases")
+    _say(f"✅ [SCHEMA] Added SaleorQuery to query_bases")
     # Log SaleorQuery fields for debugging
     if hasattr(SaleorQuery, '_meta') and hasattr(SaleorQuery._meta, 'fields'):
         saleor_fields = list(SaleorQuery._meta.fields.keys())
-        print(f"✅ [SCHEMA] SaleorQuery has {len(saleor_fields)} fields")
-        print(f"   Has products: {'products' in saleor_fields}")
-        print(f"   Has orders: {'orders' in saleor_fields}")
-        print(f"   Has users: {'users' in saleor_fields}")
-        print(f"   Sample Saleor fields: {saleor_fields[:10]}")
+        _say(f"✅ [SCHEMA] SaleorQuery has {len(saleor_fields)} fields")
+        _say(f"   Has products: {'products' in saleor_fields}")
+        _say(f"   Has orders: {'orders' in saleor_fields}")
+        _say(f"   Has users: {'users' in saleor_fields}")
+        _say(f"   Sample Saleor fields: {saleor_fields[:10]}")
         _log(
             "grandgold_graphql/schema.py:compose",
             "SaleorQuery included in schema composition",
@@ -390,7 +346,7 @@ if _SALEOR_AVAILABLE and SaleorQuery is not None:
             "H4",
         )
     else:
-        print(f"⚠️ [SCHEMA] SaleorQuery has no _meta.fields")
+        _say(f"⚠️ [SCHEMA] SaleorQuery has no _meta.fields")
         _log(
             "grandgold_graphql/schema.py:compose",
             "SaleorQuery included but has no _meta.fields",
@@ -398,9 +354,9 @@ if _SALEOR_AVAILABLE and SaleorQuery is not None:
             "H4",
         )
 else:
-    print(f"❌ [SCHEMA] SaleorQuery NOT included")
-    print(f"   _SALEOR_AVAILABLE: {_SALEOR_AVAILABLE}")
-    print(f"   SaleorQuery is None: {SaleorQuery is None}")
+    _say(f"❌ [SCHEMA] SaleorQuery NOT included")
+    _say(f"   _SALEOR_AVAILABLE: {_SALEOR_AVAILABLE}")
+    _say(f"   SaleorQuery is None: {SaleorQuery is None}")
     _log(
         "grandgold_graphql/schema.py:compose",
         "SaleorQuery NOT included in schema composition",
@@ -429,12 +385,12 @@ else:
 try:
     if hasattr(Query, '_meta') and hasattr(Query._meta, 'fields'):
         final_fields = list(Query._meta.fields.keys())
-        print(f"✅ [SCHEMA] Final Query class has {len(final_fields)} fields")
-        print(f"   Has products: {'products' in final_fields}")
-        print(f"   Has orders: {'orders' in final_fields}")
-        print(f"   Has users: {'users' in final_fields}")
-        print(f"   Has branches: {'branches' in final_fields}")
-        print(f"   Sample fields: {final_fields[:10]}")
+        _say(f"✅ [SCHEMA] Final Query class has {len(final_fields)} fields")
+        _say(f"   Has products: {'products' in final_fields}")
+        _say(f"   Has orders: {'orders' in final_fields}")
+        _say(f"   Has users: {'users' in final_fields}")
+        _say(f"   Has branches: {'branches' in final_fields}")
+        _say(f"   Sample fields: {final_fields[:10]}")
         _log(
             "grandgold_graphql/schema.py:final_query",
             "Final Query class created",
@@ -449,9 +405,9 @@ try:
             "H4",
         )
     else:
-        print("⚠️ [SCHEMA] Final Query class has no _meta.fields")
+        _say("⚠️ [SCHEMA] Final Query class has no _meta.fields")
 except Exception as e:
-    print(f"❌ [SCHEMA] Could not inspect final Query class: {e}")
+    _say(f"❌ [SCHEMA] Could not inspect final Query class: {e}")
     _log(
         "grandgold_graphql/schema.py:final_query",
         "Could not inspect final Query class",
@@ -499,6 +455,8 @@ except Exception as e:
 
 
 def _verify_schema() -> None:
+    if not _debug.enabled:
+        return
     try:
         fields = []
         if hasattr(schema, "query_type") and hasattr(schema.query_type, "_meta") and hasattr(schema.query_type._meta, "fields"):
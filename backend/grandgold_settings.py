@@ -7,31 +7,14 @@ We import from the installed Saleor package and then apply our extensions.
 
 import sys
 import os
-import json
-import time
+from saleor_extensions.debug_log import get_logger
 
 # #region agent log
+_settings_debug = get_logger("settings")
+
+
 def _log_msg(loc, msg, data, hyp):
-    try:
-        # Use Railway-safe log path: try .cursor/debug.log first, then /tmp/debug.log
-        log_path = os.path.join(os.path.dirname(__file__), '.cursor', 'debug.log')
-        log_dir = os.path.dirname(log_path)
-        if not os.path.exists(log_dir):
-            log_path = '/tmp/debug.log'  # Fallback to /tmp on Railway
-        entry = {
-            "timestamp": int(time.time() * 1000),
-            "location": loc,
-            "message": msg,
-            "data": data,
-            "sessionId": "debug-session",
-            "runId": "initial",
-            "hypothesisId": hyp
-        }
-        with open(log_path, 'a') as f:
-            f.write(json.dumps(entry) + '\n')
-    except Exception as log_err:
-        # Silently fail logging - don't break the import process
-        pass
+    _settings_debug.log(loc, msg, data, hyp, "initial")
 # #endregion
 
 # #region agent log
@@ -794,6 +777,13 @@ if 'saleor_extensions.audit.middleware.AuditLogMiddleware' not in MIDDLEWARE:  #
     except ValueError:
         MIDDLEWARE.append('saleor_extensions.audit.middleware.AuditLogMiddleware')  # noqa: F405
 
+# Build each user's permission profile at most once per request
+if 'saleor_extensions.permissions.profile.AccessProfileMiddleware' not in MIDDLEWARE:  # noqa: F405
+    MIDDLEWARE.insert(  # noqa: F405
+        MIDDLEWARE.index('saleor_extensions.audit.middleware.AuditLogMiddleware') + 1,  # noqa: F405
+        'saleor_extensions.permissions.profile.AccessProfileMiddleware',
+    )
+
 # Railway-specific configurations
 
 # Database configuration (Railway provides DATABASE_URL)
@@ -801,15 +791,81 @@ if 'DATABASE_URL' in os.environ:
     try:
         import dj_database_url
         db_config = dj_database_url.config(default=os.environ.get('DATABASE_URL'))
+        replica_url = os.environ.get('REPLICA_DATABASE_URL')
         DATABASES = {
             'default': db_config,
-            # Saleor may expect a 'replica' database connection
-            # Point it to the same database as default (no actual replica needed)
-            'replica': db_config.copy() if isinstance(db_config, dict) else db_config,
+            # Saleor expects a 'replica' database connection. Without
+            # REPLICA_DATABASE_URL it points to the same database as default.
+            'replica': (
+                dj_database_url.parse(replica_url) if replica_url
+                else db_config.copy() if isinstance(db_config, dict) else db_config
+            ),
         }
     except ImportError:
         pass
 
+# Read-replica routing (saleor_extensions.db_routing)
+REPLICA_ENABLED = bool(os.environ.get('REPLICA_DATABASE_URL'))
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', '10'))
+REPLICA_RETRY_SECONDS = int(os.environ.get('REPLICA_RETRY_SECONDS', '30'))
+DATABASE_ROUTERS = [
+    *globals().get('DATABASE_ROUTERS', []),
+    'saleor_extensions.db_routing.ReplicaRouter',
+]
+
+# Shared cache
+# Saleor builds CACHES from CACHE_URL and otherwise falls back to a per-process
+# locmem cache. Dashboard cache generations, persisted queries, the
+# read-your-writes pin and permission profiles must be visible to every worker
+# and Celery, so use Redis when REDIS_URL is set and CACHE_URL is not.
+# saleor_extensions.caching warns (grandgold.W001) when the cache is local.
+if not os.environ.get('CACHE_URL') and (os.environ.get('CACHE_REDIS_URL') or os.environ.get('REDIS_URL')):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('CACHE_REDIS_URL') or os.environ.get('REDIS_URL'),
+            'KEY_PREFIX': os.environ.get('CACHE_KEY_PREFIX', 'grandgold'),
+        }
+    }
+
+# Database connection reuse
+# - DB_CONN_MAX_AGE: Seconds a worker keeps its connection open between
+#   requests (default 60; 0 opens a new connection per request). Health checks
+#   replace connections that died while idle.
+# - DB_POOL=1: Use Django's psycopg 3 connection pool (Django >= 5.1, needs
+#   `psycopg[pool]`); sized per process by DB_POOL_MIN_SIZE/DB_POOL_MAX_SIZE.
+#   Falls back to persistent connections when psycopg_pool is not installed.
+# - DB_PGBOUNCER=1: The URL points at PgBouncer in transaction pooling mode.
+#   Server-side cursors (.iterator()) are disabled because a cursor cannot
+#   outlive the transaction that owns the server connection.
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', '60'))
+DB_POOL = os.environ.get('DB_POOL') == '1'
+DB_PGBOUNCER = os.environ.get('DB_PGBOUNCER') == '1'
+if DB_POOL:
+    try:
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        print("⚠️ DB_POOL=1 but psycopg_pool is not installed; using persistent connections", file=sys.stderr)
+        DB_POOL = False
+
+for _db_config in DATABASES.values():  # noqa: F405
+    if 'postgresql' not in _db_config.get('ENGINE', ''):
+        continue
+    _db_config['CONN_HEALTH_CHECKS'] = True
+    if DB_POOL:
+        # Pooled connections are returned to the pool after each request;
+        # Django rejects persistent connections together with a pool.
+        _db_config['CONN_MAX_AGE'] = 0
+        _db_config.setdefault('OPTIONS', {})['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', '10')),
+            'timeout': int(os.environ.get('DB_POOL_TIMEOUT', '10')),
+        }
+    else:
+        _db_config['CONN_MAX_AGE'] = DB_CONN_MAX_AGE
+    if DB_PGBOUNCER:
+        _db_config['DISABLE_SERVER_SIDE_CURSORS'] = True
+
 # ALLOWED_CLIENT_HOSTS configuration (required by Saleor when DEBUG=False)
 # This is separate from ALLOWED_HOSTS - it's for GraphQL client origins
 # Note: We already set this in os.environ above before importing Saleor settings
@@ -928,24 +984,9 @@ except Exception:
 ROOT_URLCONF = 'grandgold_urls'
 
 # #region agent log
-try:
-    _log_path = os.path.join(os.path.dirname(__file__), '.cursor', 'debug.log')
-    if not os.path.exists(os.path.dirname(_log_path)):
-        _log_path = '/tmp/debug.log'
-    with open(_log_path, 'a') as _log_file:
-        _log_file.write(json.dumps({
-            'timestamp': int(time.time() * 1000),
-            'sessionId': 'debug-session',
-            'runId': 'schema-debug',
-            'hypothesisId': 'H1',
-            'location': 'grandgold_settings.py:ROOT_URLCONF',
-            'message': 'ROOT_URLCONF configured',
-            'data': {
-                'root_urlconf': ROOT_URLCONF
-            }
-        }) + '\n')
-except Exception:
-    pass
+_log_msg('grandgold_settings.py:ROOT_URLCONF', 'ROOT_URLCONF configured', {
+    'root_urlconf': ROOT_URLCONF
+}, 'H1')
 # #endregion
 
 # WSGI Application
@@ -989,3 +1030,69 @@ if 'AWS_STORAGE_BUCKET_NAME' in os.environ:
     AWS_S3_REGION_NAME = os.environ.get('AWS_S3_REGION_NAME', 'us-east-1')
     AWS_S3_CUSTOM_DOMAIN = os.environ.get('AWS_S3_CUSTOM_DOMAIN', f'{AWS_STORAGE_BUCKET_NAME}.s3.amazonaws.com')
     AWS_DEFAULT_ACL = 'public-read'
+
+# Dashboard result cache (saleor_extensions.reports.cache)
+REPORTS_CACHE_ENABLED = os.environ.get('REPORTS_CACHE_ENABLED', '1') != '0'
+REPORTS_CACHE_TIMEOUT = int(os.environ.get('REPORTS_CACHE_TIMEOUT', '60'))
+REPORTS_CACHE_TIMEOUTS = {
+    # Charts and rollups change slowly; inventory tiles follow the default
+    'sales_chart_data': int(os.environ.get('REPORTS_CACHE_CHART_TIMEOUT', '300')),
+    'branch_performance': int(os.environ.get('REPORTS_CACHE_PERFORMANCE_TIMEOUT', '300')),
+    'revenue_by_region': int(os.environ.get('REPORTS_CACHE_PERFORMANCE_TIMEOUT', '300')),
+}
+
+# GraphQL entrypoint (grandgold_graphql.execution)
+GRAPHQL_DOCUMENT_CACHE_SIZE = int(os.environ.get('GRAPHQL_DOCUMENT_CACHE_SIZE', '500'))
+GRAPHQL_APQ_TIMEOUT = int(os.environ.get('GRAPHQL_APQ_TIMEOUT', str(60 * 60 * 24)))
+
+# GraphQL query cost limits (grandgold_graphql.cost)
+GRAPHQL_MAX_QUERY_COST = int(os.environ.get('GRAPHQL_MAX_QUERY_COST', '5000'))
+GRAPHQL_MAX_QUERY_DEPTH = int(os.environ.get('GRAPHQL_MAX_QUERY_DEPTH', '15'))
+GRAPHQL_DEFAULT_LIST_SIZE = int(os.environ.get('GRAPHQL_DEFAULT_LIST_SIZE', '100'))
+GRAPHQL_COST_RATE_LIMIT = int(os.environ.get('GRAPHQL_COST_RATE_LIMIT', '0'))
+# Report-only until costs of production traffic have been reviewed
+GRAPHQL_COST_ENFORCE = os.environ.get('GRAPHQL_COST_ENFORCE', '0') == '1'
+GRAPHQL_LIST_SIZES = {
+    # Small reference tables; everything else uses GRAPHQL_DEFAULT_LIST_SIZE
+    'Query.branches': 50,
+    'Query.executiveKpis': 10,
+    'Query.branchKpis': 10,
+    'Query.revenueByRegion': 20,
+    'Query.dashboardCacheStats': 20,
+    # Saleor lists bounded by channels, variants or attributes per product/order
+    'Product.channelListings': 10,
+    'ProductVariant.channelListings': 10,
+    'Product.variants': 20,
+    'Product.images': 20,
+    'Product.media': 20,
+    'Product.collections': 10,
+    'ProductVariant.attributes': 10,
+    'SelectedAttribute.values': 10,
+    'Order.lines': 20,
+}
+GRAPHQL_FIELD_COSTS = {}
+
+# GraphQL resolver metrics (grandgold_graphql.instrumentation)
+# /__grandgold__/metrics needs `Authorization: Bearer <GRAPHQL_METRICS_TOKEN>`;
+# without a token it is only served when DEBUG is on.
+GRAPHQL_METRICS_ENABLED = os.environ.get('GRAPHQL_METRICS_ENABLED', '1') != '0'
+GRAPHQL_METRICS_TOKEN = os.environ.get('GRAPHQL_METRICS_TOKEN') or None
+
+# Audit log writer (saleor_extensions.audit.writer)
+AUDIT_QUEUE_BACKEND = os.environ.get('AUDIT_QUEUE_BACKEND', 'memory')
+AUDIT_REDIS_URL = os.environ.get('AUDIT_REDIS_URL') or os.environ.get('REDIS_URL')
+AUDIT_QUEUE_SIZE = int(os.environ.get('AUDIT_QUEUE_SIZE', '10000'))
+AUDIT_BATCH_SIZE = int(os.environ.get('AUDIT_BATCH_SIZE', '200'))
+AUDIT_FLUSH_INTERVAL = float(os.environ.get('AUDIT_FLUSH_INTERVAL', '1.0'))
+AUDIT_QUEUE_PUT_TIMEOUT = float(os.environ.get('AUDIT_QUEUE_PUT_TIMEOUT', '0.5'))
+
+# Shared permission profile cache (saleor_extensions.permissions.profile)
+PERMISSION_PROFILE_CACHE_TIMEOUT = int(os.environ.get('PERMISSION_PROFILE_CACHE_TIMEOUT', '600'))
+
+# Branch scoping of inventory/order querysets (saleor_extensions.permissions.querysets)
+# Off until staff have UserRole/BranchAccess rows; unprovisioned staff see nothing.
+BRANCH_SCOPE_ENFORCED = os.environ.get('BRANCH_SCOPE_ENFORCED', '0') == '1'
+
+# Exchange-rate matrix (saleor_extensions.currency.rates)
+CURRENCY_TRIANGULATION_BASE = os.environ.get('CURRENCY_TRIANGULATION_BASE', 'GBP')
+CURRENCY_RATE_CHECK_INTERVAL = int(os.environ.get('CURRENCY_RATE_CHECK_INTERVAL', '30'))
@@ -8,40 +8,29 @@ IMPORTANT:
   to this file and guarantee our /graphql/ override is used.
 """
 
-import os
+import json
 import traceback
-from django.http import JsonResponse
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
 from django.urls import path
 
+from grandgold_graphql.execution import (
+    GraphQLContext,
+    QueryError,
+    document_cache,
+    execute_request,
+    format_error,
+)
+from grandgold_graphql.instrumentation import render_prometheus
+from boot import memory_usage
+from saleor_extensions.caching import read_release_marker
+from saleor_extensions.debug_log import get_logger
 
-def _log(location: str, message: str, data: dict, hypothesis_id: str, run_id: str = "schema-debug") -> None:
-    # #region agent log
-    import json
-    import time
 
-    try:
-        log_path = os.path.join(os.path.dirname(__file__), ".cursor", "debug.log")
-        log_dir = os.path.dirname(log_path)
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir, exist_ok=True)
-        with open(log_path, "a") as f:
-            f.write(
-                json.dumps(
-                    {
-                        "timestamp": int(time.time() * 1000),
-                        "sessionId": "debug-session",
-                        "runId": run_id,
-                        "hypothesisId": hypothesis_id,
-                        "location": location,
-                        "message": message,
-                        "data": data,
-                    }
-                )
-                + "\n"
-            )
-    except Exception:
-        pass
-    # #endregion
+_debug = get_logger("urls")
+
+
+def _log(location: str, message: str, data: dict, hypothesis_id: str, run_id: str = "schema-debug") -> None:
+    _debug.log(location, message, data, hypothesis_id, run_id)
 
 
 print(f"🔍 [BOOT] grandgold_urls.py loaded from {__file__}")
@@ -80,11 +69,81 @@ def _ping(_request):
             "has_graphql_view": True,  # we serve GraphQL without GraphQLView
             "has_extended_schema": schema_ok,
             "schema_error": _schema_import_error,
+            "release": read_release_marker(),
         }
     )
 
 urlpatterns.append(path("__grandgold__/ping", _ping, name="grandgold_ping"))
 
+
+def _metrics(request):
+    """Prometheus metrics for this worker process (needs GRAPHQL_METRICS_TOKEN unless DEBUG)."""
+    from django.conf import settings
+    from django.utils.crypto import constant_time_compare
+
+    token = getattr(settings, "GRAPHQL_METRICS_TOKEN", None)
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponse(status=403)
+    elif not constant_time_compare(request.META.get("HTTP_AUTHORIZATION", ""), f"Bearer {token}"):
+        return HttpResponse(status=401)
+
+    extra = []
+    document_stats = document_cache.stats()
+    extra += [
+        "# HELP grandgold_graphql_document_cache_requests_total Parsed document cache lookups",
+        "# TYPE grandgold_graphql_document_cache_requests_total counter",
+        f'grandgold_graphql_document_cache_requests_total{{result="hit"}} {document_stats["hits"]}',
+        f'grandgold_graphql_document_cache_requests_total{{result="miss"}} {document_stats["misses"]}',
+        "# HELP grandgold_graphql_document_cache_size Parsed documents held in this process",
+        "# TYPE grandgold_graphql_document_cache_size gauge",
+        f"grandgold_graphql_document_cache_size {document_stats['size']}",
+    ]
+    memory = memory_usage()
+    if memory:
+        extra += [
+            "# HELP grandgold_process_memory_bytes Worker memory by kind (shared = still shared with the gunicorn master)",
+            "# TYPE grandgold_process_memory_bytes gauge",
+        ]
+        extra += [f'grandgold_process_memory_bytes{{kind="{kind}"}} {value}' for kind, value in memory.items()]
+    try:
+        from saleor_extensions.reports import cache as reports_cache
+
+        extra += [
+            "# HELP grandgold_reports_cache_requests_total Dashboard result cache lookups (all workers sharing the cache)",
+            "# TYPE grandgold_reports_cache_requests_total counter",
+        ]
+        for name, counters in sorted(reports_cache.stats().items()):
+            extra.append(f'grandgold_reports_cache_requests_total{{resolver="{name}",result="hit"}} {counters["hits"]}')
+            extra.append(f'grandgold_reports_cache_requests_total{{resolver="{name}",result="miss"}} {counters["misses"]}')
+    except Exception:
+        pass
+    try:
+        from saleor_extensions.audit import writer as audit_writer
+
+        audit_stats = audit_writer.stats()
+        extra += [
+            "# HELP grandgold_audit_entries_total Audit entries by outcome (inline = written under back-pressure)",
+            "# TYPE grandgold_audit_entries_total counter",
+        ]
+        extra += [
+            f'grandgold_audit_entries_total{{result="{name}"}} {audit_stats[name]}'
+            for name in ("queued", "written", "inline", "failed")
+        ]
+        if audit_stats["pending"] is not None:
+            extra += [
+                "# HELP grandgold_audit_queue_pending Audit entries waiting to be written",
+                "# TYPE grandgold_audit_queue_pending gauge",
+                f"grandgold_audit_queue_pending {audit_stats['pending']}",
+            ]
+    except Exception:
+        pass
+
+    return HttpResponse(render_prometheus(extra), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+urlpatterns.append(path("__grandgold__/metrics", _metrics, name="grandgold_metrics"))
+
 # Always register /graphql/ with lazy resolution.
 def _graphql_entrypoint(request):
     try:
@@ -94,128 +153,70 @@ def _graphql_entrypoint(request):
         schema = _get_schema()
 
         try:
-            import json
-
-            payload = json.loads(request.body.decode("utf-8") or "{}")
-        except Exception:
+            payload = json.loads(request.body or b"{}")
+        except ValueError:
+            payload = {}
+        if not isinstance(payload, dict):
             payload = {}
 
-        query = payload.get("query")
-        variables = payload.get("variables")
-        operation_name = payload.get("operationName")
-
-        if not query:
-            return JsonResponse({"error": "Missing 'query' in request body"}, status=400)
-
-        # Create proper Saleor context for GraphQL execution
-        # Saleor's resolvers expect a context with 'app' and 'user' attributes
-        # Since SaleorContext inherits from HttpRequest and can't be instantiated directly,
-        # we create a wrapper that has all the necessary attributes
-        class GraphQLContext:
-            """Context wrapper for GraphQL execution"""
-            def __init__(self, request):
-                self.request = request
-                self.app = getattr(request, "app", None)
-                # Saleor expects this flag for DB routing in some resolvers (e.g. products).
-                # Default to False to avoid trying to use a replica connection implicitly.
-                self.allow_replica = False
-                user = getattr(request, "user", None)
-                if user is None:
-                    try:
-                        # Prefer Django's built-in AnonymousUser (implements has_perm/has_perms/etc)
-                        from django.contrib.auth.models import AnonymousUser  # type: ignore
-
-                        self.user = AnonymousUser()
-                    except Exception:
-                        # Fallback stub (must NOT raise AttributeError for permission checks)
-                        class _Anonymous:
-                            is_authenticated = False
-                            is_anonymous = True
-                            is_staff = False
-                            is_active = False
-
-                            def has_perm(self, _perm, _obj=None):
-                                return False
-
-                            def has_perms(self, _perm_list, _obj=None):
-                                return False
-
-                            def has_module_perms(self, _app_label):
-                                return False
-
-                        self.user = _Anonymous()
-                else:
-                    self.user = user
-
-                # #region agent log
-                _log(
-                    "grandgold_urls.py:GraphQLContext",
-                    "GraphQL context initialized",
-                    {"hypothesisId": "H1", "has_user": user is not None},
-                    "H1",
-                    run_id="debug-run1",
-                )
-                # #endregion
-
-            def __getattr__(self, item):
-                return getattr(self.request, item)
-        
         context = GraphQLContext(request)
-        
+
         # #region agent log
-        _log(
-            "grandgold_urls.py:_graphql_entrypoint:before_execute",
-            "Executing GraphQL query",
-            {
-                "hypothesisId": "H1",
-                "queryPreview": (query or "")[:120],
-                "operationName": operation_name,
-                "hasUser": hasattr(context, "user"),
-                "userType": type(getattr(context, "user", None)).__name__,
-            },
-            "H1",
-            run_id="debug-run1",
-        )
+        if _debug.enabled:
+            _log(
+                "grandgold_urls.py:_graphql_entrypoint:before_execute",
+                "Executing GraphQL query",
+                {
+                    "hypothesisId": "H1",
+                    "queryPreview": (payload.get("query") or "")[:120],
+                    "operationName": payload.get("operationName"),
+                    "userType": type(context.user).__name__,
+                },
+                "H1",
+                run_id="debug-run1",
+            )
         # #endregion
 
-        result = schema.execute(
-            query,
-            variable_values=variables,
-            operation_name=operation_name,
-            context_value=context,
-        )
+        try:
+            result = execute_request(schema, payload, context)
+        except QueryError as e:
+            if e.code is None:
+                return JsonResponse({"error": e.message}, status=e.status)
+            body = {"errors": [format_error(e)]}
+            if e.extensions:
+                body["extensions"] = e.extensions
+            resp = JsonResponse(body, status=e.status)
+            resp["X-Grandgold-Graphql"] = "1"
+            return resp
 
         # #region agent log
-        _log(
-            "grandgold_urls.py:_graphql_entrypoint:after_execute",
-            "GraphQL execution finished",
-            {
-                "hypothesisId": "H1",
-                "hasErrors": bool(getattr(result, "errors", None)),
-                "hasData": result.data is not None,
-            },
-            "H1",
-            run_id="debug-run1",
-        )
+        if _debug.enabled:
+            _log(
+                "grandgold_urls.py:_graphql_entrypoint:after_execute",
+                "GraphQL execution finished",
+                {"hypothesisId": "H1", "hasErrors": bool(result.errors), "hasData": result.data is not None or result.body is not None},
+                "H1",
+                run_id="debug-run1",
+            )
         # #endregion
 
-        errors = None
+        if result.etag is not None:
+            # Introspection: identical for every client until the schema changes
+            if request.META.get("HTTP_IF_NONE_MATCH") == result.etag:
+                resp = HttpResponseNotModified()
+            else:
+                resp = HttpResponse(result.body, content_type="application/json")
+            resp["ETag"] = result.etag
+            resp["Cache-Control"] = "private, no-cache"
+            resp["X-Grandgold-Graphql"] = "1"
+            return resp
+
+        body = {"data": result.data}
         if result.errors:
-            errors = []
-            for err in result.errors:
-                try:
-                    locations = [{"line": l.line, "column": l.column} for l in (getattr(err, "locations", None) or [])]
-                except Exception:
-                    locations = None
-                errors.append(
-                    {
-                        "message": str(err),
-                        "locations": locations,
-                        "path": getattr(err, "path", None),
-                    }
-                )
-
-        resp = JsonResponse({"data": result.data, "errors": errors} if errors else {"data": result.data}, status=400 if errors else 200)
+            body["errors"] = [format_error(err) for err in result.errors]
+        if result.extensions:
+            body["extensions"] = result.extensions
+        resp = JsonResponse(body, status=400 if result.errors else 200)
         resp["X-Grandgold-Graphql"] = "1"
         return resp
     except Exception as e:
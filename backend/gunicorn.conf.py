@@ -0,0 +1,82 @@
+"""
+Gunicorn configuration for the Grand Gold backend.
+
+    gunicorn -c gunicorn.conf.py grandgold_wsgi:application
+
+With `preload_app` (the default here) the master imports the application and
+runs grandgold_graphql.warmup before forking, then calls gc.freeze() so the
+garbage collector never touches (and so never un-shares) those objects in the
+workers. Each worker logs its memory after boot; "shared" is what it still
+shares with the master. On exit each worker writes out its queued audit log
+entries (saleor_extensions.audit.writer).
+
+Environment:
+    PORT: Listen port (default 8000)
+    WEB_CONCURRENCY: Worker processes (default 4)
+    GUNICORN_TIMEOUT: Worker timeout in seconds (default 120)
+    GUNICORN_PRELOAD: Set to 0 to load and warm the app in each worker instead
+"""
+
+import gc
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "4"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") != "0"
+
+
+def _mb(value):
+    return f"{value / (1024 * 1024):.1f}MB"
+
+
+def _warm_up(log):
+    try:
+        from grandgold_graphql.warmup import warm_up
+
+        timings = warm_up()
+        log.info("GraphQL warm-up: " + ", ".join(f"{step} {seconds:.2f}s" for step, seconds in timings.items()))
+    except Exception as e:
+        # The first request builds whatever failed here, as before
+        log.warning(f"GraphQL warm-up failed: {type(e).__name__}: {e}")
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    _warm_up(server.log)
+    gc.collect()
+    gc.freeze()
+    from boot import memory_usage
+
+    memory = memory_usage()
+    if memory:
+        server.log.info(f"Master after warm-up: rss {_mb(memory['rss'])}, {gc.get_freeze_count()} objects frozen")
+
+
+def post_worker_init(worker):
+    if not preload_app:
+        _warm_up(worker.log)
+    from boot import memory_usage
+
+    memory = memory_usage()
+    if memory:
+        worker.log.info(
+            f"Worker {worker.pid} memory: rss {_mb(memory['rss'])}, pss {_mb(memory['pss'])}, "
+            f"shared {_mb(memory['shared'])}, private {_mb(memory['private'])}"
+        )
+
+
+def worker_exit(server, worker):
+    # Write audit entries still queued in this worker before it exits
+    try:
+        from saleor_extensions.audit import writer
+
+        drained = writer.drain()
+        if drained:
+            worker.log.info(f"Worker {worker.pid} wrote {drained} queued audit entries on exit")
+    except Exception as e:
+        worker.log.warning(f"Audit queue drain failed: {type(e).__name__}: {e}")
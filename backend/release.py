@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+"""
+Release phase: database repair, migrations and bootstrap data, run once per deploy.
+
+Runs before the web processes start (Railway `preDeployCommand`, Procfile
+`release:`), so gunicorn workers only import the application:
+
+    python release.py
+
+Steps, in order (each in its own interpreter, as they call django.setup()):
+    1. ensure_saleor_tables.py      - create Saleor tables missing from old deploys
+    2. fix_all_product_columns.py   - add product columns missing from old deploys
+    3. smart_migrate.py             - apply migrations
+    4. manage.py backfill_daily_sales_facts --missing-only
+                                    - build dashboard facts for order history
+                                      that predates them (no-op once built)
+    5. create_superuser_if_needed.py
+
+Repair and bootstrap steps are best effort. A failed migration exits non-zero
+so the deploy stops. On success a ready marker is stored in the shared Django
+cache (saleor_extensions.caching), which /__grandgold__/ping reports. The
+release runs in its own container, so this needs REDIS_URL or CACHE_URL.
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+from boot import ensure_library_path
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _python():
+    venv_python = os.path.join(BACKEND_DIR, ".venv", "bin", "python")
+    return venv_python if os.path.exists(venv_python) else sys.executable
+
+
+def _run(script, timeout, env, required=False, args=()):
+    path = os.path.join(BACKEND_DIR, script)
+    if not os.path.exists(path):
+        print(f"⚠️  {script} not found; skipping")
+        return {"script": script, "status": "missing"}
+
+    if args:
+        script = " ".join([script, *args])
+    print(f"----- Running {script} -----", flush=True)
+    started = time.monotonic()
+    try:
+        result = subprocess.run(
+            [_python(), path, *args],
+            cwd=BACKEND_DIR,
+            env=env,
+            timeout=timeout,
+        )
+        status = "ok" if result.returncode == 0 else f"exit {result.returncode}"
+    except subprocess.TimeoutExpired:
+        status = "timeout"
+    duration = round(time.monotonic() - started, 2)
+
+    if status == "ok":
+        print(f"✅ {script} completed in {duration}s")
+    else:
+        print(f"{'❌' if required else '⚠️ '} {script} failed ({status}) after {duration}s")
+    return {"script": script, "status": status, "seconds": duration}
+
+
+def _write_marker(marker):
+    """Store the ready marker where the web containers can read it."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "grandgold_settings")
+    try:
+        import django
+
+        django.setup()
+        from saleor_extensions.caching import is_shared, write_release_marker
+
+        if not is_shared():
+            print("⚠️  The cache is local to this process; /__grandgold__/ping will not see the release marker")
+        write_release_marker(marker)
+    except Exception as e:
+        print(f"⚠️  Could not write release marker: {e}")
+
+
+def main():
+    if not os.environ.get("DATABASE_URL"):
+        print("ℹ️  DATABASE_URL is not set; nothing to release")
+        return 0
+
+    ensure_library_path()
+    env = os.environ.copy()
+    env["DJANGO_SETTINGS_MODULE"] = "grandgold_settings"
+    venv_bin = os.path.join(BACKEND_DIR, ".venv", "bin")
+    if os.path.isdir(venv_bin):
+        env["PATH"] = venv_bin + ":" + env.get("PATH", "")
+
+    started = time.monotonic()
+    column_fix = "fix_all_product_columns.py"
+    if not os.path.exists(os.path.join(BACKEND_DIR, column_fix)):
+        column_fix = "fix_product_search_document.py"
+
+    steps = [
+        _run("ensure_saleor_tables.py", 60, env),
+        _run(column_fix, 120, env),
+    ]
+    migrate = _run("smart_migrate.py", 600, env, required=True)
+    steps.append(migrate)
+    if migrate["status"] != "ok":
+        return 1
+    steps.append(_run("manage.py", 1800, env, args=["backfill_daily_sales_facts", "--missing-only"]))
+    steps.append(_run("create_superuser_if_needed.py", 60, env))
+
+    marker = {
+        "completed_at": int(time.time()),
+        "seconds": round(time.monotonic() - started, 2),
+        "commit": os.environ.get("RAILWAY_GIT_COMMIT_SHA") or os.environ.get("SOURCE_VERSION"),
+        "steps": steps,
+    }
+    _write_marker(marker)
+    print(f"✅ Release finished in {marker['seconds']}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,31 +7,22 @@ instead of Saleor's default schema.
 """
 import graphene
 
+from saleor_extensions.debug_log import get_logger
+
+_debug = get_logger("schema")
+
 # Import Saleor's core schema components
 # CRITICAL: Import Saleor's Query and Mutation from core.schema, NOT from graphql.schema
 # Importing from graphql.schema would import our own file (circular import)
 try:
     # #region agent log
-    import json
-    import time
-    import os
-    log_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), '.cursor', 'debug.log')
-    log_dir = os.path.dirname(log_path)
-    if not os.path.exists(log_dir):
-        log_path = '/tmp/debug.log'
-    try:
-        with open(log_path, 'a') as f:
-            f.write(json.dumps({
-                'timestamp': int(time.time() * 1000),
-                'location': 'saleor/graphql/schema.py:import_saleor',
-                'message': 'Attempting to import Saleor Query and Mutation',
-                'data': {'current_file': __file__},
-                'sessionId': 'debug-session',
-                'runId': 'schema-load',
-                'hypothesisId': 'A'
-            }) + '\n')
-    except:
-        pass
+    _debug.log(
+        'saleor/graphql/schema.py:import_saleor',
+        'Attempting to import Saleor Query and Mutation',
+        {'current_file': __file__},
+        'A',
+        'schema-load',
+    )
     # #endregion
     
     # CRITICAL: Import from core.schema, NOT from graphql.schema
@@ -71,24 +62,18 @@ try:
     print("✅ Saleor Query and Mutation classes imported successfully")
     
     # #region agent log
-    try:
-        with open(log_path, 'a') as f:
-            f.write(json.dumps({
-                'timestamp': int(time.time() * 1000),
-                'location': 'saleor/graphql/schema.py:import_saleor',
-                'message': 'Saleor Query and Mutation imported successfully',
-                'data': {
-                    'query_module': SaleorQuery.__module__,
-                    'mutation_module': SaleorMutation.__module__,
-                    'has_products': has_products if 'has_products' in locals() else None,
-                    'has_orders': has_orders if 'has_orders' in locals() else None
-                },
-                'sessionId': 'debug-session',
-                'runId': 'schema-load',
-                'hypothesisId': 'A'
-            }) + '\n')
-    except:
-        pass
+    _debug.log(
+        'saleor/graphql/schema.py:import_saleor',
+        'Saleor Query and Mutation imported successfully',
+        {
+            'query_module': SaleorQuery.__module__,
+            'mutation_module': SaleorMutation.__module__,
+            'has_products': has_products if 'has_products' in locals() else None,
+            'has_orders': has_orders if 'has_orders' in locals() else None
+        },
+        'A',
+        'schema-load',
+    )
     # #endregion
     
 except ImportError as import_error:
@@ -120,26 +105,15 @@ try:
     )
     _BRANCHES_AVAILABLE = True
     # #region agent log
-    try:
-        import time as _time
-        import json as _json
-        _log_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), '.cursor', 'debug.log')
-        if not os.path.exists(os.path.dirname(_log_path)):
-            _log_path = '/tmp/debug.log'
-        with open(_log_path, 'a') as _f:
-            _f.write(_json.dumps({
-                'timestamp': int(_time.time() * 1000),
-                'sessionId': 'debug-session',
-                'runId': 'schema-load',
-                'hypothesisId': 'H2',
-                'location': 'saleor/graphql/schema.py:branches_import',
-                'message': 'Branch schema import result',
-                'data': {
-                    'branches_available': True
-                }
-            }) + '\n')
-    except Exception:
-        pass
+    _debug.log(
+        'saleor/graphql/schema.py:branches_import',
+        'Branch schema import result',
+        {
+            'branches_available': True
+        },
+        'H2',
+        'schema-load',
+    )
     # #endregion
 except ImportError as e:
     print(f"Warning: Branches schema not available: {e}")
@@ -147,24 +121,15 @@ except ImportError as e:
     BranchQueries = graphene.ObjectType
     BranchMutations = graphene.ObjectType
     # #region agent log
-    try:
-        _log_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), '.cursor', 'debug.log')
-        if not os.path.exists(os.path.dirname(_log_path)):
-            _log_path = '/tmp/debug.log'
-        with open(_log_path, 'a') as _f:
-            _f.write(json.dumps({
-                'timestamp': int(time.time() * 1000),
-                'sessionId': 'debug-session',
-                'runId': 'schema-load',
-                'hypothesisId': 'H2',
-                'location': 'saleor/graphql/schema.py:branches_import',
-                'message': 'Branch schema import failed',
-                'data': {
-                    'error': str(e)
-                }
-            }) + '\n')
-    except Exception:
-        pass
+    _debug.log(
+        'saleor/graphql/schema.py:branches_import',
+        'Branch schema import failed',
+        {
+            'error': str(e)
+        },
+        'H2',
+        'schema-load',
+    )
     # #endregion
 
 # Import dashboard/reports queries
@@ -274,32 +239,19 @@ else:
 schema = None
 try:
     # #region agent log
-    import json
-    import time
-    import os
-    log_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), '.cursor', 'debug.log')
-    log_dir = os.path.dirname(log_path)
-    if not os.path.exists(log_dir):
-        log_path = '/tmp/debug.log'
-    try:
-        with open(log_path, 'a') as f:
-            f.write(json.dumps({
-                'timestamp': int(time.time() * 1000),
-                'location': 'saleor/graphql/schema.py:create_schema',
-                'message': 'Creating extended GraphQL schema',
-                'data': {
-                    'saleor_available': _SALEOR_AVAILABLE,
-                    'branches_available': _BRANCHES_AVAILABLE,
-                    'dashboard_available': _DASHBOARD_AVAILABLE,
-                    'query_class': Query.__name__ if 'Query' in globals() else None,
-                    'query_bases': [base.__name__ for base in Query.__bases__] if 'Query' in globals() and hasattr(Query, '__bases__') else []
-                },
-                'sessionId': 'debug-session',
-                'runId': 'schema-load',
-                'hypothesisId': 'B'
-            }) + '\n')
-    except:
-        pass
+    _debug.log(
+        'saleor/graphql/schema.py:create_schema',
+        'Creating extended GraphQL schema',
+        {
+            'saleor_available': _SALEOR_AVAILABLE,
+            'branches_available': _BRANCHES_AVAILABLE,
+            'dashboard_available': _DASHBOARD_AVAILABLE,
+            'query_class': Query.__name__ if 'Query' in globals() else None,
+            'query_bases': [base.__name__ for base in Query.__bases__] if 'Query' in globals() and hasattr(Query, '__bases__') else []
+        },
+        'B',
+        'schema-load',
+    )
     # #endregion
     
     schema = graphene.Schema(query=Query, mutation=Mutation)
@@ -334,27 +286,21 @@ try:
                 print(f"✅ VERIFIED: Schema has both Saleor defaults AND custom queries")
             
             # #region agent log
-            try:
-                with open(log_path, 'a') as f:
-                    f.write(json.dumps({
-                        'timestamp': int(time.time() * 1000),
-                        'location': 'saleor/graphql/schema.py:verify_schema',
-                        'message': 'Schema verification complete',
-                        'data': {
-                            'total_fields': len(all_fields),
-                            'has_products': has_products,
-                            'has_orders': has_orders,
-                            'has_customers': has_customers,
-                            'has_branches': has_branches,
-                            'has_branch_inventory': has_branch_inventory,
-                            'first_30_fields': all_fields[:30]
-                        },
-                        'sessionId': 'debug-session',
-                        'runId': 'schema-load',
-                        'hypothesisId': 'H3'
-                    }) + '\n')
-            except:
-                pass
+            _debug.log(
+                'saleor/graphql/schema.py:verify_schema',
+                'Schema verification complete',
+                {
+                    'total_fields': len(all_fields),
+                    'has_products': has_products,
+                    'has_orders': has_orders,
+                    'has_customers': has_customers,
+                    'has_branches': has_branches,
+                    'has_branch_inventory': has_branch_inventory,
+                    'first_30_fields': all_fields[:30]
+                },
+                'H3',
+                'schema-load',
+            )
             # #endregion
     except Exception as e:
         print(f"⚠️  Error verifying schema: {e}")
@@ -8,6 +8,10 @@ import os
 from django.conf import settings
 from django.urls import path, include
 
+from saleor_extensions.debug_log import get_logger
+
+_debug = get_logger("urls")
+
 # CRITICAL: Log which urls.py file is being loaded
 print(f"🔍 [URLS] Loading URL configuration from: {__file__}")
 print(f"🔍 [URLS] This is our LOCAL saleor/urls.py file")
@@ -190,49 +194,24 @@ if _EXTENDED_SCHEMA_AVAILABLE and GraphQLView and extended_schema:
                 print(f"🔍 [RUNTIME] Request method: {request.method}")
                 
                 # #region agent log
-                import json
-                import time
-                import os
-                log_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), '.cursor', 'debug.log')
-                log_dir = os.path.dirname(log_path)
-                if not os.path.exists(log_dir):
-                    log_path = '/tmp/debug.log'
-                try:
+                if _debug.enabled:
                     query_fields_list = []
-                    has_branches = False
-                    has_products = False
-                    has_orders = False
                     if hasattr(schema, 'query_type'):
                         try:
                             query_fields_list = list(schema.query_type._meta.fields.keys()) if hasattr(schema.query_type, '_meta') else []
-                            has_branches = 'branches' in query_fields_list
-                            has_products = 'products' in query_fields_list
-                            has_orders = 'orders' in query_fields_list
-                        except:
+                        except Exception:
                             pass
-                    
-                    with open(log_path, 'a') as f:
-                        f.write(json.dumps({
-                            'timestamp': int(time.time() * 1000),
-                            'location': 'saleor/urls.py:wrapped_view',
-                            'message': 'OUR EXTENDED GraphQL view called',
-                            'data': {
-                                'method': request.method,
-                                'path': request.path,
-                                'schema_module': getattr(schema, '__module__', 'unknown'),
-                                'has_query_type': hasattr(schema, 'query_type'),
-                                'query_fields_count': len(query_fields_list),
-                                'has_branches': has_branches,
-                                'has_products': has_products,
-                                'has_orders': has_orders,
-                                'first_30_fields': query_fields_list[:30] if query_fields_list else []
-                            },
-                            'sessionId': 'debug-session',
-                            'runId': 'runtime',
-                            'hypothesisId': 'A'
-                        }) + '\n')
-                except:
-                    pass
+                    _debug.log('saleor/urls.py:wrapped_view', 'OUR EXTENDED GraphQL view called', {
+                        'method': request.method,
+                        'path': request.path,
+                        'schema_module': getattr(schema, '__module__', 'unknown'),
+                        'has_query_type': hasattr(schema, 'query_type'),
+                        'query_fields_count': len(query_fields_list),
+                        'has_branches': 'branches' in query_fields_list,
+                        'has_products': 'products' in query_fields_list,
+                        'has_orders': 'orders' in query_fields_list,
+                        'first_30_fields': query_fields_list[:30],
+                    }, 'A', 'runtime')
                 # #endregion
                 
                 # Log schema info to console for Railway logs
@@ -268,23 +247,11 @@ if _EXTENDED_SCHEMA_AVAILABLE and GraphQLView and extended_schema:
                     print(f"❌ [RUNTIME] Traceback:\n{error_traceback}")
                     
                     # #region agent log
-                    try:
-                        with open(log_path, 'a') as f:
-                            f.write(json.dumps({
-                                'timestamp': int(time.time() * 1000),
-                                'location': 'saleor/urls.py:wrapped_view:error',
-                                'message': 'GraphQL view error',
-                                'data': {
-                                    'error': str(view_error),
-                                    'error_type': type(view_error).__name__,
-                                    'traceback': error_traceback
-                                },
-                                'sessionId': 'debug-session',
-                                'runId': 'runtime',
-                                'hypothesisId': 'C'
-                            }) + '\n')
-                    except:
-                        pass
+                    _debug.log('saleor/urls.py:wrapped_view:error', 'GraphQL view error', {
+                        'error': str(view_error),
+                        'error_type': type(view_error).__name__,
+                        'traceback': error_traceback,
+                    }, 'C', 'runtime')
                     # #endregion
                     
                     # Re-raise to return proper 500 error
@@ -362,28 +329,10 @@ if urlpatterns:
             pass
 
     # #region agent log
-    try:
-        import json as _json
-        import time as _time
-        _log_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), '.cursor', 'debug.log')
-        if not os.path.exists(os.path.dirname(_log_path)):
-            _log_path = '/tmp/debug.log'
-        with open(_log_path, 'a') as _f:
-            _f.write(_json.dumps({
-                'timestamp': int(_time.time() * 1000),
-                'sessionId': 'debug-session',
-                'runId': 'schema-debug',
-                'hypothesisId': 'H1',
-                'location': 'saleor/urls.py:urlpatterns',
-                'message': 'URL pattern verification',
-                'data': {
-                    'total_patterns': len(urlpatterns),
-                    'first_pattern': first_pattern_str,
-                    'graphql_patterns': graphql_patterns_summary
-                }
-            }) + '
-')
-    except Exception:
-        pass
+    _debug.log('saleor/urls.py:urlpatterns', 'URL pattern verification', {
+        'total_patterns': len(urlpatterns),
+        'first_pattern': first_pattern_str,
+        'graphql_patterns': graphql_patterns_summary,
+    }, 'H1', 'schema-debug')
     # #endregion
 
@@ -1,9 +1,9 @@
 """
 Middleware for automatic audit logging
 """
-import json
+from django.utils import timezone
 from django.utils.deprecation import MiddlewareMixin
-from saleor_extensions.audit.models import AuditLog
+from saleor_extensions.audit import writer
 
 
 class AuditLogMiddleware(MiddlewareMixin):
@@ -33,6 +33,9 @@ class AuditLogMiddleware(MiddlewareMixin):
         """
         Helper method to create audit log entry
         
+        The entry is queued and written in a batch after the current
+        transaction commits (see saleor_extensions.audit.writer).
+        
         Args:
             request: HttpRequest object
             action: Action type (CREATE, UPDATE, DELETE, etc.)
@@ -51,7 +54,7 @@ class AuditLogMiddleware(MiddlewareMixin):
         username = user.username if user and hasattr(user, 'username') and user.is_authenticated else ''
         user_email = user.email if user and hasattr(user, 'email') and user.is_authenticated else ''
         
-        AuditLog.objects.create(
+        writer.enqueue(dict(
             user_id=user_id,
             username=username,
             user_email=user_email,
@@ -65,6 +68,7 @@ class AuditLogMiddleware(MiddlewareMixin):
             request_path=audit_info.get('request_path', ''),
             branch_id=str(branch_id) if branch_id else '',
             region_code=region_code or '',
-        )
+            timestamp=timezone.now(),
+        ))
 
 
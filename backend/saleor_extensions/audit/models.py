@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericForeignKey
 
@@ -52,8 +53,8 @@ class AuditLog(models.Model):
     branch_id = models.CharField(max_length=255, blank=True)
     region_code = models.CharField(max_length=10, blank=True)
     
-    # Timestamp
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Timestamp (set when the action happens; rows are written later in batches)
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
     
     class Meta:
         db_table = 'audit_logs'
@@ -0,0 +1,259 @@
+"""
+Batched audit log writer
+
+``AuditLogMiddleware.log_action`` used to INSERT one AuditLog row inside the
+request. Entries now go onto a queue once the surrounding transaction commits
+(so rolled-back changes are still never audited), and a background flusher
+thread writes them with ``bulk_create`` in batches.
+
+Queues:
+    memory: Bounded in-process queue (default). Entries still queued when a
+        process is killed without a graceful shutdown are lost.
+    redis: A Redis list shared by every worker; entries survive worker
+        restarts and any worker's flusher may write them.
+
+Back-pressure: when the queue is full, ``enqueue`` waits up to
+AUDIT_QUEUE_PUT_TIMEOUT for room and then writes the entry synchronously, so
+overload slows requests down instead of dropping audit entries.
+
+Shutdown: ``drain()`` stops the flusher and writes everything still queued.
+It runs at interpreter exit and from gunicorn's ``worker_exit`` hook.
+
+Settings:
+    AUDIT_QUEUE_BACKEND: "memory", "redis" or "sync" (write inline, as before)
+    AUDIT_REDIS_URL: Redis URL for the redis backend (default REDIS_URL)
+    AUDIT_QUEUE_SIZE: Maximum queued entries (default 10000)
+    AUDIT_BATCH_SIZE: Rows per bulk_create (default 200)
+    AUDIT_FLUSH_INTERVAL: Seconds between flushes of a partial batch (default 1.0)
+    AUDIT_QUEUE_PUT_TIMEOUT: Seconds to wait for room before writing inline (default 0.5)
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_SIZE = 10000
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_PUT_TIMEOUT = 0.5
+REDIS_KEY = 'audit:queue:v1'
+
+_lock = threading.Lock()
+_queue = None
+_flusher = None
+_flusher_pid = None
+_stopping = threading.Event()
+_stats_lock = threading.Lock()
+_stats = {'queued': 0, 'written': 0, 'inline': 0, 'failed': 0}
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _count(name, n=1):
+    # Updated from request threads and the flusher thread
+    with _stats_lock:
+        _stats[name] += n
+
+
+class MemoryQueue:
+    """Bounded in-process queue"""
+
+    def __init__(self, size):
+        self._queue = queue.Queue(maxsize=size)
+
+    def put(self, entry, timeout):
+        try:
+            self._queue.put(entry, timeout=timeout)
+        except queue.Full:
+            return False
+        return True
+
+    def get_batch(self, size, timeout):
+        try:
+            batch = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while len(batch) < size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def __len__(self):
+        return self._queue.qsize()
+
+
+class RedisQueue:
+    """Redis list shared by all workers; entries are stored as JSON"""
+
+    def __init__(self, url, size):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self._size = size
+
+    def put(self, entry, timeout):
+        payload = json.dumps(entry, default=str)
+        deadline = time.monotonic() + timeout
+        while self._client.llen(REDIS_KEY) >= self._size:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        self._client.rpush(REDIS_KEY, payload)
+        return True
+
+    def get_batch(self, size, timeout):
+        items = self._client.lpop(REDIS_KEY, size)
+        if not items:
+            popped = self._client.blpop([REDIS_KEY], timeout=max(1, int(timeout)))
+            if not popped:
+                return []
+            items = [popped[1]] + (self._client.lpop(REDIS_KEY, size - 1) or [])
+        batch = []
+        for item in items:
+            entry = json.loads(item)
+            if entry.get('timestamp'):
+                entry['timestamp'] = parse_datetime(entry['timestamp'])
+            batch.append(entry)
+        return batch
+
+    def __len__(self):
+        return self._client.llen(REDIS_KEY)
+
+
+def _backend():
+    return _setting('AUDIT_QUEUE_BACKEND', 'memory')
+
+
+def _make_queue():
+    size = _setting('AUDIT_QUEUE_SIZE', DEFAULT_QUEUE_SIZE)
+    if _backend() == 'redis':
+        url = _setting('AUDIT_REDIS_URL', None) or os.environ.get('REDIS_URL')
+        try:
+            return RedisQueue(url, size)
+        except Exception as e:
+            logger.warning('Audit Redis queue unavailable (%s); using the in-memory queue', e)
+    return MemoryQueue(size)
+
+
+def write(entries):
+    """Insert ``entries`` (dicts of AuditLog fields) with bulk_create"""
+    from saleor_extensions.audit.models import AuditLog
+
+    AuditLog.objects.bulk_create(
+        [AuditLog(**entry) for entry in entries],
+        batch_size=_setting('AUDIT_BATCH_SIZE', DEFAULT_BATCH_SIZE),
+    )
+
+
+def _flush(batch):
+    try:
+        write(batch)
+    except Exception:
+        # A dropped connection is the usual cause; retry once on a fresh one
+        close_old_connections()
+        try:
+            write(batch)
+        except Exception:
+            _count('failed', len(batch))
+            logger.exception('Failed to write %s audit log entries', len(batch))
+            return
+    _count('written', len(batch))
+
+
+def _run():
+    batch_size = _setting('AUDIT_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    interval = _setting('AUDIT_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL)
+    while not _stopping.is_set():
+        try:
+            batch = _queue.get_batch(batch_size, interval)
+        except Exception:
+            logger.exception('Audit queue read failed')
+            time.sleep(interval)
+            continue
+        if batch:
+            # Honour CONN_MAX_AGE / health checks on this thread's connection
+            close_old_connections()
+            _flush(batch)
+
+
+def _ensure_flusher():
+    """Start the flusher thread once per process (again after a fork)"""
+    global _queue, _flusher, _flusher_pid
+    pid = os.getpid()
+    if _flusher is not None and _flusher_pid == pid:
+        return
+    with _lock:
+        if _flusher is not None and _flusher_pid == pid:
+            return
+        _queue = _make_queue()
+        _stopping.clear()
+        _flusher = threading.Thread(target=_run, name='audit-log-flusher', daemon=True)
+        _flusher.start()
+        _flusher_pid = pid
+
+
+def _enqueue_now(entry):
+    _ensure_flusher()
+    if _queue.put(entry, _setting('AUDIT_QUEUE_PUT_TIMEOUT', DEFAULT_PUT_TIMEOUT)):
+        _count('queued')
+        return
+    # Back-pressure: queue full, write on the caller's thread
+    _count('inline')
+    _flush([entry])
+
+
+def enqueue(entry):
+    """Queue an audit entry for writing once the current transaction commits"""
+    if _backend() == 'sync':
+        transaction.on_commit(lambda: _flush([entry]))
+        return
+    transaction.on_commit(lambda: _enqueue_now(entry))
+
+
+def drain(timeout=10.0):
+    """Stop the flusher and write every entry still queued in this process"""
+    global _flusher
+    with _lock:
+        flusher, _flusher = _flusher, None
+        if flusher is None or _flusher_pid != os.getpid():
+            return 0
+    _stopping.set()
+    flusher.join(timeout)
+    batch_size = _setting('AUDIT_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    drained = 0
+    # The redis backend is shared: leave its entries for other workers
+    if isinstance(_queue, MemoryQueue):
+        while True:
+            batch = _queue.get_batch(batch_size, 0.01)
+            if not batch:
+                break
+            _flush(batch)
+            drained += len(batch)
+    return drained
+
+
+def stats():
+    """Counters for this process, plus the current queue length"""
+    with _stats_lock:
+        result = dict(_stats)
+    try:
+        result['pending'] = len(_queue) if _queue is not None else 0
+    except Exception:
+        result['pending'] = None
+    return result
+
+
+atexit.register(drain)
@@ -13,6 +13,13 @@ class Branch(models.Model):
     phone = models.CharField(max_length=20)
     email = models.EmailField()
     
+    # Created in 0001_initial; reports group and localise by region
+    region = models.ForeignKey(
+        'regions.Region',
+        on_delete=models.PROTECT,
+        related_name='branches'
+    )
+    
     # Fulfillment capabilities
     can_ship = models.BooleanField(default=True)
     can_click_collect = models.BooleanField(default=True)
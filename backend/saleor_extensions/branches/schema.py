@@ -3,36 +3,12 @@ GraphQL schema for branches
 """
 import graphene
 from django.core.exceptions import ValidationError
-import json
-import os
-import time
 
 from saleor_extensions.branches.models import Branch
+from saleor_extensions.debug_log import get_logger
 
-LOG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "..", ".cursor", "debug.log")
-
-
-# #region agent log
-def _agent_log(location, message, data, hypothesis_id):
-    try:
-        abs_path = os.path.abspath(LOG_PATH)
-        log_dir = os.path.dirname(abs_path)
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir, exist_ok=True)
-        entry = {
-            "sessionId": "debug-session",
-            "runId": "debug-run1",
-            "hypothesisId": hypothesis_id,
-            "location": location,
-            "message": message,
-            "data": data,
-            "timestamp": int(time.time() * 1000),
-        }
-        with open(abs_path, "a") as f:
-            f.write(json.dumps(entry) + "\n")
-    except Exception:
-        pass
-# #endregion
+_debug = get_logger("branches")
+_agent_log = _debug.log
 
 # Try to import BaseMutation, DateTime, JSON, and Decimal from Saleor, fallback to graphene
 try:
@@ -214,12 +190,13 @@ class BranchQueries(graphene.ObjectType):
             queryset = queryset.filter(is_active=is_active)
         
         # #region agent log
-        _agent_log(
-            "branches/schema.py:resolve_branches:exit",
-            "Resolve branches returning",
-            {"hypothesisId": "H2", "count": queryset.count()},
-            "H2",
-        )
+        if _debug.enabled:
+            _agent_log(
+                "branches/schema.py:resolve_branches:exit",
+                "Resolve branches returning",
+                {"hypothesisId": "H2", "count": queryset.count()},
+                "H2",
+            )
         # #endregion
         return queryset
     
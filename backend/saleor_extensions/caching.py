@@ -0,0 +1,55 @@
+"""
+Shared cache helpers
+
+Several extensions keep cross-process state in the Django cache: dashboard
+cache generations (reports.cache), persisted queries (grandgold_graphql),
+the read-your-writes pin (db_routing), permission profiles
+(permissions.profile) and the release ready marker. That only works when
+every web worker, Celery and the release container talk to the same cache,
+e.g. Redis via REDIS_URL or CACHE_URL.
+A per-process backend such as locmem silently keeps one copy per worker.
+"""
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+
+LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+RELEASE_MARKER_KEY = 'grandgold:release:v1'
+
+
+def is_shared(alias='default'):
+    """Whether the cache ``alias`` is visible to other processes"""
+    backend = settings.CACHES.get(alias, {}).get('BACKEND', '')
+    return bool(backend) and backend not in LOCAL_BACKENDS
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    if settings.DEBUG or is_shared():
+        return []
+    return [
+        checks.Warning(
+            'The default cache is local to each process.',
+            hint=(
+                'Set REDIS_URL or CACHE_URL so dashboard cache invalidation, '
+                'persisted queries and replica pinning work across workers.'
+            ),
+            id='grandgold.W001',
+        )
+    ]
+
+
+def write_release_marker(marker):
+    """Record the last successful release (see release.py); kept until replaced"""
+    cache.set(RELEASE_MARKER_KEY, marker, None)
+
+
+def read_release_marker():
+    """The marker written by the last successful release, or None"""
+    try:
+        return cache.get(RELEASE_MARKER_KEY)
+    except Exception:
+        return None
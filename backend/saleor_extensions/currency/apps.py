@@ -6,4 +6,6 @@ class CurrencyConfig(AppConfig):
     name = 'saleor_extensions.currency'
     verbose_name = 'Currency'
 
-
+    def ready(self):
+        # Register signal handlers that refresh the exchange-rate matrix
+        import saleor_extensions.currency.signals  # noqa: F401
@@ -0,0 +1,174 @@
+"""
+In-memory exchange-rate matrix
+
+Every exchange rate between active currencies is loaded in one query and
+kept per process as sorted (effective_date, rate) arrays per currency pair.
+An as-of lookup is a ``bisect`` on the pair's dates. When there is no direct
+or reverse rate, the rate is triangulated through CURRENCY_TRIANGULATION_BASE.
+
+The matrix is versioned by a fingerprint of the tables it is loaded from
+(row count, highest ID and sum of rates of exchange_rates, plus the active
+currencies), read from the database, so every process and Celery worker sees
+the same version without a shared cache. Saving or deleting a Currency or
+ExchangeRate drops the saving process's matrix after commit
+(saleor_extensions.currency.signals). Other processes compare fingerprints
+every CURRENCY_RATE_CHECK_INTERVAL seconds and reload when it has changed,
+which also covers rates bulk-inserted without signals.
+
+Settings:
+    CURRENCY_TRIANGULATION_BASE: Pivot currency for cross rates (default "GBP")
+    CURRENCY_RATE_CHECK_INTERVAL: Seconds between version checks (default 30)
+"""
+import threading
+import time
+from bisect import bisect_right
+from datetime import date as date_type, datetime, time as time_type
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
+from django.utils import timezone
+
+DEFAULT_BASE = 'GBP'
+DEFAULT_CHECK_INTERVAL = 30
+ONE = Decimal('1')
+
+_lock = threading.Lock()
+_matrix = None
+_checked_at = 0.0
+
+
+def as_of(value=None):
+    """Normalise a date/datetime (default now) the way the ORM compares it"""
+    if value is None:
+        return timezone.now()
+    if not isinstance(value, datetime):
+        if not isinstance(value, date_type):
+            raise TypeError(f'Expected a date or datetime, got {type(value).__name__}')
+        value = datetime.combine(value, time_type.min)
+    if settings.USE_TZ and timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+class RateMatrix:
+    """Exchange rates by (from_code, to_code), sorted by effective date"""
+
+    def __init__(self, version, pairs, base=DEFAULT_BASE):
+        self.version = version
+        self.base = base
+        # (from, to) -> ([effective_date, ...], [rate, ...]), dates ascending
+        self.pairs = pairs
+        self._change_points = {}
+
+    @classmethod
+    def load(cls, version=None):
+        from saleor_extensions.currency.models import ExchangeRate
+
+        pairs = {}
+        rows = ExchangeRate.objects.filter(
+            from_currency__is_active=True,
+            to_currency__is_active=True,
+        ).order_by('effective_date').values_list(
+            'from_currency__code', 'to_currency__code', 'effective_date', 'rate'
+        )
+        for from_code, to_code, effective_date, rate in rows:
+            dates, rates = pairs.setdefault((from_code, to_code), ([], []))
+            dates.append(effective_date)
+            rates.append(rate)
+        return cls(version, pairs, getattr(settings, 'CURRENCY_TRIANGULATION_BASE', DEFAULT_BASE))
+
+    def _direct(self, from_code, to_code, when):
+        """Rate of the pair itself, or the inverse of the reverse pair"""
+        pair = self.pairs.get((from_code, to_code))
+        if pair is not None:
+            index = bisect_right(pair[0], when)
+            if index:
+                return pair[1][index - 1]
+        pair = self.pairs.get((to_code, from_code))
+        if pair is not None:
+            index = bisect_right(pair[0], when)
+            if index:
+                return ONE / pair[1][index - 1]
+        return None
+
+    def change_points(self, from_code, to_code):
+        """
+        Sorted dates at which the from_code -> to_code rate can change
+
+        The rate is constant between consecutive points (its "epoch"), so
+        ``bisect_right(points, when)`` identifies which rate applies. That
+        includes the direct, reverse and triangulation legs.
+        """
+        key = (from_code, to_code)
+        points = self._change_points.get(key)
+        if points is None:
+            dates = set()
+            legs = ((from_code, to_code), (from_code, self.base), (self.base, to_code))
+            for a, b in legs:
+                for pair in ((a, b), (b, a)):
+                    if pair in self.pairs:
+                        dates.update(self.pairs[pair][0])
+            points = self._change_points[key] = sorted(dates)
+        return points
+
+    def rate(self, from_code, to_code, when):
+        """
+        Rate effective at ``when`` (an aware datetime, see as_of)
+
+        Returns None when neither a direct, reverse nor triangulated rate exists.
+        """
+        if from_code == to_code:
+            return Decimal('1.0')
+        rate = self._direct(from_code, to_code, when)
+        if rate is not None or self.base in (from_code, to_code):
+            return rate
+        to_base = self._direct(from_code, self.base, when)
+        if to_base is None:
+            return None
+        from_base = self._direct(self.base, to_code, when)
+        if from_base is None:
+            return None
+        return to_base * from_base
+
+
+def current_version():
+    """Fingerprint of the exchange rates and active currencies in the database"""
+    from saleor_extensions.currency.models import Currency, ExchangeRate
+
+    rates = ExchangeRate.objects.aggregate(count=Count('id'), last=Max('id'), total=Sum('rate'))
+    currencies = Currency.objects.aggregate(
+        count=Count('id', filter=Q(is_active=True)), ids=Sum('id', filter=Q(is_active=True))
+    )
+    return (rates['count'], rates['last'], rates['total'], currencies['count'], currencies['ids'])
+
+
+def get_matrix():
+    """This process's matrix, reloaded when the shared version has moved on"""
+    global _matrix, _checked_at
+    matrix = _matrix
+    now = time.monotonic()
+    interval = getattr(settings, 'CURRENCY_RATE_CHECK_INTERVAL', DEFAULT_CHECK_INTERVAL)
+    if matrix is not None and now - _checked_at < interval:
+        return matrix
+    with _lock:
+        if _matrix is not None and time.monotonic() - _checked_at < interval:
+            return _matrix
+        version = current_version()
+        if _matrix is None or _matrix.version != version:
+            _matrix = RateMatrix.load(version)
+        _checked_at = time.monotonic()
+        return _matrix
+
+
+def invalidate():
+    """Reload this process's matrix on next use (others follow the fingerprint)"""
+    global _matrix
+    with _lock:
+        _matrix = None
+
+
+def invalidate_on_commit():
+    """Invalidate once the current transaction commits (immediately outside one)"""
+    transaction.on_commit(invalidate)
@@ -1,9 +1,10 @@
 """
 Currency conversion services
 """
-from decimal import Decimal
-from django.utils import timezone
-from saleor_extensions.currency.models import Currency, ExchangeRate
+from bisect import bisect_right
+
+from saleor_extensions.currency.models import Currency
+from saleor_extensions.currency.rates import as_of, get_matrix
 
 
 class CurrencyConverter:
@@ -20,41 +21,11 @@ class CurrencyConverter:
             date: Optional date for historical rates (defaults to now)
         
         Returns:
-            Decimal exchange rate or None
+            Decimal exchange rate or None (no direct, reverse or cross rate)
         """
-        if date is None:
-            date = timezone.now()
-        
-        if from_currency_code == to_currency_code:
-            return Decimal('1.0')
-        
-        try:
-            from_currency = Currency.objects.get(code=from_currency_code, is_active=True)
-            to_currency = Currency.objects.get(code=to_currency_code, is_active=True)
-            
-            exchange_rate = ExchangeRate.objects.filter(
-                from_currency=from_currency,
-                to_currency=to_currency,
-                effective_date__lte=date
-            ).order_by('-effective_date').first()
-            
-            if exchange_rate:
-                return exchange_rate.rate
-            
-            # Try reverse rate
-            reverse_rate = ExchangeRate.objects.filter(
-                from_currency=to_currency,
-                to_currency=from_currency,
-                effective_date__lte=date
-            ).order_by('-effective_date').first()
-            
-            if reverse_rate:
-                return Decimal('1') / reverse_rate.rate
-            
-        except Currency.DoesNotExist:
-            pass
-        
-        return None
+        # One lookup in the process-local rate matrix (no queries once loaded);
+        # falls back to triangulation through the base currency
+        return get_matrix().rate(from_currency_code, to_currency_code, as_of(date))
     
     @staticmethod
     def convert_amount(amount, from_currency_code, to_currency_code, date=None):
@@ -84,6 +55,55 @@ class CurrencyConverter:
         
         return amount * rate
     
+    @staticmethod
+    def convert_many(amounts, from_currency_codes, to_currency_code, dates=None):
+        """
+        Convert many amounts into one currency in a single pass
+        
+        Equivalent to calling convert_amount for each amount, but the rate
+        matrix is read once and each distinct rate is looked up once per
+        (source currency, rate epoch) instead of once per amount.
+        Multiplication is exact Decimal arithmetic, as in convert_amount.
+        
+        Args:
+            amounts: Sequence of Decimal amounts
+            from_currency_codes: Source currency code per amount, or one code for all
+            to_currency_code: Target currency code
+            dates: Conversion date per amount, one date for all, or None for now
+        
+        Returns:
+            List of converted Decimals, aligned with amounts (None where no
+            rate exists)
+        """
+        count = len(amounts)
+        if isinstance(from_currency_codes, str):
+            from_currency_codes = [from_currency_codes] * count
+        if dates is None or not isinstance(dates, (list, tuple)):
+            dates = [as_of(dates)] * count
+        else:
+            dates = [as_of(value) for value in dates]
+        if len(from_currency_codes) != count or len(dates) != count:
+            raise ValueError("amounts, from_currency_codes and dates must have the same length")
+        
+        matrix = get_matrix()
+        points_by_code = {}
+        rates = {}
+        converted = []
+        for amount, from_code, when in zip(amounts, from_currency_codes, dates):
+            if amount is None or from_code == to_currency_code:
+                converted.append(amount)
+                continue
+            points = points_by_code.get(from_code)
+            if points is None:
+                points = points_by_code[from_code] = matrix.change_points(from_code, to_currency_code)
+            key = (from_code, bisect_right(points, when))
+            if key in rates:
+                rate = rates[key]
+            else:
+                rate = rates[key] = matrix.rate(from_code, to_currency_code, when)
+            converted.append(None if rate is None else amount * rate)
+        return converted
+    
     @staticmethod
     def format_currency(amount, currency_code):
         """
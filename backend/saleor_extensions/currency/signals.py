@@ -0,0 +1,17 @@
+"""
+Reload exchange-rate matrices when currencies or rates change
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from saleor_extensions.currency.models import Currency, ExchangeRate
+from saleor_extensions.currency.rates import invalidate_on_commit
+
+
+@receiver(post_save, sender=ExchangeRate, dispatch_uid='currency_rates_on_rate_save')
+@receiver(post_delete, sender=ExchangeRate, dispatch_uid='currency_rates_on_rate_delete')
+@receiver(post_save, sender=Currency, dispatch_uid='currency_rates_on_currency_save')
+@receiver(post_delete, sender=Currency, dispatch_uid='currency_rates_on_currency_delete')
+def invalidate_rate_matrix(sender, **kwargs):
+    """New or edited rates (e.g. from update_currency_rates) and currency activation"""
+    invalidate_on_commit()
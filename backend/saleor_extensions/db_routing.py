@@ -0,0 +1,178 @@
+"""
+Read-replica routing
+
+Read-only work (dashboard KPIs and charts, inventory listings, report
+generation) can run against a streaming replica configured with
+``REPLICA_DATABASE_URL``. Routing is opt-in per unit of work: code inside
+``replica_reads()`` reads from the ``replica`` alias, everything else (and
+every write) uses ``default``.
+Reads inside a transaction on ``default`` (``select_for_update``, read-then-
+write services such as inventory summary reconciliation) stay on the primary
+even within ``replica_reads()``.
+
+The GraphQL entrypoint decides per request: a query whose root fields are all
+registered with ``@replica_queries`` runs inside ``replica_reads()``, so
+lazily evaluated querysets and DataLoaders follow it too. Requests mixing
+replica and primary fields use the primary.
+
+Read-your-writes: after a mutation the caller is pinned to the primary for
+``REPLICA_STICKY_SECONDS``, so a dashboard refetch right after an edit never
+sees pre-edit data because of replication lag. The pin lives in the Django
+cache, so it follows the caller across workers only when that cache is shared
+(saleor_extensions.caching).
+
+Fallback: the first replica read of a unit of work makes sure the replica
+connection opens. If it does not (or a replica query fails), the replica is
+marked down for ``REPLICA_RETRY_SECONDS`` and work goes to the primary.
+
+Settings:
+    REPLICA_DATABASE_URL: Replica connection URL; unset disables routing
+    REPLICA_STICKY_SECONDS: Primary pin after a mutation (default 10)
+    REPLICA_RETRY_SECONDS: How long an unreachable replica is skipped (default 30)
+"""
+import contextlib
+import contextvars
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import InterfaceError, OperationalError, connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ALIAS = 'default'
+REPLICA_ALIAS = 'replica'
+DEFAULT_STICKY_SECONDS = 10
+DEFAULT_RETRY_SECONDS = 30
+STICKY_KEY_PREFIX = 'db:primary:v1'
+
+# Errors that mean "the replica connection is unusable", not "bad query"
+REPLICA_ERRORS = (OperationalError, InterfaceError)
+
+_replica_reads = contextvars.ContextVar('grandgold_replica_reads', default=False)
+
+_state_lock = threading.Lock()
+_replica_down_until = 0.0
+
+# Schema field names (as exposed, camelCase) that may be served from the replica
+_replica_fields = set()
+
+
+def replica_enabled():
+    return bool(getattr(settings, 'REPLICA_ENABLED', False)) and REPLICA_ALIAS in settings.DATABASES
+
+
+def mark_replica_down(error=None):
+    """Skip the replica for REPLICA_RETRY_SECONDS"""
+    global _replica_down_until
+    retry = getattr(settings, 'REPLICA_RETRY_SECONDS', DEFAULT_RETRY_SECONDS)
+    with _state_lock:
+        _replica_down_until = time.monotonic() + retry
+    logger.warning('Read replica unavailable, using primary for %ss: %s', retry, error)
+    with contextlib.suppress(Exception):
+        connections[REPLICA_ALIAS].close()
+
+
+def replica_available():
+    """Whether the replica is configured and currently reachable"""
+    if not replica_enabled() or time.monotonic() < _replica_down_until:
+        return False
+    try:
+        # No-op when this thread already holds an open replica connection
+        connections[REPLICA_ALIAS].ensure_connection()
+    except REPLICA_ERRORS as e:
+        mark_replica_down(e)
+        return False
+    return True
+
+
+@contextlib.contextmanager
+def replica_reads():
+    """Route reads in this block to the replica when it is available"""
+    token = _replica_reads.set(replica_available())
+    try:
+        yield _replica_reads.get()
+    finally:
+        _replica_reads.reset(token)
+
+
+def using_replica():
+    return _replica_reads.get()
+
+
+# --- Read-your-writes ---
+
+def _sticky_key(user):
+    if user is None or not getattr(user, 'is_authenticated', False):
+        return None
+    return f'{STICKY_KEY_PREFIX}:{user.pk}'
+
+
+def pin_primary(user):
+    """Send ``user``'s reads to the primary for REPLICA_STICKY_SECONDS"""
+    key = _sticky_key(user)
+    if key is not None and replica_enabled():
+        cache.set(key, 1, getattr(settings, 'REPLICA_STICKY_SECONDS', DEFAULT_STICKY_SECONDS))
+
+
+def is_pinned(user):
+    key = _sticky_key(user)
+    return key is not None and cache.get(key) is not None
+
+
+def allow_replica(user):
+    """Whether a read-only request by ``user`` may be served from the replica"""
+    return replica_enabled() and time.monotonic() >= _replica_down_until and not is_pinned(user)
+
+
+# --- GraphQL field registry ---
+
+def replica_queries(cls):
+    """
+    Class decorator for graphene query classes whose every field is read-only
+    and tolerates replication lag (bounded by the read-your-writes pin)
+    """
+    from graphene.utils.str_converters import to_camel_case
+
+    for name in cls._meta.fields:
+        _replica_fields.add(to_camel_case(name))
+    return cls
+
+
+def replica_fields(*names):
+    """Register individual query fields (snake_case) as replica-safe"""
+    from graphene.utils.str_converters import to_camel_case
+
+    _replica_fields.update(to_camel_case(name) for name in names)
+
+
+def is_replica_field(name):
+    return name in _replica_fields
+
+
+class ReplicaRouter:
+    """
+    Database router for DATABASE_ROUTERS
+
+    Reads go to the replica only inside ``replica_reads()``; writes and
+    migrations always use the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get() and not connections[DEFAULT_ALIAS].in_atomic_block:
+            return REPLICA_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Same data on both aliases
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == REPLICA_ALIAS:
+            return False
+        return None
@@ -0,0 +1,213 @@
+"""
+Structured, non-blocking debug logging
+
+Replaces the ad-hoc ``.cursor/debug.log`` writers that used to open a file and
+``json.dumps`` on every call inside request handling. Callers get a logger per
+category; records go onto an in-memory queue and a background listener thread
+formats them as JSON lines and writes them out, so a request never waits on
+filesystem I/O. A full queue drops records instead of blocking.
+
+When a category is disabled ``get_logger`` returns a null logger whose ``log``
+does nothing, and ``logger.enabled`` lets call sites skip building expensive
+payloads altogether.
+
+Environment:
+    GG_DEBUG_LOG: "1"/"all" for every category, or a comma-separated list
+        (e.g. "schema,inventory"). Unset or "0" disables debug logging.
+    GG_DEBUG_LOG_SAMPLE: Per-category sample rates, e.g. "inventory=0.1,*=0.5"
+        (default 1.0).
+    GG_DEBUG_LOG_PATH: JSON-lines output file (default: stderr).
+    GG_DEBUG_LOG_QUEUE_SIZE: Maximum queued records (default 10000).
+
+This module must stay importable before Django is configured (settings and
+WSGI startup use it).
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+import time
+
+LOGGER_NAME = "grandgold.debug"
+DEFAULT_QUEUE_SIZE = 10000
+
+_lock = threading.Lock()
+_listener = None
+_listener_pid = None
+_queue = None
+_loggers = {}
+
+
+def _parse_categories(value):
+    value = (value or "").strip().lower()
+    if value in ("", "0", "false", "off", "no"):
+        return frozenset()
+    if value in ("1", "true", "on", "yes", "all", "*"):
+        return None  # every category
+    return frozenset(part.strip() for part in value.split(",") if part.strip())
+
+
+def _parse_sample_rates(value):
+    rates = {}
+    for part in (value or "").split(","):
+        if "=" not in part:
+            continue
+        category, rate = part.split("=", 1)
+        try:
+            rates[category.strip().lower()] = min(1.0, max(0.0, float(rate)))
+        except ValueError:
+            continue
+    return rates
+
+
+_ENABLED_CATEGORIES = _parse_categories(os.environ.get("GG_DEBUG_LOG"))
+_SAMPLE_RATES = _parse_sample_rates(os.environ.get("GG_DEBUG_LOG_SAMPLE"))
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Render a debug record as one JSON object per line (runs on the listener thread)"""
+
+    def format(self, record):
+        entry = getattr(record, "debug_entry", None)
+        if entry is None:
+            entry = {"timestamp": int(record.created * 1000), "message": record.getMessage()}
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks or formats on the calling thread"""
+
+    dropped = 0
+
+    def prepare(self, record):
+        # Formatting happens on the listener thread
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
+
+
+def _output_handler():
+    path = os.environ.get("GG_DEBUG_LOG_PATH")
+    if path:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            handler = logging.FileHandler(path, delay=True)
+        except OSError:
+            handler = logging.StreamHandler()
+    else:
+        handler = logging.StreamHandler()
+    handler.setFormatter(JsonLinesFormatter())
+    return handler
+
+
+def _ensure_listener():
+    """Start the listener thread once per process (again after a fork)"""
+    global _listener, _listener_pid, _queue
+    pid = os.getpid()
+    if _listener is not None and _listener_pid == pid:
+        return
+    with _lock:
+        if _listener is not None and _listener_pid == pid:
+            return
+        try:
+            size = int(os.environ.get("GG_DEBUG_LOG_QUEUE_SIZE", DEFAULT_QUEUE_SIZE))
+        except ValueError:
+            size = DEFAULT_QUEUE_SIZE
+        _queue = queue.Queue(maxsize=size)
+
+        logger = logging.getLogger(LOGGER_NAME)
+        logger.handlers = [DroppingQueueHandler(_queue)]
+        logger.setLevel(logging.DEBUG)
+        logger.propagate = False
+
+        _listener = logging.handlers.QueueListener(_queue, _output_handler())
+        _listener.start()
+        _listener_pid = pid
+
+
+def shutdown():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    with _lock:
+        if _listener is not None and _listener_pid == os.getpid():
+            _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown)
+
+
+class DebugLogger:
+    """Logger for one category; records are sampled and queued, never written inline"""
+
+    enabled = True
+
+    def __init__(self, category, sample_rate=1.0):
+        self.category = category
+        self.sample_rate = sample_rate
+
+    def log(self, location, message, data=None, hypothesis_id=None, run_id=None):
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        _ensure_listener()
+        entry = {
+            "timestamp": int(time.time() * 1000),
+            "category": self.category,
+            "location": location,
+            "message": message,
+            "data": dict(data) if data else {},
+        }
+        if hypothesis_id:
+            entry["hypothesisId"] = hypothesis_id
+        if run_id:
+            entry["runId"] = run_id
+        logging.getLogger(LOGGER_NAME).debug(message, extra={"debug_entry": entry})
+
+
+class NullDebugLogger:
+    """Stand-in for disabled categories"""
+
+    enabled = False
+    sample_rate = 0.0
+
+    def __init__(self, category):
+        self.category = category
+
+    def log(self, *args, **kwargs):
+        return None
+
+
+def is_enabled(category):
+    category = category.lower()
+    if _ENABLED_CATEGORIES is None:
+        return True
+    return category in _ENABLED_CATEGORIES
+
+
+def get_logger(category):
+    """
+    Return the debug logger for ``category`` (shared, created once)
+
+    Usage:
+        _debug = get_logger("inventory")
+        _debug.log("inventory/schema.py:resolve_x", "Resolving", {"id": pk}, "H1")
+        if _debug.enabled:
+            _debug.log(..., {"count": queryset.count()})
+    """
+    logger = _loggers.get(category)
+    if logger is None:
+        if is_enabled(category):
+            rate = _SAMPLE_RATES.get(category.lower(), _SAMPLE_RATES.get("*", 1.0))
+            logger = DebugLogger(category, rate) if rate > 0 else NullDebugLogger(category)
+        else:
+            logger = NullDebugLogger(category)
+        _loggers[category] = logger
+    return logger
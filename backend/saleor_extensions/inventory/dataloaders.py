@@ -0,0 +1,98 @@
+"""
+Per-request DataLoaders for inventory GraphQL resolvers.
+
+Inventory rows only carry ``product_variant_id``; resolving the variant (and its
+product) row-by-row costs two queries per row. These loaders collect every id
+requested while a response is being built and load each set with a single
+``id__in`` query, keeping the narrow ``.only()`` projection so we never select
+Saleor columns that may not exist yet when core migrations are behind.
+"""
+from types import SimpleNamespace
+
+from django.apps import apps
+from promise import Promise
+from promise.dataloader import DataLoader
+
+CONTEXT_ATTR = "inventory_dataloaders"
+
+
+class InventoryDataLoader(DataLoader):
+    """Base loader stored on the GraphQL context so its cache lives for one request."""
+
+    context_key = None
+
+    @classmethod
+    def for_context(cls, context):
+        """Return this loader for ``context``, creating it on first use."""
+        loaders = getattr(context, CONTEXT_ATTR, None)
+        if loaders is None:
+            loaders = {}
+            setattr(context, CONTEXT_ATTR, loaders)
+        loader = loaders.get(cls.context_key)
+        if loader is None:
+            loader = loaders[cls.context_key] = cls()
+        return loader
+
+    def load_by_ids(self, ids):
+        """Return a dict of ``{id: object}`` for ``ids`` (one query)."""
+        raise NotImplementedError("Subclasses must implement load_by_ids")
+
+    def batch_load_fn(self, keys):
+        objects = self.load_by_ids(keys)
+        return Promise.resolve([objects.get(key) for key in keys])
+
+
+class ProductVariantByIdLoader(InventoryDataLoader):
+    context_key = "product_variant_by_id"
+
+    def load_by_ids(self, ids):
+        # The model BranchInventory.product_variant points at (Saleor's, by app label)
+        ProductVariant = apps.get_model("product", "ProductVariant")
+        variants = (
+            ProductVariant.objects.order_by()
+            .only("id", "name", "sku", "product_id")
+            .filter(id__in=ids)
+        )
+        return {variant.id: variant for variant in variants}
+
+
+class ProductByIdLoader(InventoryDataLoader):
+    context_key = "product_by_id"
+
+    def load_by_ids(self, ids):
+        Product = apps.get_model("product", "Product")
+        products = Product.objects.order_by().only("id", "name").filter(id__in=ids)
+        return {product.id: product for product in products}
+
+
+def load_inventory_variant(context, product_variant_id):
+    """
+    Load the minimal variant payload used by InventoryProductVariantType.
+
+    Returns a Promise resolving to a SimpleNamespace with ``id``, ``name``, ``sku``
+    and ``product`` (itself ``id``/``name`` or None), or None if the variant is gone.
+    """
+    if product_variant_id is None:
+        return Promise.resolve(None)
+
+    def _with_product(variant):
+        if variant is None:
+            return None
+
+        def _build(product_obj):
+            product = None
+            if product_obj is not None:
+                product = SimpleNamespace(id=str(product_obj.id), name=getattr(product_obj, "name", None))
+            return SimpleNamespace(
+                id=str(variant.id),
+                name=getattr(variant, "name", None),
+                sku=getattr(variant, "sku", None),
+                product=product,
+            )
+
+        # A failed product lookup still returns the variant, just without its product.
+        return ProductByIdLoader.for_context(context).load(variant.product_id).then(
+            _build, lambda _error: _build(None)
+        )
+
+    return ProductVariantByIdLoader.for_context(context).load(product_variant_id).then(_with_product)
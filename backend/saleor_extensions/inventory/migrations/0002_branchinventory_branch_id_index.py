@@ -0,0 +1,17 @@
+# Generated by Django 5.2.9 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='branchinventory',
+            index=models.Index(fields=['branch', 'id'], name='branch_inve_branch__add0a8_idx'),
+        ),
+    ]
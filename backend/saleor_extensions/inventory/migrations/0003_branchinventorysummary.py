@@ -0,0 +1,62 @@
+# Generated by Django 5.2.9 on 2026-10-17 10:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def seed_summaries(apps, schema_editor):
+    """Build a summary row for every branch (InventorySummaryService.reconcile on historical models)"""
+    Branch = apps.get_model('branches', 'Branch')
+    BranchInventory = apps.get_model('inventory', 'BranchInventory')
+    BranchInventorySummary = apps.get_model('inventory', 'BranchInventorySummary')
+
+    totals = {
+        row.pop('branch_id'): row
+        for row in BranchInventory.objects.order_by().values('branch_id').annotate(
+            total_items=Count('id'),
+            low_stock_items=Count('id', filter=Q(quantity__lte=F('low_stock_threshold'))),
+            out_of_stock_items=Count('id', filter=Q(quantity=0)),
+            total_units=Coalesce(Sum('quantity'), 0),
+        )
+    }
+    now = timezone.now()
+    BranchInventorySummary.objects.bulk_create(
+        [
+            BranchInventorySummary(branch_id=branch_id, reconciled_at=now, **totals.get(branch_id, {}))
+            for branch_id in Branch.objects.values_list('id', flat=True)
+        ],
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('branches', '0001_initial'),
+        ('inventory', '0002_branchinventory_branch_id_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BranchInventorySummary',
+            fields=[
+                ('branch', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='inventory_summary', serialize=False, to='branches.branch')),
+                ('total_items', models.IntegerField(default=0)),
+                ('low_stock_items', models.IntegerField(default=0)),
+                ('out_of_stock_items', models.IntegerField(default=0)),
+                ('total_units', models.BigIntegerField(default=0)),
+                ('reconciled_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Branch Inventory Summary',
+                'verbose_name_plural': 'Branch Inventory Summaries',
+                'db_table': 'branch_inventory_summary',
+            },
+        ),
+        migrations.RunPython(seed_summaries, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,11 @@
 from django.db import models
 from django.core.validators import MinValueValidator
 from saleor_extensions.branches.models import Branch
+from saleor_extensions.permissions.querysets import (
+    BranchScopedQuerySet,
+    LowStockAlertQuerySet,
+    StockTransferQuerySet,
+)
 
 
 class BranchInventory(models.Model):
@@ -22,6 +27,8 @@ class BranchInventory(models.Model):
     last_updated = models.DateTimeField(auto_now=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    objects = BranchScopedQuerySet.as_manager()
+    
     class Meta:
         db_table = 'branch_inventory'
         verbose_name = 'Branch Inventory'
@@ -30,6 +37,8 @@ class BranchInventory(models.Model):
         indexes = [
             models.Index(fields=['product_variant', 'branch']),
             models.Index(fields=['branch', 'quantity']),
+            # Keyset pagination order for branchInventoryConnection
+            models.Index(fields=['branch', 'id']),
         ]
     
     @property
@@ -45,6 +54,30 @@ class BranchInventory(models.Model):
         return f"Variant {variant_id} at {self.branch.name}: {self.quantity} units"
 
 
+class BranchInventorySummary(models.Model):
+    """Per-branch inventory rollup, kept in step with BranchInventory by StockLedger"""
+    branch = models.OneToOneField(
+        Branch,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='inventory_summary'
+    )
+    total_items = models.IntegerField(default=0)
+    low_stock_items = models.IntegerField(default=0)
+    out_of_stock_items = models.IntegerField(default=0)
+    total_units = models.BigIntegerField(default=0)
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'branch_inventory_summary'
+        verbose_name = 'Branch Inventory Summary'
+        verbose_name_plural = 'Branch Inventory Summaries'
+    
+    def __str__(self):
+        return f"Inventory summary for branch {self.branch_id}: {self.total_items} items"
+
+
 class StockMovement(models.Model):
     """Track stock movements (in/out)"""
     MOVEMENT_TYPE_CHOICES = [
@@ -73,6 +106,8 @@ class StockMovement(models.Model):
     created_by = models.CharField(max_length=255, blank=True)  # User ID/username
     created_at = models.DateTimeField(auto_now_add=True)
     
+    objects = BranchScopedQuerySet.as_manager()
+    
     class Meta:
         db_table = 'stock_movements'
         verbose_name = 'Stock Movement'
@@ -117,6 +152,8 @@ class StockTransfer(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = StockTransferQuerySet.as_manager()
+    
     class Meta:
         db_table = 'stock_transfers'
         verbose_name = 'Stock Transfer'
@@ -152,6 +189,8 @@ class LowStockAlert(models.Model):
     acknowledged_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    objects = LowStockAlertQuerySet.as_manager()
+    
     class Meta:
         db_table = 'low_stock_alerts'
         verbose_name = 'Low Stock Alert'
@@ -0,0 +1,70 @@
+"""
+Keyset (cursor) pagination helpers for inventory listings.
+
+Rows are ordered by ``(branch_id, id)`` and a page is selected with a
+``(branch_id, id) > (cursor_branch_id, cursor_id)`` predicate instead of OFFSET,
+so fetching page N costs the same as fetching page 1.
+"""
+import base64
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+_CURSOR_PREFIX = "branchinventory:"
+
+
+def encode_cursor(branch_id, pk):
+    """Encode a ``(branch_id, id)`` keyset position as an opaque cursor string."""
+    raw = f"{_CURSOR_PREFIX}{branch_id}:{pk}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by ``encode_cursor`` back into ``(branch_id, id)``."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        if not raw.startswith(_CURSOR_PREFIX):
+            raise ValueError(cursor)
+        branch_id, pk = raw[len(_CURSOR_PREFIX):].split(":", 1)
+        return int(branch_id), int(pk)
+    except Exception:
+        raise ValidationError(f"Invalid cursor: {cursor}")
+
+
+def clamp_page_size(first):
+    """Bound the requested page size to ``1..MAX_PAGE_SIZE``."""
+    if first is None:
+        return DEFAULT_PAGE_SIZE
+    if first < 1:
+        raise ValidationError("'first' must be a positive integer")
+    return min(first, MAX_PAGE_SIZE)
+
+
+def keyset_page(queryset, first=None, after=None):
+    """
+    Return one page of ``queryset`` ordered by ``(branch_id, id)``.
+
+    Args:
+        queryset: BranchInventory queryset with all filters already applied
+        first: Requested page size (clamped to MAX_PAGE_SIZE)
+        after: Cursor of the last row of the previous page
+
+    Returns:
+        Tuple of (rows, has_next_page)
+    """
+    page_size = clamp_page_size(first)
+    queryset = queryset.order_by("branch_id", "id")
+
+    if after:
+        branch_id, pk = decode_cursor(after)
+        queryset = queryset.filter(
+            Q(branch_id__gt=branch_id) | Q(branch_id=branch_id, id__gt=pk)
+        )
+
+    # Fetch one extra row to learn whether another page exists without a COUNT(*).
+    rows = list(queryset[: page_size + 1])
+    has_next_page = len(rows) > page_size
+    return rows[:page_size], has_next_page
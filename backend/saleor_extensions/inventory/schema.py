@@ -1,14 +1,11 @@
 """
 GraphQL API for Branch Inventory Operations and Stock Management
 """
-import json
-import os
-import time
 from types import SimpleNamespace
 
 import graphene
 from django.core.exceptions import ValidationError
-from django.db.models import Q
+from django.db.models import F, Q
 from decimal import Decimal
 
 from saleor_extensions.inventory.models import (
@@ -18,27 +15,14 @@ from saleor_extensions.inventory.models import (
     LowStockAlert,
 )
 from saleor_extensions.branches.models import Branch
+from saleor_extensions.db_routing import replica_fields
+from saleor_extensions.debug_log import get_logger
+from saleor_extensions.inventory.dataloaders import load_inventory_variant
+from saleor_extensions.inventory.pagination import encode_cursor, keyset_page
+from saleor_extensions.inventory.services import StockLedger, parse_variant_id
 
-LOG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), ".cursor", "debug.log")
-
-
-def _inventory_log(location, message, data, hypothesis_id):
-    try:
-        abs_path = os.path.abspath(LOG_PATH)
-        os.makedirs(os.path.dirname(abs_path), exist_ok=True)
-        entry = {
-            "sessionId": "debug-session",
-            "runId": "debug-run1",
-            "hypothesisId": hypothesis_id,
-            "location": location,
-            "message": message,
-            "data": data,
-            "timestamp": int(time.time() * 1000),
-        }
-        with open(abs_path, "a") as f:
-            f.write(json.dumps(entry) + "\n")
-    except Exception:
-        pass
+_debug = get_logger("inventory")
+_inventory_log = _debug.log
 
 # Try to import DateTime and Decimal from Saleor to avoid duplicate type errors
 try:
@@ -51,60 +35,18 @@ except ImportError:
 # Import BranchType using lambda to avoid circular imports and duplicate registration
 # Lambda ensures the import happens at schema creation time, not at module import time
 def _get_branch_type():
-    # #region agent log
-    import json
-    import os
-    import time
-    try:
-        log_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), '.cursor', 'debug.log')
-        if not os.path.exists(os.path.dirname(log_path)):
-            log_path = '/tmp/debug.log'
-        with open(log_path, 'a') as f:
-            f.write(json.dumps({
-                'timestamp': int(time.time() * 1000),
-                'location': 'inventory/schema.py:_get_branch_type',
-                'message': 'Attempting to import BranchType',
-                'data': {},
-                'sessionId': 'debug-session',
-                'runId': 'schema-load',
-                'hypothesisId': 'H6'
-            }) + '\n')
-    except:
-        pass
-    # #endregion
     try:
         from saleor_extensions.branches.schema import BranchType
-        # #region agent log
-        try:
-            with open(log_path, 'a') as f:
-                f.write(json.dumps({
-                    'timestamp': int(time.time() * 1000),
-                    'location': 'inventory/schema.py:_get_branch_type',
-                    'message': 'BranchType imported successfully',
-                    'data': {'branch_type_module': BranchType.__module__, 'branch_type_name': BranchType.__name__},
-                    'sessionId': 'debug-session',
-                    'runId': 'schema-load',
-                    'hypothesisId': 'H6'
-                }) + '\n')
-        except:
-            pass
-        # #endregion
         return BranchType
     except Exception as e:
         # #region agent log
-        try:
-            with open(log_path, 'a') as f:
-                f.write(json.dumps({
-                    'timestamp': int(time.time() * 1000),
-                    'location': 'inventory/schema.py:_get_branch_type',
-                    'message': 'BranchType import failed',
-                    'data': {'error': str(e), 'error_type': type(e).__name__},
-                    'sessionId': 'debug-session',
-                    'runId': 'schema-load',
-                    'hypothesisId': 'H6'
-                }) + '\n')
-        except:
-            pass
+        _inventory_log(
+            "inventory/schema.py:_get_branch_type",
+            "BranchType import failed",
+            {"error": str(e), "error_type": type(e).__name__},
+            "H6",
+            "schema-load",
+        )
         # #endregion
         raise
 
@@ -146,6 +88,23 @@ except ImportError:
 # Object Types
 # ============================================================================
 
+def _resolve_inventory_variant(info, product_variant_id, type_name):
+    """Resolve a product variant through the per-request DataLoaders, returning null on failure."""
+
+    def _on_error(error):
+        # #region agent log
+        _inventory_log(
+            f"inventory/schema.py:{type_name}:resolve_product_variant:error",
+            "Failed to resolve product_variant (returning null)",
+            {"hypothesisId": "H11", "error": str(error), "error_type": type(error).__name__},
+            "H11",
+        )
+        # #endregion
+        return None
+
+    return load_inventory_variant(info.context, product_variant_id).catch(_on_error)
+
+
 class InventoryProductType(graphene.ObjectType):
     """Minimal Product type for admin inventory views (renamed to avoid conflict with Saleor's ProductType)."""
 
@@ -189,40 +148,9 @@ class BranchInventoryType(graphene.ObjectType):
         """
         Fetch minimal ProductVariant fields without selecting all Saleor columns.
         This prevents runtime failures when Saleor core DB migrations are behind code.
+        Variants and products are batched per request (one id__in query each).
         """
-        try:
-            from saleor.product.models import Product, ProductVariant
-
-            variant = (
-                ProductVariant.objects.order_by()
-                .only("id", "name", "sku", "product_id")
-                .get(id=self.product_variant_id)
-            )
-            product_obj = None
-            try:
-                product_obj = (
-                    Product.objects.order_by().only("id", "name").get(id=variant.product_id)
-                )
-                product = SimpleNamespace(id=str(product_obj.id), name=getattr(product_obj, "name", None))
-            except Exception:
-                product = None
-
-            return SimpleNamespace(
-                id=str(variant.id),
-                name=getattr(variant, "name", None),
-                sku=getattr(variant, "sku", None),
-                product=product,
-            )
-        except Exception as e:
-            # #region agent log
-            _inventory_log(
-                "inventory/schema.py:BranchInventoryType:resolve_product_variant:error",
-                "Failed to resolve product_variant (returning null)",
-                {"hypothesisId": "H11", "error": str(e), "error_type": type(e).__name__},
-                "H11",
-            )
-            # #endregion
-            return None
+        return _resolve_inventory_variant(info, self.product_variant_id, "BranchInventoryType")
 
 
 class StockMovementType(graphene.ObjectType):
@@ -238,6 +166,9 @@ class StockMovementType(graphene.ObjectType):
     created_by = graphene.String()
     created_at = DateTime()
 
+    def resolve_product_variant(self, info):
+        return _resolve_inventory_variant(info, self.product_variant_id, "StockMovementType")
+
 
 class StockTransferType(graphene.ObjectType):
     """Stock Transfer GraphQL Type (no graphene-django dependency)."""
@@ -274,6 +205,34 @@ class LowStockAlertType(graphene.ObjectType):
     created_at = DateTime()
 
 
+class InventoryPageInfo(graphene.ObjectType):
+    """Page info for keyset-paginated inventory connections (renamed to avoid conflict with Relay's PageInfo)."""
+
+    has_next_page = graphene.Boolean(required=True)
+    has_previous_page = graphene.Boolean(required=True)
+    start_cursor = graphene.String()
+    end_cursor = graphene.String()
+
+
+class BranchInventoryEdge(graphene.ObjectType):
+    """Edge wrapping a BranchInventoryType node and its cursor."""
+
+    node = graphene.Field(BranchInventoryType)
+    cursor = graphene.String(required=True)
+
+
+class BranchInventoryConnection(graphene.ObjectType):
+    """Relay-style connection over branch inventory, paginated on (branch_id, id)."""
+
+    edges = graphene.List(BranchInventoryEdge)
+    page_info = graphene.Field(InventoryPageInfo)
+    total_count = graphene.Int(description="Total matching rows (only counted when requested)")
+
+    def resolve_total_count(self, info):
+        # Only runs when the client selects totalCount, so pages never pay for COUNT(*) by default.
+        return self.count_queryset.count()
+
+
 # ============================================================================
 # Input Types
 # ============================================================================
@@ -318,6 +277,16 @@ class StockAdjustmentItemInput(graphene.InputObjectType):
 # Queries
 # ============================================================================
 
+def _user(info):
+    """Requesting user, for branch scoping (see BranchScopedQuerySet.for_user)"""
+    return getattr(info.context, 'user', None)
+
+
+def _app(info):
+    """Requesting Saleor app (app token), for branch scoping"""
+    return getattr(info.context, 'app', None)
+
+
 class InventoryQueries(graphene.ObjectType):
     """Inventory-related queries"""
     
@@ -331,6 +300,18 @@ class InventoryQueries(graphene.ObjectType):
         description="Get inventory for a specific branch"
     )
     
+    # Cursor-paginated branch inventory
+    branch_inventory_connection = graphene.Field(
+        BranchInventoryConnection,
+        branch_id=graphene.ID(),
+        branchId=graphene.ID(),
+        search=graphene.String(),
+        low_stock_only=graphene.Boolean(default_value=False),
+        first=graphene.Int(description="Page size (default 50, max 500)"),
+        after=graphene.String(description="Cursor of the last edge of the previous page"),
+        description="Get a cursor-paginated page of branch inventory"
+    )
+    
     # Get inventory for a specific product variant
     product_variant_inventory = graphene.List(
         BranchInventoryType,
@@ -375,6 +356,30 @@ class InventoryQueries(graphene.ObjectType):
         description="Get low stock alerts"
     )
     
+    @staticmethod
+    def _branch_inventory_queryset(user, app=None, branch_id=None, search=None, low_stock_only=False):
+        """Build the filtered BranchInventory queryset shared by list and connection queries"""
+        # IMPORTANT: do NOT select_related("product_variant") here.
+        # Saleor's ProductVariant model selects many columns; if Saleor core migrations are behind,
+        # selecting all columns can fail (e.g. missing external_reference/private_metadata/etc).
+        queryset = BranchInventory.objects.for_user(user, app).select_related("branch")
+        
+        if branch_id:
+            queryset = queryset.filter(branch_id=branch_id)
+        
+        if search:
+            queryset = queryset.filter(
+                Q(product_variant__name__icontains=search)
+                | Q(product_variant__sku__icontains=search)
+                | Q(branch__name__icontains=search)
+            )
+        
+        if low_stock_only:
+            # Same predicate as BranchInventory.is_low_stock, evaluated in SQL.
+            queryset = queryset.filter(quantity__lte=F("low_stock_threshold"))
+        
+        return queryset
+    
     def resolve_branch_inventory(self, info, branch_id=None, branchId=None, search=None, low_stock_only=False):
         """Get inventory for a branch"""
         merged_branch_id = branchId or branch_id
@@ -389,10 +394,9 @@ class InventoryQueries(graphene.ObjectType):
         # #endregion
 
         try:
-            # IMPORTANT: do NOT select_related("product_variant") here.
-            # Saleor's ProductVariant model selects many columns; if Saleor core migrations are behind,
-            # selecting all columns can fail (e.g. missing external_reference/private_metadata/etc).
-            queryset = BranchInventory.objects.select_related("branch").all()
+            queryset = InventoryQueries._branch_inventory_queryset(
+                _user(info), _app(info), merged_branch_id, search, low_stock_only
+            )
         except Exception as e:
             # If migrations haven't run yet in the target environment, the table may not exist.
             # Return empty list so the UI can load; the migrations system should create the table shortly after.
@@ -406,49 +410,42 @@ class InventoryQueries(graphene.ObjectType):
             # #endregion
             return []
         
-        if merged_branch_id:
-            queryset = queryset.filter(branch_id=merged_branch_id)
-        
-        if search:
-            queryset = queryset.filter(
-                Q(product_variant__name__icontains=search)
-                | Q(product_variant__sku__icontains=search)
-                | Q(branch__name__icontains=search)
-            )
-        
-        if low_stock_only:
-            queryset = [item for item in queryset if item.is_low_stock]
-
-        result_count = queryset.count() if hasattr(queryset, "count") else len(queryset)
-
-        # #region agent log
-        _inventory_log(
-            "inventory/schema.py:resolve_branch_inventory:exit",
-            "Resolve branch inventory completed",
-            {"hypothesisId": "H5", "count": result_count},
-            "H5",
-        )
-        # #endregion
-        
         return queryset
     
+    def resolve_branch_inventory_connection(self, info, branch_id=None, branchId=None, search=None,
+                                            low_stock_only=False, first=None, after=None):
+        """Get a keyset-paginated page of branch inventory"""
+        queryset = InventoryQueries._branch_inventory_queryset(
+            _user(info), _app(info), branchId or branch_id, search, low_stock_only
+        )
+        rows, has_next_page = keyset_page(queryset, first=first, after=after)
+        
+        edges = [
+            BranchInventoryEdge(node=row, cursor=encode_cursor(row.branch_id, row.id))
+            for row in rows
+        ]
+        page_info = InventoryPageInfo(
+            has_next_page=has_next_page,
+            has_previous_page=bool(after),
+            start_cursor=edges[0].cursor if edges else None,
+            end_cursor=edges[-1].cursor if edges else None,
+        )
+        return SimpleNamespace(edges=edges, page_info=page_info, count_queryset=queryset)
+    
     def resolve_product_variant_inventory(self, info, product_variant_id):
         """Get inventory for a product variant across branches"""
-        return BranchInventory.objects.select_related(
-            'branch', 'product_variant'
-        ).filter(product_variant_id=product_variant_id)
+        return BranchInventory.objects.for_user(_user(info), _app(info)).select_related('branch').filter(
+            product_variant_id=product_variant_id
+        )
     
     def resolve_inventory_item(self, info, id=None, branch_id=None, product_variant_id=None):
         """Get a specific inventory item"""
+        queryset = BranchInventory.objects.for_user(_user(info), _app(info)).select_related('branch')
         try:
             if id:
-                return BranchInventory.objects.select_related(
-                    'branch', 'product_variant'
-                ).get(id=id)
+                return queryset.get(id=id)
             elif branch_id and product_variant_id:
-                return BranchInventory.objects.select_related(
-                    'branch', 'product_variant'
-                ).get(branch_id=branch_id, product_variant_id=product_variant_id)
+                return queryset.get(branch_id=branch_id, product_variant_id=product_variant_id)
             else:
                 raise ValidationError("Either id or both branch_id and product_variant_id must be provided")
         except BranchInventory.DoesNotExist:
@@ -457,9 +454,8 @@ class InventoryQueries(graphene.ObjectType):
     def resolve_stock_movements(self, info, branch_id=None, product_variant_id=None, 
                                 movement_type=None, limit=50):
         """Get stock movement history"""
-        queryset = StockMovement.objects.select_related(
-            'branch', 'product_variant'
-        ).order_by('-created_at')[:limit]
+        # product_variant is resolved through the inventory DataLoaders, not a JOIN.
+        queryset = StockMovement.objects.for_user(_user(info), _app(info)).select_related('branch').order_by('-created_at')
         
         if branch_id:
             queryset = queryset.filter(branch_id=branch_id)
@@ -468,14 +464,14 @@ class InventoryQueries(graphene.ObjectType):
         if movement_type:
             queryset = queryset.filter(movement_type=movement_type)
         
-        return queryset
+        return queryset[:limit]
     
     def resolve_stock_transfers(self, info, from_branch_id=None, to_branch_id=None,
                                 status=None, limit=50):
         """Get stock transfer history"""
-        queryset = StockTransfer.objects.select_related(
-            'from_branch', 'to_branch', 'product_variant'
-        ).order_by('-created_at')[:limit]
+        queryset = StockTransfer.objects.for_user(_user(info), _app(info)).select_related(
+            'from_branch', 'to_branch'
+        ).order_by('-created_at')
         
         if from_branch_id:
             queryset = queryset.filter(from_branch_id=from_branch_id)
@@ -484,12 +480,13 @@ class InventoryQueries(graphene.ObjectType):
         if status:
             queryset = queryset.filter(status=status)
         
-        return queryset
+        return queryset[:limit]
     
     def resolve_low_stock_alerts(self, info, branch_id=None, status=None):
         """Get low stock alerts"""
-        queryset = LowStockAlert.objects.select_related(
-            'branch_inventory__branch', 'branch_inventory__product_variant'
+        # branch_inventory.product_variant is resolved through the inventory DataLoaders.
+        queryset = LowStockAlert.objects.for_user(_user(info), _app(info)).select_related(
+            'branch_inventory__branch'
         ).filter(status='ACTIVE')
         
         if branch_id:
@@ -500,10 +497,52 @@ class InventoryQueries(graphene.ObjectType):
         return queryset
 
 
+# Listings may be served from the read replica; single-item lookups stay on
+# the primary since they usually follow an edit.
+replica_fields(
+    'branch_inventory',
+    'branch_inventory_connection',
+    'product_variant_inventory',
+    'stock_movements',
+    'stock_transfers',
+    'low_stock_alerts',
+)
+
+
 # ============================================================================
 # Mutations
 # ============================================================================
 
+def _created_by(info):
+    """Username of the requesting user for movement records (empty when anonymous)."""
+    user = getattr(info.context, 'user', None)
+    if user is None or not user.is_authenticated:
+        return ''
+    return getattr(user, 'username', None) or getattr(user, 'email', '') or ''
+
+
+def _existing_variant_ids(product_variant_ids):
+    """
+    Map each of ``product_variant_ids`` (numeric or global IDs) that exists to its
+    primary key (one query). Invalid and unknown IDs are left out.
+    """
+    from saleor.product.models import ProductVariant
+
+    parsed = {str(raw): parse_variant_id(raw) for raw in product_variant_ids}
+    valid = {pk for pk in parsed.values() if pk is not None}
+    existing = set(
+        ProductVariant.objects.order_by().filter(id__in=valid).values_list('id', flat=True)
+    ) if valid else set()
+    return {raw: pk for raw, pk in parsed.items() if pk in existing}
+
+
+def _variant_error(product_variant_id):
+    """Message for an ID missing from _existing_variant_ids."""
+    if parse_variant_id(product_variant_id) is None:
+        return f"Invalid product variant ID: {product_variant_id}"
+    return f"Product variant {product_variant_id} does not exist"
+
+
 class StockAdjustment(BaseMutation):
     """Adjust stock (increase or decrease)"""
     
@@ -520,50 +559,22 @@ class StockAdjustment(BaseMutation):
     @classmethod
     def perform_mutation(cls, root, info, input):
         """Perform stock adjustment"""
-        from saleor.product.models import ProductVariant
-        
-        branch = Branch.objects.get(id=input['branch_id'])
-        product_variant = ProductVariant.objects.get(id=input['product_variant_id'])
-        quantity = input['quantity']
-        movement_type = input['movement_type']
-        
-        # Get or create inventory item
-        inventory_item, created = BranchInventory.objects.get_or_create(
-            branch=branch,
-            product_variant=product_variant,
-            defaults={
-                'quantity': 0,
-                'reserved_quantity': 0,
-            }
-        )
-        
-        # Calculate new quantity based on movement type
-        if movement_type in ['IN', 'TRANSFER_IN', 'RETURN']:
-            inventory_item.quantity += quantity
-        elif movement_type in ['OUT', 'TRANSFER_OUT']:
-            if inventory_item.quantity < quantity:
-                raise ValidationError(
-                    f"Insufficient stock. Available: {inventory_item.quantity}, Requested: {quantity}"
-                )
-            inventory_item.quantity -= quantity
-        elif movement_type == 'ADJUSTMENT':
-            # For adjustments, quantity can be positive or negative
-            new_quantity = inventory_item.quantity + quantity
-            if new_quantity < 0:
-                raise ValidationError("Adjustment would result in negative stock")
-            inventory_item.quantity = new_quantity
-        
-        inventory_item.save()
-        
-        # Create stock movement record
-        stock_movement = StockMovement.objects.create(
-            branch=branch,
-            product_variant=product_variant,
-            movement_type=movement_type,
-            quantity=abs(quantity),
+        branch_id = input['branch_id']
+        product_variant_id = input['product_variant_id']
+        if not Branch.objects.filter(id=branch_id).exists():
+            raise ValidationError(f"Branch {branch_id} does not exist")
+        variant_pk = _existing_variant_ids([product_variant_id]).get(str(product_variant_id))
+        if variant_pk is None:
+            raise ValidationError(_variant_error(product_variant_id))
+        
+        inventory_item, stock_movement = StockLedger.adjust(
+            branch_id,
+            variant_pk,
+            input['movement_type'],
+            input['quantity'],
             reference_number=input.get('reference_number', ''),
             notes=input.get('notes', ''),
-            created_by=info.context.user.username if info.context.user.is_authenticated else '',
+            created_by=_created_by(info),
         )
         
         result = cls()
@@ -595,73 +606,44 @@ class BulkStockAdjustment(BaseMutation):
     def perform_mutation(cls, root, info, branch_id, adjustments, 
                         reference_number=None, notes=None):
         """Perform bulk stock adjustment"""
-        from saleor.product.models import ProductVariant
-        
-        branch = Branch.objects.get(id=branch_id)
-        inventory_items = []
-        stock_movements = []
-        success_count = 0
-        error_count = 0
-        
-        for adjustment in adjustments:
-            try:
-                product_variant = ProductVariant.objects.get(
-                    id=adjustment['product_variant_id']
-                )
-                quantity = adjustment['quantity']
-                movement_type = adjustment['movement_type']
-                
-                # Get or create inventory item
-                inventory_item, created = BranchInventory.objects.get_or_create(
-                    branch=branch,
-                    product_variant=product_variant,
-                    defaults={
-                        'quantity': 0,
-                        'reserved_quantity': 0,
-                    }
-                )
-                
-                # Apply adjustment
-                if movement_type in ['IN', 'TRANSFER_IN', 'RETURN']:
-                    inventory_item.quantity += quantity
-                elif movement_type in ['OUT', 'TRANSFER_OUT']:
-                    if inventory_item.quantity < quantity:
-                        error_count += 1
-                        continue
-                    inventory_item.quantity -= quantity
-                elif movement_type == 'ADJUSTMENT':
-                    new_quantity = inventory_item.quantity + quantity
-                    if new_quantity < 0:
-                        error_count += 1
-                        continue
-                    inventory_item.quantity = new_quantity
-                
-                inventory_item.save()
-                inventory_items.append(inventory_item)
-                
-                # Create stock movement
-                stock_movement = StockMovement.objects.create(
-                    branch=branch,
-                    product_variant=product_variant,
-                    movement_type=movement_type,
-                    quantity=abs(quantity),
-                    reference_number=reference_number or '',
-                    notes=notes or adjustment.get('reason', ''),
-                    created_by=info.context.user.username if info.context.user.is_authenticated else '',
-                )
-                stock_movements.append(stock_movement)
-                success_count += 1
-                
-            except Exception as e:
-                error_count += 1
+        if not Branch.objects.filter(id=branch_id).exists():
+            raise ValidationError(f"Branch {branch_id} does not exist")
+        
+        known_variant_ids = _existing_variant_ids([a['product_variant_id'] for a in adjustments])
+        errors = []
+        lines = []
+        line_indexes = []
+        for index, adjustment in enumerate(adjustments):
+            variant_pk = known_variant_ids.get(str(adjustment['product_variant_id']))
+            if variant_pk is None:
+                errors.append(Error(
+                    field=f"adjustments.{index}",
+                    message=_variant_error(adjustment['product_variant_id']),
+                ))
                 continue
+            lines.append(dict(adjustment, product_variant_id=variant_pk))
+            line_indexes.append(index)
+        
+        applied, rejected = StockLedger.adjust_many(
+            branch_id,
+            lines,
+            reference_number=reference_number or '',
+            notes=notes or '',
+            created_by=_created_by(info),
+        )
+        for rejection in rejected:
+            errors.append(Error(
+                field=f"adjustments.{line_indexes[rejection['index']]}",
+                message=rejection['reason'],
+            ))
+        errors.sort(key=lambda error: int(error.field.split('.', 1)[1]))
         
         result = cls()
-        result.inventory_items = inventory_items
-        result.stock_movements = stock_movements
-        result.success_count = success_count
-        result.error_count = error_count
-        result.errors = []
+        result.inventory_items = [inventory_item for _, inventory_item, _ in applied]
+        result.stock_movements = [stock_movement for _, _, stock_movement in applied]
+        result.success_count = len(applied)
+        result.error_count = len(errors)
+        result.errors = errors
         return result
 
 
@@ -684,7 +666,10 @@ class StockTransferCreate(BaseMutation):
         
         from_branch = Branch.objects.get(id=input['from_branch_id'])
         to_branch = Branch.objects.get(id=input['to_branch_id'])
-        product_variant = ProductVariant.objects.get(id=input['product_variant_id'])
+        variant_pk = parse_variant_id(input['product_variant_id'])
+        if variant_pk is None:
+            raise ValidationError(_variant_error(input['product_variant_id']))
+        product_variant = ProductVariant.objects.get(id=variant_pk)
         quantity = input['quantity']
         
         # Check if source branch has enough stock
@@ -713,7 +698,7 @@ class StockTransferCreate(BaseMutation):
             quantity=quantity,
             status='PENDING',
             notes=input.get('notes', ''),
-            requested_by=info.context.user.username if info.context.user.is_authenticated else '',
+            requested_by=_created_by(info),
         )
         
         result = cls()
@@ -738,62 +723,9 @@ class StockTransferProcess(BaseMutation):
     @classmethod
     def perform_mutation(cls, root, info, transfer_id, approve=True):
         """Process stock transfer"""
-        stock_transfer = StockTransfer.objects.select_related(
-            'from_branch', 'to_branch', 'product_variant'
-        ).get(id=transfer_id)
-        
-        if stock_transfer.status != 'PENDING':
-            raise ValidationError("Transfer is not in PENDING status")
-        
-        if approve:
-            # Deduct from source branch
-            source_inventory, _ = BranchInventory.objects.get_or_create(
-                branch=stock_transfer.from_branch,
-                product_variant=product_variant,
-                defaults={'quantity': 0, 'reserved_quantity': 0}
-            )
-            
-            if source_inventory.available_quantity < stock_transfer.quantity:
-                raise ValidationError("Insufficient stock at source branch")
-            
-            source_inventory.quantity -= stock_transfer.quantity
-            source_inventory.save()
-            
-            # Add to destination branch
-            dest_inventory, _ = BranchInventory.objects.get_or_create(
-                branch=stock_transfer.to_branch,
-                product_variant=product_variant,
-                defaults={'quantity': 0, 'reserved_quantity': 0}
-            )
-            dest_inventory.quantity += stock_transfer.quantity
-            dest_inventory.save()
-            
-            # Create stock movements
-            StockMovement.objects.create(
-                branch=stock_transfer.from_branch,
-                product_variant=product_variant,
-                movement_type='TRANSFER_OUT',
-                quantity=stock_transfer.quantity,
-                reference_number=stock_transfer.transfer_number,
-                notes=f"Transfer to {stock_transfer.to_branch.name}",
-                created_by=info.context.user.username if info.context.user.is_authenticated else '',
-            )
-            
-            StockMovement.objects.create(
-                branch=stock_transfer.to_branch,
-                product_variant=product_variant,
-                movement_type='TRANSFER_IN',
-                quantity=stock_transfer.quantity,
-                reference_number=stock_transfer.transfer_number,
-                notes=f"Transfer from {stock_transfer.from_branch.name}",
-                created_by=info.context.user.username if info.context.user.is_authenticated else '',
-            )
-            
-            stock_transfer.status = 'COMPLETED'
-        else:
-            stock_transfer.status = 'CANCELLED'
-        
-        stock_transfer.save()
+        stock_transfer = StockLedger.process_transfer(
+            transfer_id, approve=approve, created_by=_created_by(info)
+        )
         
         result = cls()
         result.stock_transfer = stock_transfer
@@ -817,12 +749,7 @@ class InventoryUpdateLowStockThreshold(BaseMutation):
     @classmethod
     def perform_mutation(cls, root, info, inventory_id, threshold):
         """Update low stock threshold"""
-        if threshold < 0:
-            raise ValidationError("Threshold cannot be negative")
-        
-        inventory_item = BranchInventory.objects.get(id=inventory_id)
-        inventory_item.low_stock_threshold = threshold
-        inventory_item.save()
+        inventory_item = StockLedger.set_low_stock_threshold(inventory_id, threshold)
         
         result = cls()
         result.inventory_item = inventory_item
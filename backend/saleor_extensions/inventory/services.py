@@ -0,0 +1,576 @@
+"""
+Stock ledger services
+
+Every change to BranchInventory.quantity goes through StockLedger. Quantities are
+changed with conditional UPDATE statements (``quantity = quantity - n WHERE
+quantity >= n``) inside ``transaction.atomic`` so concurrent tills can never lose
+an update or oversell: a decrement that would go negative simply matches no row
+and is reported as rejected.
+
+InventorySummaryService keeps BranchInventorySummary in step with those changes
+so dashboards read one row per branch instead of scanning branch_inventory.
+"""
+from typing import Dict, List
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from graphql_relay import from_global_id
+
+from saleor_extensions.branches.models import Branch
+from saleor_extensions.inventory.models import (
+    BranchInventory,
+    BranchInventorySummary,
+    StockMovement,
+    StockTransfer,
+)
+from saleor_extensions.inventory.signals import stock_changed
+
+INBOUND_MOVEMENT_TYPES = ('IN', 'TRANSFER_IN', 'RETURN')
+OUTBOUND_MOVEMENT_TYPES = ('OUT', 'TRANSFER_OUT')
+ADJUSTMENT_MOVEMENT_TYPE = 'ADJUSTMENT'
+
+# Rows per statement for bulk_create/bulk_update on large goods-receipt imports
+BULK_BATCH_SIZE = 500
+
+
+def parse_variant_id(value):
+    """
+    Primary key of a product variant given as a number or a ProductVariant global ID
+
+    Returns:
+        The integer primary key, or None when ``value`` is neither
+    """
+    value = str(value).strip()
+    if value.isdigit():
+        return int(value)
+    try:
+        type_name, pk = from_global_id(value)
+    except Exception:
+        return None
+    if type_name == 'ProductVariant' and pk.isdigit():
+        return int(pk)
+    return None
+
+
+def notify_stock_changed(branch_ids):
+    """Send ``stock_changed`` for ``branch_ids`` once the current transaction commits"""
+    branch_ids = frozenset(branch_ids)
+    transaction.on_commit(
+        lambda: stock_changed.send(sender=BranchInventory, branch_ids=branch_ids)
+    )
+
+
+class InsufficientStockError(ValidationError):
+    """Raised when a conditional decrement is rejected because stock is too low"""
+
+    def __init__(self, branch_id, product_variant_id, requested, available):
+        self.branch_id = branch_id
+        self.product_variant_id = product_variant_id
+        self.requested = requested
+        self.available = available
+        super().__init__(
+            f"Insufficient stock. Available: {available}, Requested: {requested}"
+        )
+
+
+class StockLedger:
+    """Apply stock movements atomically with row-level conditional updates"""
+
+    @staticmethod
+    def movement_delta(movement_type: str, quantity: int) -> int:
+        """
+        Convert a movement into a signed quantity delta
+
+        Args:
+            movement_type: One of StockMovement.MOVEMENT_TYPE_CHOICES
+            quantity: Movement quantity (signed only for ADJUSTMENT)
+
+        Returns:
+            Signed delta to apply to BranchInventory.quantity
+        """
+        if movement_type in INBOUND_MOVEMENT_TYPES or movement_type in OUTBOUND_MOVEMENT_TYPES:
+            if quantity <= 0:
+                raise ValidationError("Quantity must be a positive integer")
+            return quantity if movement_type in INBOUND_MOVEMENT_TYPES else -quantity
+        if movement_type == ADJUSTMENT_MOVEMENT_TYPE:
+            # For adjustments, quantity can be positive or negative
+            return quantity
+        raise ValidationError(f"Unknown movement type: {movement_type}")
+
+    @staticmethod
+    def _apply_delta(branch_id, product_variant_id, delta: int, respect_reserved: bool = False) -> BranchInventory:
+        """
+        Apply ``delta`` to one inventory row; must be called inside transaction.atomic
+
+        Increments create the row if it does not exist yet. Decrements only match
+        rows with enough stock (``quantity - reserved_quantity`` when
+        ``respect_reserved``), so the check and the write are a single statement.
+        The branch's inventory summary is updated in the same transaction.
+
+        Returns:
+            The updated BranchInventory (with branch selected)
+        """
+        rows = BranchInventory.objects.filter(branch_id=branch_id, product_variant_id=product_variant_id)
+        now = timezone.now()
+        created = False
+
+        if delta >= 0:
+            updated = rows.update(quantity=F('quantity') + delta, last_updated=now)
+            if not updated:
+                _, created = BranchInventory.objects.get_or_create(
+                    branch_id=branch_id,
+                    product_variant_id=product_variant_id,
+                    defaults={'quantity': delta, 'reserved_quantity': 0},
+                )
+                if not created:
+                    # Another transaction created the row between our UPDATE and INSERT.
+                    rows.update(quantity=F('quantity') + delta, last_updated=now)
+        else:
+            requested = -delta
+            if respect_reserved:
+                guarded = rows.filter(quantity__gte=F('reserved_quantity') + requested)
+            else:
+                guarded = rows.filter(quantity__gte=requested)
+            updated = guarded.update(quantity=F('quantity') - requested, last_updated=now)
+            if not updated:
+                current = rows.values('quantity', 'reserved_quantity').first()
+                if current is None:
+                    available = 0
+                elif respect_reserved:
+                    available = max(0, current['quantity'] - current['reserved_quantity'])
+                else:
+                    available = current['quantity']
+                raise InsufficientStockError(branch_id, product_variant_id, requested, available)
+
+        # The row is locked by our UPDATE/INSERT, so this reads our own write.
+        inventory_item = rows.select_related('branch').get()
+        notify_stock_changed([branch_id])
+        InventorySummaryService.apply(
+            branch_id,
+            InventorySummaryService.row_delta(
+                inventory_item.quantity - delta,
+                inventory_item.quantity,
+                inventory_item.low_stock_threshold,
+                created=created,
+            ),
+        )
+        return inventory_item
+
+    @staticmethod
+    def adjust(
+        branch_id,
+        product_variant_id,
+        movement_type: str,
+        quantity: int,
+        reference_number: str = '',
+        notes: str = '',
+        created_by: str = '',
+    ):
+        """
+        Apply a single stock movement and record it
+
+        Returns:
+            Tuple of (BranchInventory, StockMovement)
+
+        Raises:
+            InsufficientStockError: if the movement would make stock negative
+        """
+        delta = StockLedger.movement_delta(movement_type, quantity)
+        with transaction.atomic():
+            inventory_item = StockLedger._apply_delta(branch_id, product_variant_id, delta)
+            movement = StockMovement.objects.create(
+                branch_id=branch_id,
+                product_variant_id=product_variant_id,
+                movement_type=movement_type,
+                quantity=abs(quantity),
+                reference_number=reference_number or '',
+                notes=notes or '',
+                created_by=created_by or '',
+            )
+        return inventory_item, movement
+
+    @staticmethod
+    def adjust_many(
+        branch_id,
+        lines: List[Dict],
+        reference_number: str = '',
+        notes: str = '',
+        created_by: str = '',
+    ):
+        """
+        Apply several movements at one branch as one set-based transaction
+
+        Query count is constant in the number of lines: one locking SELECT of
+        the existing inventory rows, an ``INSERT ... ON CONFLICT DO NOTHING`` plus
+        a locking SELECT for rows that do not exist yet, one batched
+        ``bulk_update`` and one ``bulk_create`` of the movements. Because the
+        rows are locked for the rest of the transaction, the new quantities
+        can be computed in Python. Lines that would make stock negative (or are
+        otherwise invalid) are rejected and skipped; the rest are committed
+        together.
+
+        Args:
+            lines: Dicts with product_variant_id (numeric or global ID), quantity,
+                movement_type and optional reason
+
+        Returns:
+            Tuple of (applied, rejected). ``applied`` is a list of
+            (index, BranchInventory, StockMovement); ``rejected`` is a list of dicts
+            with index, product_variant_id, reason and, for stock shortfalls,
+            requested/available.
+        """
+        applied = []
+        rejected = []
+        deltas = []
+        for index, line in enumerate(lines):
+            variant_id = parse_variant_id(line.get('product_variant_id'))
+            if variant_id is None:
+                rejected.append(StockLedger._rejection(
+                    index, line, f"Invalid product variant ID: {line.get('product_variant_id')}"
+                ))
+                continue
+            try:
+                delta = StockLedger.movement_delta(line['movement_type'], line['quantity'])
+            except ValidationError as e:
+                rejected.append(StockLedger._rejection(index, line, e.messages[0]))
+                continue
+            deltas.append((index, line, variant_id, delta))
+        if not deltas:
+            return applied, rejected
+
+        variant_ids = {variant_id for _, _, variant_id, _ in deltas}
+        now = timezone.now()
+
+        with transaction.atomic():
+            locked = BranchInventory.objects.select_for_update(of=('self',)).select_related('branch')
+            rows = {
+                row.product_variant_id: row
+                for row in locked.filter(branch_id=branch_id, product_variant_id__in=variant_ids)
+            }
+            missing = variant_ids - rows.keys()
+            if missing:
+                BranchInventory.objects.bulk_create(
+                    [
+                        BranchInventory(branch_id=branch_id, product_variant_id=variant_id, quantity=0, reserved_quantity=0)
+                        for variant_id in missing
+                    ],
+                    ignore_conflicts=True,
+                    batch_size=BULK_BATCH_SIZE,
+                )
+                rows.update({
+                    row.product_variant_id: row
+                    for row in locked.filter(branch_id=branch_id, product_variant_id__in=missing)
+                })
+
+            original_quantities = {variant_id: row.quantity for variant_id, row in rows.items()}
+            changed = {}
+            movements = []
+            for index, line, variant_id, delta in deltas:
+                row = rows[variant_id]
+                if row.quantity + delta < 0:
+                    rejected.append(StockLedger._rejection(
+                        index,
+                        line,
+                        f"Insufficient stock. Available: {row.quantity}, Requested: {-delta}",
+                        requested=-delta,
+                        available=row.quantity,
+                    ))
+                    continue
+                row.quantity += delta
+                row.last_updated = now
+                changed[row.pk] = row
+                movement = StockMovement(
+                    branch_id=branch_id,
+                    product_variant_id=row.product_variant_id,
+                    movement_type=line['movement_type'],
+                    quantity=abs(line['quantity']),
+                    reference_number=reference_number or '',
+                    notes=notes or line.get('reason', '') or '',
+                    created_by=created_by or '',
+                )
+                movements.append(movement)
+                applied.append((index, row, movement))
+
+            if changed:
+                BranchInventory.objects.bulk_update(
+                    list(changed.values()), ['quantity', 'last_updated'], batch_size=BULK_BATCH_SIZE
+                )
+            if movements:
+                StockMovement.objects.bulk_create(movements, batch_size=BULK_BATCH_SIZE)
+
+            summary_delta = {}
+            for variant_id, row in rows.items():
+                if row.pk not in changed and variant_id not in missing:
+                    continue
+                InventorySummaryService.merge(summary_delta, InventorySummaryService.row_delta(
+                    original_quantities[variant_id],
+                    row.quantity,
+                    row.low_stock_threshold,
+                    created=variant_id in missing,
+                ))
+            InventorySummaryService.apply(branch_id, summary_delta)
+            if changed or missing:
+                notify_stock_changed([branch_id])
+
+        rejected.sort(key=lambda rejection: rejection['index'])
+        return applied, rejected
+
+    @staticmethod
+    def _rejection(index, line, reason, requested=None, available=None) -> Dict:
+        return {
+            'index': index,
+            'product_variant_id': line.get('product_variant_id'),
+            'reason': reason,
+            'requested': requested,
+            'available': available,
+        }
+
+    @staticmethod
+    def process_transfer(transfer_id, approve: bool = True, created_by: str = '') -> StockTransfer:
+        """
+        Complete or cancel a pending stock transfer
+
+        The transfer row is locked with SELECT ... FOR UPDATE so two approvals
+        cannot both move stock. The source decrement respects reserved stock.
+
+        Raises:
+            ValidationError: if the transfer is not PENDING
+            InsufficientStockError: if the source branch cannot cover the transfer
+        """
+        with transaction.atomic():
+            stock_transfer = (
+                StockTransfer.objects.select_for_update()
+                .select_related('from_branch', 'to_branch')
+                .get(id=transfer_id)
+            )
+            if stock_transfer.status != 'PENDING':
+                raise ValidationError("Transfer is not in PENDING status")
+
+            if not approve:
+                stock_transfer.status = 'CANCELLED'
+                stock_transfer.save(update_fields=['status', 'updated_at'])
+                return stock_transfer
+
+            # StockTransfer stores the variant id in product_id (CharField).
+            product_variant_id = parse_variant_id(stock_transfer.product_id)
+            if product_variant_id is None:
+                raise ValidationError(
+                    f"Transfer {stock_transfer.transfer_number} has an invalid product variant ID: "
+                    f"{stock_transfer.product_id}"
+                )
+            quantity = stock_transfer.quantity
+
+            StockLedger._apply_delta(
+                stock_transfer.from_branch_id, product_variant_id, -quantity, respect_reserved=True
+            )
+            StockLedger._apply_delta(stock_transfer.to_branch_id, product_variant_id, quantity)
+
+            StockMovement.objects.bulk_create([
+                StockMovement(
+                    branch_id=stock_transfer.from_branch_id,
+                    product_variant_id=product_variant_id,
+                    movement_type='TRANSFER_OUT',
+                    quantity=quantity,
+                    reference_number=stock_transfer.transfer_number,
+                    notes=f"Transfer to {stock_transfer.to_branch.name}",
+                    created_by=created_by or '',
+                ),
+                StockMovement(
+                    branch_id=stock_transfer.to_branch_id,
+                    product_variant_id=product_variant_id,
+                    movement_type='TRANSFER_IN',
+                    quantity=quantity,
+                    reference_number=stock_transfer.transfer_number,
+                    notes=f"Transfer from {stock_transfer.from_branch.name}",
+                    created_by=created_by or '',
+                ),
+            ])
+
+            stock_transfer.status = 'COMPLETED'
+            stock_transfer.completed_at = timezone.now()
+            stock_transfer.save(update_fields=['status', 'completed_at', 'updated_at'])
+        return stock_transfer
+
+    @staticmethod
+    def set_low_stock_threshold(inventory_id, threshold: int) -> BranchInventory:
+        """Change an item's low stock threshold and keep the branch summary in step"""
+        if threshold < 0:
+            raise ValidationError("Threshold cannot be negative")
+        with transaction.atomic():
+            inventory_item = BranchInventory.objects.select_for_update(of=('self',)).select_related('branch').get(
+                id=inventory_id
+            )
+            old_threshold = inventory_item.low_stock_threshold
+            inventory_item.low_stock_threshold = threshold
+            inventory_item.save(update_fields=['low_stock_threshold', 'last_updated'])
+            notify_stock_changed([inventory_item.branch_id])
+            InventorySummaryService.apply(
+                inventory_item.branch_id,
+                InventorySummaryService.row_delta(
+                    inventory_item.quantity,
+                    inventory_item.quantity,
+                    threshold,
+                    old_threshold=old_threshold,
+                ),
+            )
+        return inventory_item
+
+
+class InventorySummaryService:
+    """Maintain and read the BranchInventorySummary rollup"""
+
+    FIELDS = ('total_items', 'low_stock_items', 'out_of_stock_items', 'total_units')
+
+    @staticmethod
+    def row_delta(old_quantity, new_quantity, threshold, old_threshold=None, created: bool = False) -> Dict:
+        """
+        Summary counter changes caused by one inventory row changing
+
+        Args:
+            old_quantity: Quantity before the change (ignored when ``created``)
+            new_quantity: Quantity after the change
+            threshold: Low stock threshold after the change
+            old_threshold: Threshold before the change, if it changed
+            created: Whether the row was inserted by this change
+        """
+        if old_threshold is None:
+            old_threshold = threshold
+        was_low = 0 if created else int(old_quantity <= old_threshold)
+        was_out = 0 if created else int(old_quantity == 0)
+        return {
+            'total_items': 1 if created else 0,
+            'low_stock_items': int(new_quantity <= threshold) - was_low,
+            'out_of_stock_items': int(new_quantity == 0) - was_out,
+            'total_units': new_quantity - (0 if created else old_quantity),
+        }
+
+    @staticmethod
+    def merge(total: Dict, delta: Dict) -> Dict:
+        """Add ``delta`` into ``total`` in place"""
+        for field, value in delta.items():
+            total[field] = total.get(field, 0) + value
+        return total
+
+    @staticmethod
+    def apply(branch_id, delta: Dict):
+        """
+        Apply counter changes to a branch summary with F() expressions
+
+        A branch without a summary row yet is rebuilt from branch_inventory
+        instead, which already includes the current transaction's changes.
+        """
+        changes = {field: F(field) + value for field, value in delta.items() if value}
+        if not changes:
+            return
+        updated = BranchInventorySummary.objects.filter(branch_id=branch_id).update(
+            updated_at=timezone.now(), **changes
+        )
+        if not updated:
+            InventorySummaryService.reconcile([branch_id])
+
+    @staticmethod
+    def count(branch_ids) -> Dict:
+        """
+        Count ``branch_ids``' inventory from branch_inventory with one GROUP BY query
+
+        Returns:
+            Dict of branch_id -> counters (zeros for branches without inventory)
+        """
+        totals = {
+            row.pop('branch_id'): row
+            for row in BranchInventory.objects.filter(branch_id__in=branch_ids)
+            .order_by()
+            .values('branch_id')
+            .annotate(
+                total_items=Count('id'),
+                low_stock_items=Count('id', filter=Q(quantity__lte=F('low_stock_threshold'))),
+                out_of_stock_items=Count('id', filter=Q(quantity=0)),
+                total_units=Coalesce(Sum('quantity'), 0),
+            )
+        }
+        empty = dict.fromkeys(InventorySummaryService.FIELDS, 0)
+        return {branch_id: totals.get(branch_id) or dict(empty) for branch_id in branch_ids}
+
+    @staticmethod
+    def reconcile(branch_ids=None) -> int:
+        """
+        Rebuild summaries from branch_inventory with one GROUP BY query
+
+        Existing summary rows are locked first, so stock mutations that are
+        in flight either commit before the recount (and are included) or
+        apply their delta after it.
+
+        Args:
+            branch_ids: Branches to rebuild (all branches when None)
+
+        Returns:
+            Number of branch summaries that were missing or had drifted
+        """
+        with transaction.atomic():
+            branches = Branch.objects.order_by('id')
+            if branch_ids is not None:
+                branches = branches.filter(id__in=branch_ids)
+            branch_ids = list(branches.values_list('id', flat=True))
+            if not branch_ids:
+                return 0
+
+            current = {
+                row['branch_id']: row
+                for row in BranchInventorySummary.objects.select_for_update()
+                .filter(branch_id__in=branch_ids)
+                .order_by('branch_id')
+                .values('branch_id', *InventorySummaryService.FIELDS)
+            }
+            totals = InventorySummaryService.count(branch_ids)
+
+            now = timezone.now()
+            summaries = []
+            drifted = 0
+            for branch_id in branch_ids:
+                counts = totals[branch_id]
+                existing = current.get(branch_id)
+                if existing is None or any(existing[field] != counts[field] for field in counts):
+                    drifted += 1
+                summaries.append(BranchInventorySummary(
+                    branch_id=branch_id, reconciled_at=now, updated_at=now, **counts
+                ))
+
+            BranchInventorySummary.objects.bulk_create(
+                summaries,
+                update_conflicts=True,
+                unique_fields=['branch'],
+                update_fields=[*InventorySummaryService.FIELDS, 'reconciled_at', 'updated_at'],
+                batch_size=BULK_BATCH_SIZE,
+            )
+            if drifted:
+                notify_stock_changed(branch_ids)
+        return drifted
+
+    @staticmethod
+    def totals(branch_id=None, region_code=None, branch_ids=None) -> Dict:
+        """
+        Summed counters for one branch, a region, or every branch (of ``branch_ids``)
+
+        Read-only, so it is safe on the replica. Branches that have no summary
+        row yet (added since the last reconcile) are counted from
+        branch_inventory without persisting a row.
+        """
+        branches = Branch.objects.all()
+        if branch_id:
+            branches = branches.filter(id=branch_id)
+        elif region_code:
+            branches = branches.filter(region__code=region_code)
+        if branch_ids is not None:
+            branches = branches.filter(id__in=branch_ids)
+
+        aggregates = BranchInventorySummary.objects.filter(branch__in=branches).aggregate(
+            **{field: Coalesce(Sum(field), 0) for field in InventorySummaryService.FIELDS}
+        )
+        missing = list(branches.filter(inventory_summary__isnull=True).values_list('id', flat=True))
+        if missing:
+            for counts in InventorySummaryService.count(missing).values():
+                InventorySummaryService.merge(aggregates, counts)
+        return aggregates
@@ -0,0 +1,11 @@
+"""
+Inventory signals
+
+StockLedger writes with queryset ``update()``/``bulk_update()``, which do not
+send ``post_save``; listeners that need to know about stock changes (caches,
+rollups) subscribe to ``stock_changed`` instead.
+"""
+from django.dispatch import Signal
+
+# Sent after the writing transaction commits; kwargs: branch_ids (frozenset)
+stock_changed = Signal()
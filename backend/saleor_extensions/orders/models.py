@@ -1,5 +1,6 @@
 from django.db import models
 from saleor_extensions.branches.models import Branch
+from saleor_extensions.permissions.querysets import BranchScopedQuerySet
 from saleor_extensions.currency.models import Currency
 
 
@@ -56,6 +57,8 @@ class OrderBranchAssignment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = BranchScopedQuerySet.as_manager()
+    
     class Meta:
         db_table = 'order_branch_assignments'
         verbose_name = 'Order Branch Assignment'
@@ -120,6 +123,8 @@ class ManualOrder(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = BranchScopedQuerySet.as_manager()
+    
     class Meta:
         db_table = 'manual_orders'
         verbose_name = 'Manual Order'
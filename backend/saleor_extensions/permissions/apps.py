@@ -6,4 +6,6 @@ class PermissionsConfig(AppConfig):
     name = 'saleor_extensions.permissions'
     verbose_name = 'Permissions'
 
-
+    def ready(self):
+        # Register signal handlers that invalidate cached access profiles
+        import saleor_extensions.permissions.signals  # noqa: F401
@@ -0,0 +1,188 @@
+"""
+Compiled per-user access profiles
+
+A UserAccessProfile holds everything PermissionChecker needs about one user:
+granted permission codes, menu paths and accessible branch IDs, as frozensets.
+It is built in at most three queries (roles, permissions, branches), and then
+every check is a set lookup.
+
+Profiles are cached at two levels:
+- In the Django cache, keyed by user ID and a global permission version.
+  Saving or deleting a UserRole, RolePermission, BranchAccess, Role or
+  Permission, or changing Role.default_branches, bumps the version after
+  commit (saleor_extensions.permissions.signals), which makes every cached
+  profile unreachable. Bulk writes that skip signals (QuerySet.update,
+  bulk_create) must call invalidate_on_commit themselves. This level is
+  skipped unless the cache is shared between processes
+  (saleor_extensions.caching): with a per-process cache a version bump would
+  not reach the other workers.
+- For the current request, in a context variable set up by
+  AccessProfileMiddleware, so repeated checks skip even the cache lookup.
+
+With a shared cache, a permission check costs no database queries after warm-up.
+
+Settings:
+    PERMISSION_PROFILE_CACHE_TIMEOUT: Seconds a shared profile is kept
+        (default 600; 0 disables the shared cache)
+"""
+import contextlib
+import contextvars
+import time
+from dataclasses import dataclass
+from typing import FrozenSet
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from saleor_extensions.caching import is_shared
+from saleor_extensions.permissions.models import (
+    BranchAccess, Role, RolePermission, UserRole
+)
+
+MENU_PERMISSION_TYPES = ('MENU', 'MODULE')
+KEY_PREFIX = 'permissions:v1'
+VERSION_KEY = f'{KEY_PREFIX}:version'
+DEFAULT_TIMEOUT = 600
+
+# user_id -> UserAccessProfile for the current request (None outside one)
+_request_profiles = contextvars.ContextVar('grandgold_access_profiles', default=None)
+
+
+@dataclass(frozen=True)
+class UserAccessProfile:
+    """Permissions and branch access of one user"""
+    user_id: str
+    permission_codes: FrozenSet[str]
+    menu_paths: FrozenSet[str]
+    branch_ids: FrozenSet[str]
+    all_branches: bool
+
+    def has_permission(self, permission_code: str) -> bool:
+        return permission_code in self.permission_codes
+
+    def has_menu_access(self, menu_path: str) -> bool:
+        return menu_path in self.menu_paths
+
+    def can_access_branch(self, branch_id) -> bool:
+        return self.all_branches or str(branch_id) in self.branch_ids
+
+
+def build_profile(user_id: str) -> UserAccessProfile:
+    """Load a user's profile from the database (at most three queries)"""
+    user_id = str(user_id)
+    roles = list(
+        UserRole.objects.filter(user_id=user_id, is_active=True).values_list(
+            'role_id', 'branch_id', 'can_access_all_branches', 'role__can_access_all_branches'
+        )
+    )
+    role_ids = {role_id for role_id, _, _, _ in roles}
+    all_branches = any(user_all or role_all for _, _, user_all, role_all in roles)
+
+    permission_codes = set()
+    menu_paths = set()
+    if role_ids:
+        granted = RolePermission.objects.filter(
+            role_id__in=role_ids,
+            allowed=True,
+            permission__is_active=True,
+        ).values_list('permission__code', 'permission__menu_path', 'permission__permission_type')
+        for code, menu_path, permission_type in granted:
+            permission_codes.add(code)
+            if menu_path and permission_type in MENU_PERMISSION_TYPES:
+                menu_paths.add(menu_path)
+
+    branch_ids = {str(branch_id) for _, branch_id, _, _ in roles if branch_id is not None}
+    if not all_branches:
+        # Explicit access and the roles' default branches in one query
+        branches = BranchAccess.objects.filter(user_id=user_id, is_active=True).values_list('branch_id')
+        if role_ids:
+            branches = branches.union(
+                Role.default_branches.through.objects.filter(role_id__in=role_ids).values_list('branch_id')
+            )
+        branch_ids.update(str(branch_id) for branch_id, in branches)
+
+    return UserAccessProfile(
+        user_id=user_id,
+        permission_codes=frozenset(permission_codes),
+        menu_paths=frozenset(menu_paths),
+        branch_ids=frozenset(branch_ids),
+        all_branches=all_branches,
+    )
+
+
+def _new_version():
+    # Time-based, so a version lost to eviction never comes back and
+    # resurrects profiles cached under it
+    return int(time.time() * 1000)
+
+
+def current_version() -> int:
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, _new_version(), None)
+        version = cache.get(VERSION_KEY, 0)
+    return version
+
+
+def bump_version():
+    """Invalidate every cached profile"""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, _new_version(), None)
+    profiles = _request_profiles.get()
+    if profiles:
+        profiles.clear()
+
+
+def invalidate_on_commit():
+    """Bump the version once the current transaction commits (immediately outside one)"""
+    transaction.on_commit(bump_version)
+
+
+def _shared_profile(user_id: str) -> UserAccessProfile:
+    timeout = getattr(settings, 'PERMISSION_PROFILE_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+    if not timeout or not is_shared():
+        return build_profile(user_id)
+    key = f'{KEY_PREFIX}:profile:{current_version()}:{user_id}'
+    profile = cache.get(key)
+    if profile is None:
+        profile = build_profile(user_id)
+        # Inside a transaction the profile may reflect writes that roll back
+        if not connection.in_atomic_block:
+            cache.set(key, profile, timeout)
+    return profile
+
+
+def get_profile(user_id: str) -> UserAccessProfile:
+    """Profile for ``user_id``: request scope, then the shared cache, then the database"""
+    user_id = str(user_id)
+    profiles = _request_profiles.get()
+    if profiles is None:
+        return _shared_profile(user_id)
+    profile = profiles.get(user_id)
+    if profile is None:
+        profile = profiles[user_id] = _shared_profile(user_id)
+    return profile
+
+
+@contextlib.contextmanager
+def request_scope():
+    """Cache profiles for the duration of the block (one request or task)"""
+    token = _request_profiles.set({})
+    try:
+        yield
+    finally:
+        _request_profiles.reset(token)
+
+
+class AccessProfileMiddleware:
+    """Scope the profile cache to each request"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with request_scope():
+            return self.get_response(request)
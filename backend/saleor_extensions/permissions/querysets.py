@@ -0,0 +1,100 @@
+"""
+Branch-scoped querysets
+
+``Model.objects.for_user(user)`` limits rows to the branches ``user`` may
+access. The filter is one SQL predicate, ``branch_id IN (subquery)``, over
+branch_access, user_roles and the roles' default branches, so scoping
+happens in the database. The planner can then use the ``(branch, ...)``
+indexes instead of the resolver filtering after the fetch.
+
+Superusers and users with an all-branches role (read from their cached
+UserAccessProfile) are not filtered. Requests made with an app token are
+not filtered either: branch roles describe staff, and Saleor's app
+permissions already decide what an integration may read. Anonymous users,
+including app tokens that could not be resolved to an active app, see
+nothing.
+
+Staff without a UserRole or BranchAccess row see nothing while scoping is
+enforced, so provision those rows (or an all-branches role) before turning
+it on.
+
+Settings:
+    BRANCH_SCOPE_ENFORCED: Apply scoping in for_user (default False, which
+        returns every row, as before scoping existed)
+"""
+from django.conf import settings
+from django.db import models
+from django.db.models import Q
+
+from saleor_extensions.permissions.models import BranchAccess, Role, UserRole
+
+
+def accessible_branches(user_id):
+    """Subquery of branch IDs ``user_id`` can access (excluding all-branch roles)"""
+    return (
+        BranchAccess.objects.filter(user_id=user_id, is_active=True).values('branch_id')
+        .union(
+            UserRole.objects.filter(user_id=user_id, is_active=True, branch__isnull=False).values('branch_id'),
+            Role.default_branches.through.objects.filter(
+                role__users__user_id=user_id, role__users__is_active=True
+            ).values('branch_id'),
+        )
+    )
+
+
+def branch_scope(user, app=None):
+    """
+    Branch IDs ``user`` may read, or None when they are not restricted
+
+    Applies the same rules as ``for_user``, for queries that filter on a
+    branch set rather than a scoped model (e.g. the dashboard reports).
+    Returns an ``accessible_branches`` subquery, or an empty list for users
+    who see nothing.
+    """
+    if not getattr(settings, 'BRANCH_SCOPE_ENFORCED', False):
+        return None
+    if app is not None and getattr(app, 'is_active', False):
+        return None
+    if user is None or not user.is_authenticated:
+        return []
+    if user.is_superuser:
+        return None
+
+    from saleor_extensions.permissions.profile import get_profile
+
+    if get_profile(user.pk).all_branches:
+        return None
+    return accessible_branches(user.pk)
+
+
+class BranchScopedQuerySet(models.QuerySet):
+    """QuerySet for models with a branch foreign key"""
+
+    # Branch foreign keys that grant visibility (any one of them)
+    branch_fields = ('branch',)
+
+    def for_branches(self, branch_ids):
+        """Rows belonging to any of ``branch_ids`` (IDs or a values() subquery)"""
+        condition = Q()
+        for field in self.branch_fields:
+            condition |= Q(**{f'{field}_id__in': branch_ids})
+        return self.filter(condition)
+
+    def for_user(self, user, app=None):
+        """Rows in branches ``user`` can access (every row for an active ``app``)"""
+        branch_ids = branch_scope(user, app)
+        if branch_ids is None:
+            return self
+        return self.for_branches(branch_ids)
+
+
+class StockTransferQuerySet(BranchScopedQuerySet):
+    """Transfers are visible from both the sending and the receiving branch"""
+
+    branch_fields = ('from_branch', 'to_branch')
+
+
+class LowStockAlertQuerySet(BranchScopedQuerySet):
+    """Alerts belong to the branch of their inventory row"""
+
+    branch_fields = ('branch_inventory__branch',)
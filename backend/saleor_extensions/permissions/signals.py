@@ -0,0 +1,29 @@
+"""
+Invalidate cached access profiles when roles, permissions or branch access change
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from saleor_extensions.permissions.models import (
+    BranchAccess, Permission, Role, RolePermission, UserRole
+)
+from saleor_extensions.permissions.profile import invalidate_on_commit
+
+PROFILE_MODELS = (Role, Permission, RolePermission, UserRole, BranchAccess)
+
+
+def invalidate_profiles(sender, **kwargs):
+    """Bump the permission version after any change to the access graph"""
+    invalidate_on_commit()
+
+
+for _model in PROFILE_MODELS:
+    post_save.connect(invalidate_profiles, sender=_model, dispatch_uid=f'permissions_profile_on_{_model.__name__}_save')
+    post_delete.connect(invalidate_profiles, sender=_model, dispatch_uid=f'permissions_profile_on_{_model.__name__}_delete')
+
+
+@receiver(m2m_changed, sender=Role.default_branches.through, dispatch_uid='permissions_profile_on_default_branches')
+def invalidate_profiles_on_default_branches(sender, action, **kwargs):
+    """Role.default_branches add/remove/clear"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_on_commit()
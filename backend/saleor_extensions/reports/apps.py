@@ -6,4 +6,8 @@ class ReportsConfig(AppConfig):
     name = 'saleor_extensions.reports'
     verbose_name = 'Reports'
 
-
+    def ready(self):
+        # Register signal handlers that maintain DailySalesFact
+        import saleor_extensions.reports.signals  # noqa: F401
+        # Warn when generations would not be shared between workers
+        import saleor_extensions.caching  # noqa: F401
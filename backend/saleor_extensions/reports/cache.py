@@ -0,0 +1,191 @@
+"""
+Result cache for dashboard resolvers
+
+Resolver results are stored in the Django cache, keyed by resolver name,
+arguments, the caller's permitted branch set and the current generation of
+every data domain the resolver depends on. Writes to order assignments or
+inventory bump the domain generation (after commit), which makes every older
+entry unreachable without having to enumerate keys. TTLs bound staleness for
+time-relative queries such as "last 30 days".
+
+Generations and hit/miss counters are only consistent across workers when the
+default cache is shared (Redis via REDIS_URL or CACHE_URL, see
+saleor_extensions.caching). With a per-process cache a write only invalidates
+the worker that made it, and every other worker serves stale results until
+the TTL expires.
+
+Settings:
+    REPORTS_CACHE_ENABLED: Turn the cache off entirely (default True)
+    REPORTS_CACHE_TIMEOUT: Default TTL in seconds (default 60)
+    REPORTS_CACHE_TIMEOUTS: Per-resolver TTL overrides, e.g. {'sales_chart_data': 300}
+"""
+import functools
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+SALES = 'sales'
+INVENTORY = 'inventory'
+
+KEY_PREFIX = 'reports:v1'
+DEFAULT_TIMEOUT = 60
+
+# Names of every cached resolver, for stats()
+_names = set()
+
+
+def is_enabled():
+    return getattr(settings, 'REPORTS_CACHE_ENABLED', True)
+
+
+def timeout_for(name):
+    """TTL in seconds for a resolver"""
+    overrides = getattr(settings, 'REPORTS_CACHE_TIMEOUTS', {}) or {}
+    return overrides.get(name, getattr(settings, 'REPORTS_CACHE_TIMEOUT', DEFAULT_TIMEOUT))
+
+
+def _generation_key(domain):
+    return f'{KEY_PREFIX}:generation:{domain}'
+
+
+def bump_generation(domain):
+    """Invalidate every cached result that depends on ``domain``"""
+    key = _generation_key(domain)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Not set yet (or evicted): start a new generation that never expires
+        cache.set(key, 1, None)
+
+
+def invalidate_on_commit(domain):
+    """Bump ``domain`` once the current transaction commits (immediately outside one)"""
+    transaction.on_commit(lambda: bump_generation(domain))
+
+
+def _generations(domains):
+    values = cache.get_many([_generation_key(domain) for domain in domains])
+    return [str(values.get(_generation_key(domain), 0)) for domain in domains]
+
+
+def branch_scope_key(context):
+    """
+    Cache partition for the caller's permitted branch set
+
+    Follows permissions.querysets.branch_scope: every caller whose reports
+    are not filtered shares 'all'. Computed once per request and stored on
+    the GraphQL context.
+    """
+    scope = getattr(context, '_reports_branch_scope', None)
+    if scope is not None:
+        return scope
+
+    from saleor_extensions.permissions.querysets import branch_scope
+
+    user = getattr(context, 'user', None)
+    if branch_scope(user, getattr(context, 'app', None)) is None:
+        scope = 'all'
+    elif user is None or not user.is_authenticated:
+        scope = 'anonymous'
+    else:
+        from saleor_extensions.permissions.utils import PermissionChecker
+
+        branch_ids = sorted(PermissionChecker.get_user_branches(str(user.id)))
+        scope = 'branches:' + hashlib.sha1(','.join(branch_ids).encode('utf-8')).hexdigest()[:16]
+
+    try:
+        setattr(context, '_reports_branch_scope', scope)
+    except AttributeError:
+        pass
+    return scope
+
+
+def build_key(name, arguments, scope, depends_on):
+    arguments_hash = hashlib.sha1(
+        json.dumps(arguments, sort_keys=True, default=str).encode('utf-8')
+    ).hexdigest()
+    generations = '.'.join(_generations(depends_on))
+    return f'{KEY_PREFIX}:{name}:{generations}:{scope}:{arguments_hash}'
+
+
+def _stats_key(name, counter):
+    return f'{KEY_PREFIX}:stats:{name}:{counter}'
+
+
+def _record(name, hit):
+    key = _stats_key(name, 'hits' if hit else 'misses')
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def stats():
+    """Hit/miss counters per resolver, summed over every process sharing the cache"""
+    keys = {
+        (name, counter): _stats_key(name, counter)
+        for name in _names for counter in ('hits', 'misses')
+    }
+    values = cache.get_many(list(keys.values()))
+    result = {}
+    for (name, counter), key in keys.items():
+        result.setdefault(name, {'hits': 0, 'misses': 0})[counter] = values.get(key, 0)
+    return {name: counters for name, counters in result.items() if counters['hits'] or counters['misses']}
+
+
+def _dump(result_type, value):
+    """Reduce a graphene ObjectType instance to a plain dict of its fields"""
+    if value is None:
+        return None
+    return {field: getattr(value, field, None) for field in result_type._meta.fields}
+
+
+def _load(result_type, data):
+    if data is None:
+        return None
+    return result_type(**data)
+
+
+def cached_resolver(name, result_type, depends_on=(SALES,), many=True):
+    """
+    Cache a DashboardQueries resolver
+
+    Args:
+        name: Stable cache name (also used for TTL overrides and stats)
+        result_type: ObjectType returned by the resolver
+        depends_on: Data domains whose writes invalidate the result
+        many: Whether the resolver returns a list of ``result_type``
+    """
+    _names.add(name)
+
+    def decorator(resolver):
+        @functools.wraps(resolver)
+        def wrapper(root, info, **kwargs):
+            if not is_enabled():
+                return resolver(root, info, **kwargs)
+
+            key = build_key(name, kwargs, branch_scope_key(info.context), depends_on)
+            cached = cache.get(key)
+            if cached is not None:
+                _record(name, hit=True)
+                payload = cached['payload']
+                if many:
+                    return [_load(result_type, item) for item in payload]
+                return _load(result_type, payload)
+
+            _record(name, hit=False)
+            result = resolver(root, info, **kwargs)
+            if many:
+                payload = [_dump(result_type, item) for item in (result or [])]
+            else:
+                payload = _dump(result_type, result)
+            cache.set(key, {'payload': payload}, timeout_for(name))
+            return result
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,144 @@
+"""
+KPI engine for dashboard tiles
+
+KPIs are computed from per-period order totals (order count, gross and net
+revenue). The engine reads those totals for the current and the previous
+period in one pass over daily_sales_facts (plus one raw query for today's
+partial day), so adding a KPI to the registry does not add a round trip.
+
+Adding a KPI:
+    register_kpi(KPIDefinition(
+        key='net_revenue',
+        label='Net Revenue',
+        value=lambda totals: totals['net'],
+        is_money=True,
+    ))
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, Optional
+
+from saleor_extensions.reports.services import SalesFactService, SalesReportService
+
+MONEY_QUANTUM = Decimal('0.01')
+
+
+@dataclass(frozen=True)
+class KPIDefinition:
+    """How to compute one KPI from a period's order totals"""
+    key: str
+    label: str
+    # Receives {'orders': int, 'gross': Decimal, 'net': Decimal} for one period
+    value: Callable[[Dict], Decimal]
+    is_money: bool = False
+
+
+@dataclass(frozen=True)
+class KPIResult:
+    """A KPI value for the current period alongside the previous period"""
+    key: str
+    label: str
+    value: Decimal
+    previous: Decimal
+    currency: Optional[str] = None
+
+    @property
+    def change(self) -> float:
+        """Percentage change from the previous period"""
+        return SalesReportService.growth_percent(self.value, self.previous)
+
+    @property
+    def trend(self) -> str:
+        change = self.change
+        return "up" if change > 0 else "down" if change < 0 else "stable"
+
+
+KPI_REGISTRY: Dict[str, KPIDefinition] = {}
+
+
+def register_kpi(definition: KPIDefinition) -> KPIDefinition:
+    """Register (or replace) a KPI so the engine can compute it"""
+    KPI_REGISTRY[definition.key] = definition
+    return definition
+
+
+register_kpi(KPIDefinition(
+    key='revenue',
+    label='Total Revenue',
+    value=lambda totals: totals['gross'],
+    is_money=True,
+))
+register_kpi(KPIDefinition(
+    key='orders',
+    label='Total Orders',
+    value=lambda totals: totals['orders'],
+))
+register_kpi(KPIDefinition(
+    key='average_order_value',
+    label='Average Order Value',
+    value=lambda totals: totals['gross'] / totals['orders'] if totals['orders'] else 0,
+    is_money=True,
+))
+
+
+class KPIEngine:
+    """Evaluate registered KPIs for a period and the one before it"""
+
+    @staticmethod
+    def compute(
+        keys: Iterable[str],
+        date_from: datetime,
+        date_to: datetime,
+        branch_id: Optional[str] = None,
+        region_code: Optional[str] = None,
+        currency: Optional[str] = None,
+        labels: Optional[Dict[str, str]] = None,
+        branch_ids: Optional[Iterable] = None,
+    ) -> Dict[str, KPIResult]:
+        """
+        Compute KPIs for the days ``date_from..date_to`` and the equally long period before
+
+        Args:
+            keys: Registered KPI keys to compute
+            branch_id: Restrict to one branch
+            region_code: Restrict to branches in a region
+            currency: Currency money KPIs are converted into and reported in
+            labels: Optional label overrides by key
+            branch_ids: Restrict to these branches (the caller's branch scope)
+
+        Returns:
+            Dict of KPIResult by key, in the order requested
+        """
+        definitions = [KPI_REGISTRY[key] for key in keys]
+        labels = labels or {}
+
+        current_from, current_to, previous_from, _ = SalesFactService.comparison_days(date_from, date_to)
+        daily = SalesFactService.daily_totals(
+            previous_from, current_to, branch_id=branch_id, region_code=region_code, currency=currency,
+            branch_ids=branch_ids,
+        )
+        current = SalesFactService.sum_totals(
+            totals for (_, day), totals in daily.items() if day >= current_from
+        )
+        previous = SalesFactService.sum_totals(
+            totals for (_, day), totals in daily.items() if day < current_from
+        )
+
+        results = {}
+        for definition in definitions:
+            results[definition.key] = KPIResult(
+                key=definition.key,
+                label=labels.get(definition.key, definition.label),
+                value=KPIEngine._normalise(definition.value(current), definition),
+                previous=KPIEngine._normalise(definition.value(previous), definition),
+                currency=currency if definition.is_money else None,
+            )
+        return results
+
+    @staticmethod
+    def _normalise(value, definition: KPIDefinition) -> Decimal:
+        value = Decimal(value or 0)
+        if definition.is_money:
+            return value.quantize(MONEY_QUANTUM)
+        return value
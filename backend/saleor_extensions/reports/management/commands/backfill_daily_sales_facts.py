@@ -0,0 +1,91 @@
+"""
+Django management command to (re)build DailySalesFact rows from order history.
+
+Usage:
+    python manage.py backfill_daily_sales_facts
+    python manage.py backfill_daily_sales_facts --start 2025-01-01 --end 2025-12-31 --chunk-days 7
+    python manage.py backfill_daily_sales_facts --missing-only   # release phase
+"""
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+
+from saleor_extensions.orders.models import OrderBranchAssignment
+from saleor_extensions.reports.services import SalesFactService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild daily sales facts from order branch assignments, in chunks of days'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--start',
+            help='First day to rebuild (YYYY-MM-DD). Defaults to the oldest order assignment.',
+        )
+        parser.add_argument(
+            '--end',
+            help='Last day to rebuild (YYYY-MM-DD). Defaults to today.',
+        )
+        parser.add_argument(
+            '--chunk-days',
+            type=int,
+            default=31,
+            help='Days rebuilt per transaction (default: 31)',
+        )
+        parser.add_argument(
+            '--missing-only',
+            action='store_true',
+            help='Only rebuild order history older than the oldest fact (nothing when facts cover it)',
+        )
+        parser.add_argument(
+            '--branch',
+            action='append',
+            dest='branch_ids',
+            help='Only rebuild this branch id (repeatable)',
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_days'] < 1:
+            raise CommandError('--chunk-days must be at least 1')
+
+        if options['missing_only']:
+            missing = SalesFactService.unbuilt_history()
+            if missing is None:
+                self.stdout.write("Daily sales facts cover all order history; nothing to backfill")
+                return
+            start, end = missing
+        else:
+            end = self._parse_date(options['end']) or timezone.localdate()
+            start = self._parse_date(options['start'])
+        if start is None:
+            first = OrderBranchAssignment.objects.aggregate(first=Min('created_at'))['first']
+            if first is None:
+                self.stdout.write("No order assignments found; nothing to backfill")
+                return
+            # One day of slack so region-local dates west of the site time zone are covered
+            start = timezone.localtime(first).date() - timedelta(days=1)
+        if start > end:
+            raise CommandError('--start must not be after --end')
+
+        chunk = timedelta(days=options['chunk_days'])
+        total = 0
+        chunk_start = start
+        while chunk_start <= end:
+            chunk_end = min(chunk_start + chunk - timedelta(days=1), end)
+            written = SalesFactService.rebuild(chunk_start, chunk_end, branch_ids=options['branch_ids'])
+            total += written
+            self.stdout.write(f"  {chunk_start} .. {chunk_end}: {written} fact rows")
+            chunk_start = chunk_end + timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Rebuilt daily sales facts {start} .. {end} ({total} rows)"))
+
+    @staticmethod
+    def _parse_date(value):
+        if not value:
+            return None
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise CommandError(f"Invalid date: {value} (expected YYYY-MM-DD)")
@@ -0,0 +1,115 @@
+# Generated by Django 5.2.9 on 2026-10-17 11:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('branches', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportDefinition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('code', models.CharField(max_length=100, unique=True)),
+                ('report_type', models.CharField(choices=[('SALES', 'Sales Report'), ('INVENTORY', 'Inventory Report'), ('CUSTOMER', 'Customer Report'), ('OPERATIONAL', 'Operational Report'), ('FINANCIAL', 'Financial Report'), ('CUSTOM', 'Custom Report')], max_length=50)),
+                ('description', models.TextField(blank=True)),
+                ('query_config', models.JSONField(default=dict)),
+                ('column_config', models.JSONField(default=list)),
+                ('filters_config', models.JSONField(default=dict)),
+                ('is_active', models.BooleanField(default=True)),
+                ('requires_permission', models.CharField(blank=True, max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Report Definition',
+                'verbose_name_plural': 'Report Definitions',
+                'db_table': 'report_definitions',
+                'ordering': ['report_type', 'name'],
+                'indexes': [models.Index(fields=['code', 'is_active'], name='report_defi_code_7ae3cd_idx'), models.Index(fields=['report_type'], name='report_defi_report__a40186_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailySalesFact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('currency', models.CharField(max_length=3)),
+                ('order_count', models.IntegerField(default=0)),
+                ('gross_total', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('net_total', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('branch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales_facts', to='branches.branch')),
+            ],
+            options={
+                'verbose_name': 'Daily Sales Fact',
+                'verbose_name_plural': 'Daily Sales Facts',
+                'db_table': 'daily_sales_facts',
+                'indexes': [models.Index(fields=['branch', 'date'], name='daily_sales_branch__ae058b_idx')],
+                'unique_together': {('date', 'branch', 'currency')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ReportExecution',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('filters', models.JSONField(default=dict)),
+                ('date_from', models.DateField(blank=True, null=True)),
+                ('date_to', models.DateField(blank=True, null=True)),
+                ('country', models.CharField(blank=True, default='', max_length=100)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed')], default='PENDING', max_length=20)),
+                ('result_data', models.JSONField(blank=True, default=dict)),
+                ('file_url', models.URLField(blank=True)),
+                ('file_format', models.CharField(blank=True, max_length=20)),
+                ('executed_by', models.CharField(blank=True, max_length=255)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('error_message', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('branch', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='report_executions', to='branches.branch')),
+                ('report_definition', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='executions', to='reports.reportdefinition')),
+            ],
+            options={
+                'verbose_name': 'Report Execution',
+                'verbose_name_plural': 'Report Executions',
+                'db_table': 'report_executions',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['report_definition', 'status', 'created_at'], name='report_exec_report__de40f7_idx'), models.Index(fields=['branch', 'country', 'created_at'], name='report_exec_branch__3f1210_idx'), models.Index(fields=['status', 'created_at'], name='report_exec_status_29b0a4_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ScheduledReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('frequency', models.CharField(choices=[('DAILY', 'Daily'), ('WEEKLY', 'Weekly'), ('MONTHLY', 'Monthly'), ('QUARTERLY', 'Quarterly'), ('YEARLY', 'Yearly')], max_length=20)),
+                ('default_filters', models.JSONField(default=dict)),
+                ('default_country', models.CharField(blank=True, default='', max_length=100)),
+                ('email_recipients', models.JSONField(default=list)),
+                ('file_format', models.CharField(default='PDF', max_length=20)),
+                ('is_active', models.BooleanField(default=True)),
+                ('next_run_at', models.DateTimeField(blank=True, null=True)),
+                ('last_run_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.CharField(blank=True, max_length=255)),
+                ('default_branch', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='branches.branch')),
+                ('report_definition', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='schedules', to='reports.reportdefinition')),
+            ],
+            options={
+                'verbose_name': 'Scheduled Report',
+                'verbose_name_plural': 'Scheduled Reports',
+                'db_table': 'scheduled_reports',
+                'ordering': ['name'],
+                'indexes': [models.Index(fields=['is_active', 'next_run_at'], name='scheduled_r_is_acti_e62fe3_idx'), models.Index(fields=['frequency'], name='scheduled_r_frequen_98dc87_idx')],
+            },
+        ),
+    ]
@@ -162,3 +162,30 @@ class ScheduledReport(models.Model):
         return f"{self.name} - {self.get_frequency_display()}"
 
 
+
+class DailySalesFact(models.Model):
+    """Daily order totals per branch and currency, for dashboards and reports"""
+    # Calendar day in the branch's region time zone
+    date = models.DateField()
+    branch = models.ForeignKey(
+        Branch,
+        on_delete=models.CASCADE,
+        related_name='daily_sales_facts'
+    )
+    currency = models.CharField(max_length=3)
+    order_count = models.IntegerField(default=0)
+    gross_total = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    net_total = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'daily_sales_facts'
+        verbose_name = 'Daily Sales Fact'
+        verbose_name_plural = 'Daily Sales Facts'
+        unique_together = [['date', 'branch', 'currency']]
+        indexes = [
+            models.Index(fields=['branch', 'date']),
+        ]
+    
+    def __str__(self):
+        return f"{self.date} branch {self.branch_id} {self.currency}: {self.order_count} orders"
@@ -3,7 +3,7 @@ GraphQL Schema for Dashboard and Reporting Data
 Provides queries for executive and branch dashboards
 """
 import graphene
-from django.db.models import Sum, Count, Avg, Q, F
+from django.db.models import Count, Q
 from datetime import datetime, timedelta
 from decimal import Decimal as PythonDecimal
 
@@ -15,10 +15,16 @@ except ImportError:
     Decimal = graphene.Decimal
 
 # Import models
-from saleor_extensions.orders.models import OrderBranchAssignment, ManualOrder
-from saleor_extensions.inventory.models import BranchInventory, StockMovement
+from saleor_extensions.orders.models import ManualOrder
+from saleor_extensions.inventory.models import StockMovement
+from saleor_extensions.inventory.services import InventorySummaryService
+from saleor_extensions.reports.cache import INVENTORY, SALES, cached_resolver, stats as cache_stats
+from saleor_extensions.reports.kpis import KPIEngine
+from saleor_extensions.reports.services import DEFAULT_REPORT_CURRENCY, SalesReportService
 from saleor_extensions.branches.models import Branch
 from saleor_extensions.currency.models import Currency
+from saleor_extensions.db_routing import replica_queries
+from saleor_extensions.permissions.querysets import branch_scope
 
 
 # ============================================================================
@@ -52,6 +58,17 @@ class BranchPerformanceType(graphene.ObjectType):
     currency = graphene.String()
 
 
+class RegionPerformanceType(graphene.ObjectType):
+    """Region-level revenue rollup"""
+    region_code = graphene.String()
+    region_name = graphene.String()
+    branch_count = graphene.Int()
+    sales = Decimal()
+    orders = graphene.Int()
+    growth = graphene.Float()
+    currency = graphene.String()
+
+
 class ProductPerformanceType(graphene.ObjectType):
     """Top performing products"""
     product_id = graphene.ID()
@@ -70,10 +87,41 @@ class InventoryStatusType(graphene.ObjectType):
     currency = graphene.String()
 
 
+def _kpi_type(result):
+    """Convert a KPIResult from the KPI engine into the GraphQL KPIType"""
+    return KPIType(
+        label=result.label,
+        value=str(result.value),
+        change=result.change,
+        trend=result.trend,
+        currency=result.currency
+    )
+
+
+def _branch_ids(info):
+    """Branches the caller may report on, or None for every branch (see branch_scope)"""
+    context = info.context
+    return branch_scope(getattr(context, 'user', None), getattr(context, 'app', None))
+
+
+EXECUTIVE_KPI_KEYS = ('revenue', 'orders', 'average_order_value')
+BRANCH_KPI_KEYS = ('revenue', 'orders')
+BRANCH_KPI_LABELS = {'revenue': 'Branch Revenue', 'orders': 'Orders'}
+
+
+class DashboardCacheStatType(graphene.ObjectType):
+    """Dashboard cache hit/miss counters for one resolver (all workers sharing the cache)"""
+    resolver = graphene.String()
+    hits = graphene.Int()
+    misses = graphene.Int()
+    hit_rate = graphene.Float()
+
+
 # ============================================================================
 # Dashboard Queries
 # ============================================================================
 
+@replica_queries
 class DashboardQueries(graphene.ObjectType):
     """Dashboard-related queries for executive and branch views"""
     
@@ -101,6 +149,7 @@ class DashboardQueries(graphene.ObjectType):
         branch_id=graphene.ID(),
         region_code=graphene.String(),
         period=graphene.String(default_value="30d"),  # 7d, 30d, 90d, 1y
+        granularity=graphene.String(default_value="day"),  # day, week, month
         description="Get sales data for chart visualization"
     )
     
@@ -132,14 +181,21 @@ class DashboardQueries(graphene.ObjectType):
         description="Get inventory status summary"
     )
     
+    # Dashboard cache counters
+    dashboard_cache_stats = graphene.List(
+        DashboardCacheStatType,
+        description="Hit/miss counters of the dashboard result cache"
+    )
+    
     # Revenue by region
     revenue_by_region = graphene.List(
-        BranchPerformanceType,
+        RegionPerformanceType,
         start_date=graphene.String(),
         end_date=graphene.String(),
         description="Get revenue breakdown by region"
     )
     
+    @cached_resolver('executive_kpis', KPIType, depends_on=(SALES,))
     def resolve_executive_kpis(self, info, region_code=None, start_date=None, end_date=None):
         """Get executive dashboard KPIs"""
         # Parse dates
@@ -153,106 +209,23 @@ class DashboardQueries(graphene.ObjectType):
         else:
             start_date_obj = end_date_obj - timedelta(days=30)
         
-        # Previous period for comparison
-        period_days = (end_date_obj - start_date_obj).days
-        prev_start = start_date_obj - timedelta(days=period_days)
-        prev_end = start_date_obj
-        
-        kpis = []
-        
-        # Build base queryset
-        orders_qs = OrderBranchAssignment.objects.filter(
-            created_at__gte=start_date_obj,
-            created_at__lte=end_date_obj
+        # Current and previous period for every KPI in one query
+        branch_ids = _branch_ids(info)
+        results = KPIEngine.compute(
+            EXECUTIVE_KPI_KEYS,
+            start_date_obj,
+            end_date_obj,
+            region_code=region_code,
+            currency=DEFAULT_REPORT_CURRENCY,  # Money from every region is converted into GBP
+            branch_ids=branch_ids
         )
-        prev_orders_qs = OrderBranchAssignment.objects.filter(
-            created_at__gte=prev_start,
-            created_at__lte=prev_end
-        )
-        
-        if region_code:
-            orders_qs = orders_qs.filter(region__code=region_code)
-            prev_orders_qs = prev_orders_qs.filter(region__code=region_code)
-        
-        # Total Revenue
-        try:
-            total_revenue = orders_qs.aggregate(
-                total=Sum('order__total_gross_amount')
-            )['total'] or Decimal('0')
-            
-            prev_total_revenue = prev_orders_qs.aggregate(
-                total=Sum('order__total_gross_amount')
-            )['total'] or Decimal('0')
-            
-            change = 0.0
-            if prev_total_revenue > 0:
-                change = ((total_revenue - prev_total_revenue) / prev_total_revenue) * 100
-            
-            kpis.append(KPIType(
-                label="Total Revenue",
-                value=str(total_revenue),
-                change=float(change),
-                trend="up" if change > 0 else "down" if change < 0 else "stable",
-                currency="GBP"  # Default, should get from orders
-            ))
-        except Exception as e:
-            # Fallback if Saleor Order fields don't exist
-            kpis.append(KPIType(
-                label="Total Revenue",
-                value="0",
-                change=0.0,
-                trend="stable",
-                currency="GBP"
-            ))
-        
-        # Total Orders
-        total_orders = orders_qs.count()
-        prev_total_orders = prev_orders_qs.count()
-        
-        change = 0.0
-        if prev_total_orders > 0:
-            change = ((total_orders - prev_total_orders) / prev_total_orders) * 100
-        
-        kpis.append(KPIType(
-            label="Total Orders",
-            value=str(total_orders),
-            change=float(change),
-            trend="up" if change > 0 else "down" if change < 0 else "stable",
-            currency=None
-        ))
-        
-        # Average Order Value
-        try:
-            avg_order_value = orders_qs.aggregate(
-                avg=Avg('order__total_gross_amount')
-            )['avg'] or Decimal('0')
-            
-            prev_avg_order_value = prev_orders_qs.aggregate(
-                avg=Avg('order__total_gross_amount')
-            )['avg'] or Decimal('0')
-            
-            change = 0.0
-            if prev_avg_order_value > 0:
-                change = ((avg_order_value - prev_avg_order_value) / prev_avg_order_value) * 100
-            
-            kpis.append(KPIType(
-                label="Average Order Value",
-                value=str(avg_order_value),
-                change=float(change),
-                trend="up" if change > 0 else "down" if change < 0 else "stable",
-                currency="GBP"
-            ))
-        except Exception:
-            kpis.append(KPIType(
-                label="Average Order Value",
-                value="0",
-                change=0.0,
-                trend="stable",
-                currency="GBP"
-            ))
+        kpis = [_kpi_type(result) for result in results.values()]
         
         # Active Branches
-        active_branches = Branch.objects.filter(is_active=True).count()
+        branches = Branch.objects.filter(is_active=True)
+        if branch_ids is not None:
+            branches = branches.filter(id__in=branch_ids)
+        active_branches = branches.count()
         kpis.append(KPIType(
             label="Active Branches",
             value=str(active_branches),
@@ -263,10 +236,16 @@ class DashboardQueries(graphene.ObjectType):
         
         return kpis
     
+    @cached_resolver('branch_kpis', KPIType, depends_on=(SALES, INVENTORY))
     def resolve_branch_kpis(self, info, branch_id, start_date=None, end_date=None):
         """Get branch-specific KPIs"""
+        # A branch outside the caller's scope is reported as not found
+        branches = Branch.objects.select_related('region')
+        branch_ids = _branch_ids(info)
+        if branch_ids is not None:
+            branches = branches.filter(id__in=branch_ids)
         try:
-            branch = Branch.objects.get(id=branch_id)
+            branch = branches.get(id=branch_id)
         except Branch.DoesNotExist:
             return []
         
@@ -281,77 +260,21 @@ class DashboardQueries(graphene.ObjectType):
         else:
             start_date_obj = end_date_obj - timedelta(days=30)
         
-        # Previous period
-        period_days = (end_date_obj - start_date_obj).days
-        prev_start = start_date_obj - timedelta(days=period_days)
-        prev_end = start_date_obj
-        
-        kpis = []
-        
-        # Branch orders
-        orders_qs = OrderBranchAssignment.objects.filter(
-            branch_id=branch_id,
-            created_at__gte=start_date_obj,
-            created_at__lte=end_date_obj
-        )
-        prev_orders_qs = OrderBranchAssignment.objects.filter(
+        # Branch revenue and orders, current and previous period in one query
+        results = KPIEngine.compute(
+            BRANCH_KPI_KEYS,
+            start_date_obj,
+            end_date_obj,
             branch_id=branch_id,
-            created_at__gte=prev_start,
-            created_at__lte=prev_end
+            currency=branch.region.default_currency,
+            labels=BRANCH_KPI_LABELS
         )
+        kpis = [_kpi_type(result) for result in results.values()]
         
-        # Branch Revenue
-        try:
-            revenue = orders_qs.aggregate(
-                total=Sum('order__total_gross_amount')
-            )['total'] or Decimal('0')
-            
-            prev_revenue = prev_orders_qs.aggregate(
-                total=Sum('order__total_gross_amount')
-            )['total'] or Decimal('0')
-            
-            change = 0.0
-            if prev_revenue > 0:
-                change = ((revenue - prev_revenue) / prev_revenue) * 100
-            
-            kpis.append(KPIType(
-                label="Branch Revenue",
-                value=str(revenue),
-                change=float(change),
-                trend="up" if change > 0 else "down" if change < 0 else "stable",
-                currency=branch.region.default_currency
-            ))
-        except Exception:
-            kpis.append(KPIType(
-                label="Branch Revenue",
-                value="0",
-                change=0.0,
-                trend="stable",
-                currency=branch.region.default_currency
-            ))
-        
-        # Branch Orders
-        orders_count = orders_qs.count()
-        prev_orders_count = prev_orders_qs.count()
-        
-        change = 0.0
-        if prev_orders_count > 0:
-            change = ((orders_count - prev_orders_count) / prev_orders_count) * 100
-        
-        kpis.append(KPIType(
-            label="Orders",
-            value=str(orders_count),
-            change=float(change),
-            trend="up" if change > 0 else "down" if change < 0 else "stable",
-            currency=None
-        ))
-        
-        # Inventory Items
-        inventory_count = BranchInventory.objects.filter(branch_id=branch_id).count()
-        low_stock_count = BranchInventory.objects.filter(
-            branch_id=branch_id,
-            quantity__lte=F('low_stock_threshold')
-        ).count()
+        # Inventory Items (read from the per-branch summary rollup)
+        inventory_summary = InventorySummaryService.totals(branch_id=branch_id)
+        inventory_count = inventory_summary['total_items']
+        low_stock_count = inventory_summary['low_stock_items']
         
         kpis.append(KPIType(
             label="Inventory Items",
@@ -371,62 +294,29 @@ class DashboardQueries(graphene.ObjectType):
         
         return kpis
     
-    def resolve_sales_chart_data(self, info, branch_id=None, region_code=None, period="30d", **kwargs):
-        """Get sales data for chart visualization"""
-        # Parse period
-        period_map = {
-            "7d": 7,
-            "30d": 30,
-            "90d": 90,
-            "1y": 365
-        }
-        days = period_map.get(period, 30)
-        
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-        
-        # Build queryset
-        orders_qs = OrderBranchAssignment.objects.filter(
-            created_at__gte=start_date,
-            created_at__lte=end_date
+    @cached_resolver('sales_chart_data', SalesDataPoint, depends_on=(SALES,))
+    def resolve_sales_chart_data(self, info, branch_id=None, region_code=None, period="30d",
+                                 granularity="day", **kwargs):
+        """Get sales data for chart visualization (one grouped query per chart)"""
+        series = SalesReportService.sales_time_series(
+            period=period,
+            granularity=(granularity or "day").lower(),
+            branch_id=branch_id,
+            region_code=region_code,
+            branch_ids=_branch_ids(info),
         )
         
-        if branch_id:
-            orders_qs = orders_qs.filter(branch_id=branch_id)
-        if region_code:
-            orders_qs = orders_qs.filter(region__code=region_code)
-        
-        # Group by date
-        data_points = []
-        current_date = start_date.date()
-        
-        while current_date <= end_date.date():
-            day_start = datetime.combine(current_date, datetime.min.time())
-            day_end = day_start + timedelta(days=1)
-            
-            day_orders = orders_qs.filter(
-                created_at__gte=day_start,
-                created_at__lt=day_end
+        return [
+            SalesDataPoint(
+                date=point['date'].isoformat(),
+                value=point['revenue'],
+                orders=point['orders'],
+                currency=series['currency']
             )
-            
-            try:
-                day_revenue = day_orders.aggregate(
-                    total=Sum('order__total_gross_amount')
-                )['total'] or Decimal('0')
-            except Exception:
-                day_revenue = Decimal('0')
-            
-            data_points.append(SalesDataPoint(
-                date=current_date.isoformat(),
-                value=day_revenue,
-                orders=day_orders.count(),
-                currency="GBP"  # Default
-            ))
-            
-            current_date += timedelta(days=1)
-        
-        return data_points
+            for point in series['points']
+        ]
     
+    @cached_resolver('branch_performance', BranchPerformanceType, depends_on=(SALES,))
     def resolve_branch_performance(self, info, region_code=None, start_date=None, end_date=None, **kwargs):
         """Get performance metrics for all branches"""
         # Parse dates
@@ -440,60 +330,19 @@ class DashboardQueries(graphene.ObjectType):
         else:
             start_date_obj = end_date_obj - timedelta(days=30)
         
-        branches_qs = Branch.objects.filter(is_active=True)
-        if region_code:
-            branches_qs = branches_qs.filter(region__code=region_code)
-        
-        performance = []
-        
-        for branch in branches_qs:
-            orders_qs = OrderBranchAssignment.objects.filter(
-                branch_id=branch.id,
-                created_at__gte=start_date_obj,
-                created_at__lte=end_date_obj
+        return [
+            BranchPerformanceType(
+                branch_id=str(branch['branch_id']),
+                branch_name=branch['branch_name'],
+                sales=branch['sales'],
+                orders=branch['orders'],
+                growth=branch['growth'],
+                currency=branch['currency']
             )
-            
-            try:
-                sales = orders_qs.aggregate(
-                    total=Sum('order__total_gross_amount')
-                )['total'] or Decimal('0')
-            except Exception:
-                sales = Decimal('0')
-            
-            orders_count = orders_qs.count()
-            
-            # Calculate growth (simplified - compare with previous period)
-            period_days = (end_date_obj - start_date_obj).days
-            prev_start = start_date_obj - timedelta(days=period_days)
-            prev_end = start_date_obj
-            
-            prev_orders_qs = OrderBranchAssignment.objects.filter(
-                branch_id=branch.id,
-                created_at__gte=prev_start,
-                created_at__lte=prev_end
+            for branch in SalesReportService.branch_performance(
+                start_date_obj, end_date_obj, region_code, _branch_ids(info)
             )
-            
-            try:
-                prev_sales = prev_orders_qs.aggregate(
-                    total=Sum('order__total_gross_amount')
-                )['total'] or Decimal('0')
-            except Exception:
-                prev_sales = Decimal('0')
-            
-            growth = 0.0
-            if prev_sales > 0:
-                growth = ((sales - prev_sales) / prev_sales) * 100
-            
-            performance.append(BranchPerformanceType(
-                branch_id=str(branch.id),
-                branch_name=branch.name,
-                sales=sales,
-                orders=orders_count,
-                growth=float(growth),
-                currency=branch.region.default_currency
-            ))
-        
-        return performance
+        ]
     
     def resolve_top_products(self, info, branch_id=None, region_code=None, limit=10, 
                             start_date=None, end_date=None, **kwargs):
@@ -503,18 +352,17 @@ class DashboardQueries(graphene.ObjectType):
         # In real implementation, would aggregate from order items
         return []
     
+    @cached_resolver('inventory_status', InventoryStatusType, depends_on=(INVENTORY,), many=False)
     def resolve_inventory_status(self, info, branch_id=None, region_code=None, **kwargs):
         """Get inventory status summary"""
-        inventory_qs = BranchInventory.objects.all()
-        
-        if branch_id:
-            inventory_qs = inventory_qs.filter(branch_id=branch_id)
-        elif region_code:
-            inventory_qs = inventory_qs.filter(branch__region__code=region_code)
+        # One row per branch from the summary rollup instead of scanning branch_inventory
+        inventory_summary = InventorySummaryService.totals(
+            branch_id=branch_id, region_code=region_code, branch_ids=_branch_ids(info)
+        )
         
-        total_items = inventory_qs.count()
-        low_stock_items = inventory_qs.filter(quantity__lte=F('low_stock_threshold')).count()
-        out_of_stock_items = inventory_qs.filter(quantity=0).count()
+        total_items = inventory_summary['total_items']
+        low_stock_items = inventory_summary['low_stock_items']
+        out_of_stock_items = inventory_summary['out_of_stock_items']
         
         # Total value would require product prices - placeholder for now
         total_value = Decimal('0')
@@ -527,6 +375,7 @@ class DashboardQueries(graphene.ObjectType):
             currency="GBP"  # Default
         )
     
+    @cached_resolver('revenue_by_region', RegionPerformanceType, depends_on=(SALES,))
     def resolve_revenue_by_region(self, info, start_date=None, end_date=None, **kwargs):
         """Get revenue breakdown by region"""
         # Parse dates
@@ -540,34 +389,29 @@ class DashboardQueries(graphene.ObjectType):
         else:
             start_date_obj = end_date_obj - timedelta(days=30)
         
-        # Get revenue data by branch instead of region
-        branches = Branch.objects.filter(is_active=True)
-        revenue_data = []
-        
-        for branch in branches:
-            orders_qs = OrderBranchAssignment.objects.filter(
-                branch=branch,
-                created_at__gte=start_date_obj,
-                created_at__lte=end_date_obj
+        return [
+            RegionPerformanceType(
+                region_code=region['region_code'],
+                region_name=region['region_name'],
+                branch_count=region['branch_count'],
+                sales=region['sales'],
+                orders=region['orders'],
+                growth=region['growth'],
+                currency=region['currency']
             )
-            
-            try:
-                sales = orders_qs.aggregate(
-                    total=Sum('order__total_gross_amount')
-                )['total'] or Decimal('0')
-            except Exception:
-                sales = Decimal('0')
-            
-            orders_count = orders_qs.count()
-            
-            revenue_data.append(BranchPerformanceType(
-                branch_id=str(branch.id),
-                branch_name=region.name,
-                sales=sales,
-                orders=orders_count,
-                growth=0.0,  # Would calculate if needed
-                currency=region.default_currency
-            ))
-        
-        return revenue_data
-
+            for region in SalesReportService.region_performance(
+                start_date_obj, end_date_obj, branch_ids=_branch_ids(info)
+            )
+        ]
+    
+    def resolve_dashboard_cache_stats(self, info, **kwargs):
+        """Get dashboard cache hit/miss counters"""
+        return [
+            DashboardCacheStatType(
+                resolver=name,
+                hits=counters['hits'],
+                misses=counters['misses'],
+                hit_rate=counters['hits'] / (counters['hits'] + counters['misses'])
+            )
+            for name, counters in sorted(cache_stats().items())
+        ]
@@ -1,12 +1,29 @@
 """
 Report generation services
 """
-from datetime import datetime, timedelta
+import logging
+from datetime import date, datetime, time, timedelta
 from decimal import Decimal
-from typing import Dict, List, Optional
-from django.db.models import Sum, Count, Avg, Q
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from django.db import transaction
+from django.db.models import F, Sum, Count, Avg, Q
+from django.db.models.functions import TruncDate
 from django.utils import timezone
 
+SALES_CHART_PERIOD_DAYS = {
+    "7d": 7,
+    "30d": 30,
+    "90d": 90,
+    "1y": 365,
+}
+SALES_CHART_GRANULARITIES = ("day", "week", "month")
+# Currency money totals are reported in when the caller does not pick one
+DEFAULT_REPORT_CURRENCY = "GBP"
+MONEY_QUANTUM = Decimal("0.01")
+
+logger = logging.getLogger(__name__)
+
 # Note: These services will need actual model imports once Saleor is integrated
 # from saleor.order.models import Order
 # from saleor.product.models import Product
@@ -44,6 +61,206 @@ class SalesReportService:
             'by_product': [],
         }
     
+    @staticmethod
+    def resolve_region(branch_id: Optional[str] = None, region_code: Optional[str] = None):
+        """Return the Region for a branch or region code (None for all regions)"""
+        from saleor_extensions.regions.models import Region
+        
+        if branch_id:
+            return Region.objects.filter(branches__id=branch_id).first()
+        if region_code:
+            return Region.objects.filter(code=region_code).first()
+        return None
+    
+    @staticmethod
+    def report_timezone(region=None):
+        """Time zone used to bucket dates: the region's, else the site default"""
+        if region is not None and region.timezone:
+            try:
+                return ZoneInfo(region.timezone)
+            except (ZoneInfoNotFoundError, ValueError):
+                pass
+        return timezone.get_default_timezone()
+    
+    @staticmethod
+    def bucket_start(day: date, granularity: str) -> date:
+        """First day of the bucket containing ``day``"""
+        if granularity == "week":
+            return day - timedelta(days=day.weekday())
+        if granularity == "month":
+            return day.replace(day=1)
+        return day
+    
+    @staticmethod
+    def next_bucket(day: date, granularity: str) -> date:
+        """First day of the bucket after the one starting at ``day``"""
+        if granularity == "week":
+            return day + timedelta(days=7)
+        if granularity == "month":
+            return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+        return day + timedelta(days=1)
+    
+    @staticmethod
+    def sales_time_series(
+        period: str = "30d",
+        granularity: str = "day",
+        branch_id: Optional[str] = None,
+        region_code: Optional[str] = None,
+        branch_ids: Optional[Iterable] = None,
+    ) -> Dict:
+        """
+        Revenue and order counts per day/week/month
+        
+        Daily totals come from DailySalesFact (plus today's raw orders) and
+        are bucketed in Python; buckets with no orders are filled with zeros.
+        Days are in the region's time zone. ``branch_ids`` limits the totals
+        to the caller's branches (see permissions.querysets.branch_scope).
+        
+        Returns:
+            Dict with ``currency`` and ``points`` (list of dicts with
+            date, revenue and orders), oldest first
+        """
+        if granularity not in SALES_CHART_GRANULARITIES:
+            raise ValueError(f"Unsupported granularity: {granularity}")
+        days = SALES_CHART_PERIOD_DAYS.get(period, 30)
+        
+        region = SalesReportService.resolve_region(branch_id, region_code)
+        tzinfo = SalesReportService.report_timezone(region)
+        
+        end_day = timezone.now().astimezone(tzinfo).date()
+        start_day = end_day - timedelta(days=days)
+        currency = region.default_currency if region is not None else DEFAULT_REPORT_CURRENCY
+        
+        by_bucket = {}
+        daily = SalesFactService.daily_totals(
+            start_day, end_day, branch_id=branch_id, region_code=region_code, currency=currency,
+            branch_ids=branch_ids,
+        )
+        for (_, day), totals in daily.items():
+            bucket = SalesReportService.bucket_start(day, granularity)
+            SalesFactService.add_totals(by_bucket.setdefault(bucket, SalesFactService.empty_totals()), totals)
+        
+        points = []
+        day = SalesReportService.bucket_start(start_day, granularity)
+        while day <= end_day:
+            totals = by_bucket.get(day, SalesFactService.empty_totals())
+            points.append({
+                'date': day,
+                'revenue': totals['gross'],
+                'orders': totals['orders'],
+            })
+            day = SalesReportService.next_bucket(day, granularity)
+        
+        return {
+            'currency': currency,
+            'points': points,
+        }
+    
+    @staticmethod
+    def growth_percent(current, previous) -> float:
+        """Period-over-period growth in percent (0 when there is no previous value)"""
+        if not previous:
+            return 0.0
+        return float((current - previous) / previous * 100)
+    
+    @staticmethod
+    def branch_performance(
+        date_from: datetime,
+        date_to: datetime,
+        region_code: Optional[str] = None,
+        branch_ids: Optional[Iterable] = None,
+    ) -> List[Dict]:
+        """
+        Sales, order count and growth for every active branch (of ``branch_ids``)
+        
+        Both periods are read in one pass over DailySalesFact grouped by
+        branch (plus today's raw orders), so the cost does not grow with the
+        number of branches. Periods are whole days; the previous period is
+        the equally long run of days before ``date_from``.
+        
+        Returns:
+            List of dicts with branch_id, branch_name, region_code, region_name,
+            currency, sales, orders, previous_sales and growth
+        """
+        from saleor_extensions.branches.models import Branch
+        
+        current_from, current_to, previous_from, previous_to = SalesFactService.comparison_days(date_from, date_to)
+        
+        branches_qs = Branch.objects.filter(is_active=True)
+        if region_code:
+            branches_qs = branches_qs.filter(region__code=region_code)
+        if branch_ids is not None:
+            branches_qs = branches_qs.filter(id__in=branch_ids)
+        branches = list(branches_qs.values(
+            'id', 'name', 'region__code', 'region__name', 'region__default_currency'
+        ))
+        if not branches:
+            return []
+        
+        current = {}
+        previous = {}
+        currencies = {branch['id']: branch['region__default_currency'] for branch in branches}
+        daily = SalesFactService.daily_totals(
+            previous_from, current_to, region_code=region_code, by_branch=True, currency=currencies,
+            branch_ids=branch_ids,
+        )
+        for (branch_id, day), totals in daily.items():
+            period = current if day >= current_from else previous
+            SalesFactService.add_totals(period.setdefault(branch_id, SalesFactService.empty_totals()), totals)
+        
+        performance = []
+        empty = SalesFactService.empty_totals()
+        for branch in branches:
+            branch_current = current.get(branch['id'], empty)
+            sales = branch_current['gross']
+            previous_sales = previous.get(branch['id'], empty)['gross']
+            performance.append({
+                'branch_id': branch['id'],
+                'branch_name': branch['name'],
+                'region_code': branch['region__code'],
+                'region_name': branch['region__name'],
+                'currency': branch['region__default_currency'],
+                'sales': sales,
+                'orders': branch_current['orders'],
+                'previous_sales': previous_sales,
+                'growth': SalesReportService.growth_percent(sales, previous_sales),
+            })
+        return performance
+    
+    @staticmethod
+    def region_performance(
+        date_from: datetime,
+        date_to: datetime,
+        region_code: Optional[str] = None,
+        branch_ids: Optional[Iterable] = None,
+    ) -> List[Dict]:
+        """
+        Branch performance rolled up per region (same fact table read)
+        
+        Returns:
+            List of dicts with region_code, region_name, currency, branch_count,
+            sales, orders, previous_sales and growth
+        """
+        regions = {}
+        for branch in SalesReportService.branch_performance(date_from, date_to, region_code, branch_ids):
+            region = regions.setdefault(branch['region_code'], {
+                'region_code': branch['region_code'],
+                'region_name': branch['region_name'],
+                'currency': branch['currency'],
+                'branch_count': 0,
+                'sales': Decimal('0'),
+                'orders': 0,
+                'previous_sales': Decimal('0'),
+            })
+            region['branch_count'] += 1
+            region['sales'] += branch['sales']
+            region['orders'] += branch['orders']
+            region['previous_sales'] += branch['previous_sales']
+        
+        for region in regions.values():
+            region['growth'] = SalesReportService.growth_percent(region['sales'], region['previous_sales'])
+        return sorted(regions.values(), key=lambda region: region['region_code'] or '')
+    
     @staticmethod
     def generate_branch_performance_report(
         date_from: Optional[datetime] = None,
@@ -57,6 +274,344 @@ class SalesReportService:
         }
 
 
+class SalesFactService:
+    """
+    Maintain and read DailySalesFact rollups
+    
+    Facts are keyed by the calendar day in the branch's region time zone and
+    by order currency; readers convert money into a reporting currency. Days
+    before today are read from the fact table; today's partial bucket is
+    always read from raw order assignments.
+    """
+    
+    GROSS_FIELD = 'order__total_gross_amount'
+    NET_FIELD = 'order__total_net_amount'
+    
+    @staticmethod
+    def empty_totals() -> Dict:
+        return {'orders': 0, 'gross': Decimal('0'), 'net': Decimal('0')}
+    
+    @staticmethod
+    def add_totals(total: Dict, other: Dict) -> Dict:
+        """Add ``other`` into ``total`` in place"""
+        total['orders'] += other['orders']
+        total['gross'] += other['gross']
+        total['net'] += other['net']
+        return total
+    
+    @staticmethod
+    def sum_totals(rows: Iterable[Dict]) -> Dict:
+        total = SalesFactService.empty_totals()
+        for row in rows:
+            SalesFactService.add_totals(total, row)
+        return total
+    
+    @staticmethod
+    def comparison_days(date_from: datetime, date_to: datetime) -> Tuple[date, date, date, date]:
+        """
+        Whole-day current period and the equally long previous period
+        
+        Returns:
+            (current_from, current_to, previous_from, previous_to)
+        """
+        current_from = date_from.date()
+        current_to = date_to.date()
+        length = current_to - current_from + timedelta(days=1)
+        return current_from, current_to, current_from - length, current_from - timedelta(days=1)
+    
+    @staticmethod
+    def _regions(branch_id=None, region_code=None):
+        from saleor_extensions.regions.models import Region
+        
+        regions = Region.objects.only('id', 'timezone')
+        if branch_id:
+            regions = regions.filter(branches__id=branch_id)
+        elif region_code:
+            regions = regions.filter(code=region_code)
+        return list(regions)
+    
+    @staticmethod
+    def record_assignment(assignment, sign: int = 1):
+        """
+        Add one order assignment to its day's fact row (``sign=-1`` removes it)
+        
+        Runs in the caller's transaction, so the fact changes commit or roll
+        back together with the assignment.
+        """
+        from saleor.order.models import Order
+        from saleor_extensions.reports.models import DailySalesFact
+        
+        if assignment.branch_id is None or assignment.created_at is None:
+            return
+        order = Order.objects.filter(id=assignment.order_id).values(
+            'currency', 'total_gross_amount', 'total_net_amount'
+        ).first()
+        if order is None:
+            return
+        
+        regions = SalesFactService._regions(branch_id=assignment.branch_id)
+        tzinfo = SalesReportService.report_timezone(regions[0] if regions else None)
+        created_at = assignment.created_at
+        if timezone.is_aware(created_at):
+            created_at = created_at.astimezone(tzinfo)
+        key = {
+            'date': created_at.date(),
+            'branch_id': assignment.branch_id,
+            'currency': order['currency'] or '',
+        }
+        
+        DailySalesFact.objects.bulk_create([DailySalesFact(**key)], ignore_conflicts=True)
+        DailySalesFact.objects.filter(**key).update(
+            order_count=F('order_count') + sign,
+            gross_total=F('gross_total') + sign * (order['total_gross_amount'] or Decimal('0')),
+            net_total=F('net_total') + sign * (order['total_net_amount'] or Decimal('0')),
+            updated_at=timezone.now(),
+        )
+    
+    @staticmethod
+    def rebuild(date_from: date, date_to: date, branch_ids=None) -> int:
+        """
+        Recompute facts for ``date_from..date_to`` from raw order assignments
+        
+        Runs one grouped query per region (days are region-local) and replaces
+        the facts for that region's branches in one transaction.
+        
+        Returns:
+            Number of fact rows written
+        """
+        from saleor_extensions.branches.models import Branch
+        from saleor_extensions.orders.models import OrderBranchAssignment
+        from saleor_extensions.reports.models import DailySalesFact
+        
+        written = 0
+        for region in SalesFactService._regions():
+            tzinfo = SalesReportService.report_timezone(region)
+            start = datetime.combine(date_from, time.min, tzinfo=tzinfo)
+            end = datetime.combine(date_to + timedelta(days=1), time.min, tzinfo=tzinfo)
+            
+            branches = Branch.objects.filter(region_id=region.id)
+            if branch_ids is not None:
+                branches = branches.filter(id__in=branch_ids)
+            
+            rows = (
+                OrderBranchAssignment.objects
+                .filter(branch__in=branches, created_at__gte=start, created_at__lt=end)
+                .annotate(day=TruncDate('created_at', tzinfo=tzinfo))
+                .values('day', 'branch_id', 'order__currency')
+                .annotate(
+                    order_count=Count('id'),
+                    gross_total=Sum(SalesFactService.GROSS_FIELD),
+                    net_total=Sum(SalesFactService.NET_FIELD),
+                )
+                .order_by()
+            )
+            facts = [
+                DailySalesFact(
+                    date=row['day'],
+                    branch_id=row['branch_id'],
+                    currency=row['order__currency'] or '',
+                    order_count=row['order_count'],
+                    gross_total=row['gross_total'] or Decimal('0'),
+                    net_total=row['net_total'] or Decimal('0'),
+                )
+                for row in rows
+            ]
+            with transaction.atomic():
+                DailySalesFact.objects.filter(
+                    branch__in=branches, date__gte=date_from, date__lte=date_to
+                ).delete()
+                DailySalesFact.objects.bulk_create(facts, batch_size=500)
+            written += len(facts)
+        
+        from saleor_extensions.reports.cache import SALES, invalidate_on_commit
+        invalidate_on_commit(SALES)
+        return written
+    
+    @staticmethod
+    def daily_totals(
+        date_from: date,
+        date_to: date,
+        branch_id: Optional[str] = None,
+        region_code: Optional[str] = None,
+        by_branch: bool = False,
+        currency: Union[str, Dict, None] = None,
+        branch_ids: Optional[Iterable] = None,
+    ) -> Dict[Tuple, Dict]:
+        """
+        Order totals per day for ``date_from..date_to`` (inclusive)
+        
+        Closed days come from one grouped DailySalesFact query; today's partial
+        day (per region time zone) comes from one grouped raw query.
+        
+        Facts are kept per order currency. Gross and net are converted into
+        ``currency`` at each day's exchange rate, so GBP, AED and INR orders
+        are never summed as-is. With ``by_branch``, ``currency`` may map
+        branch_id to that branch's reporting currency. Amounts with no
+        exchange rate are left out of gross/net (the orders still count) and
+        logged.
+        
+        Args:
+            currency: Reporting currency (default DEFAULT_REPORT_CURRENCY)
+            branch_ids: Only count these branches (IDs or a values() subquery)
+        
+        Returns:
+            Dict keyed by (branch_id or None, date) with orders, gross and net
+        """
+        from saleor_extensions.orders.models import OrderBranchAssignment
+        from saleor_extensions.reports.models import DailySalesFact
+        
+        now = timezone.now()
+        closed = Q()
+        live = Q()
+        today_by_region = {}
+        for region in SalesFactService._regions(branch_id, region_code):
+            tzinfo = SalesReportService.report_timezone(region)
+            today = now.astimezone(tzinfo).date()
+            today_by_region[region.id] = today
+            closed |= Q(branch__region_id=region.id, date__lt=today)
+            if date_from <= today <= date_to:
+                live |= Q(branch__region_id=region.id,
+                          created_at__gte=datetime.combine(today, time.min, tzinfo=tzinfo))
+        if not today_by_region:
+            return {}
+        
+        scope = Q()
+        if branch_id:
+            scope &= Q(branch_id=branch_id)
+        if region_code:
+            scope &= Q(branch__region__code=region_code)
+        if branch_ids is not None:
+            scope &= Q(branch_id__in=branch_ids)
+        
+        # (key, order currency, orders, gross, net) before conversion
+        rows = []
+        group_by = ['date', 'branch_id', 'currency'] if by_branch else ['date', 'currency']
+        facts = (
+            DailySalesFact.objects
+            .filter(closed, scope, date__gte=date_from, date__lte=date_to)
+            .values(*group_by)
+            .annotate(orders=Sum('order_count'), gross=Sum('gross_total'), net=Sum('net_total'))
+            .order_by()
+        )
+        for row in facts:
+            rows.append(((row.get('branch_id'), row['date']), row['currency'],
+                         row['orders'], row['gross'], row['net']))
+        
+        if live:
+            group_by = ['branch__region_id', 'order__currency']
+            if by_branch:
+                group_by.append('branch_id')
+            grouped = OrderBranchAssignment.objects.filter(live, scope).values(*group_by).order_by()
+            try:
+                live_rows = list(grouped.annotate(
+                    orders=Count('id'),
+                    gross=Sum(SalesFactService.GROSS_FIELD),
+                    net=Sum(SalesFactService.NET_FIELD),
+                ))
+            except Exception:
+                # Order totals may be unavailable while Saleor migrations are behind
+                live_rows = list(
+                    OrderBranchAssignment.objects.filter(live, scope)
+                    .values(*[field for field in group_by if field != 'order__currency'])
+                    .order_by()
+                    .annotate(orders=Count('id'))
+                )
+            for row in live_rows:
+                today = today_by_region[row['branch__region_id']]
+                rows.append(((row.get('branch_id'), today), row.get('order__currency'),
+                             row['orders'], row.get('gross'), row.get('net')))
+        
+        totals = {}
+        for key, (orders, gross, net) in zip(
+            (row[0] for row in rows), SalesFactService._convert(rows, currency)
+        ):
+            SalesFactService.add_totals(
+                totals.setdefault(key, SalesFactService.empty_totals()),
+                {'orders': orders or 0, 'gross': gross or Decimal('0'), 'net': net or Decimal('0')},
+            )
+        return totals
+    
+    @staticmethod
+    def _convert(rows: List[Tuple], currency: Union[str, Dict, None]) -> List[Tuple]:
+        """
+        Convert (key, order currency, orders, gross, net) rows into reporting currencies
+        
+        Returns:
+            (orders, gross, net) per row, in order; gross/net are None when
+            there is no rate from the order currency
+        """
+        from saleor_extensions.currency.services import CurrencyConverter
+        
+        def _cents(value):
+            return None if value is None else value.quantize(MONEY_QUANTUM)
+        
+        def _target(key):
+            if isinstance(currency, dict):
+                return currency.get(key[0]) or DEFAULT_REPORT_CURRENCY
+            return currency or DEFAULT_REPORT_CURRENCY
+        
+        converted = [(orders, gross, net) for _, _, orders, gross, net in rows]
+        pending = {}
+        for index, (key, row_currency, _, _, _) in enumerate(rows):
+            target = _target(key)
+            if row_currency and row_currency != target:
+                pending.setdefault(target, []).append(index)
+        
+        missing = set()
+        for target, indexes in pending.items():
+            codes = [rows[index][1] for index in indexes]
+            days = [rows[index][0][1] for index in indexes]
+            gross = CurrencyConverter.convert_many([rows[index][3] for index in indexes], codes, target, days)
+            net = CurrencyConverter.convert_many([rows[index][4] for index in indexes], codes, target, days)
+            for index, code, gross_value, net_value in zip(indexes, codes, gross, net):
+                if rows[index][3] is not None and gross_value is None:
+                    missing.add((code, target))
+                converted[index] = (rows[index][2], _cents(gross_value), _cents(net_value))
+        if missing:
+            logger.warning(
+                'No exchange rate for %s; those sales are left out of report totals',
+                ', '.join(f'{source}->{target}' for source, target in sorted(missing)),
+            )
+        return converted
+    
+    @staticmethod
+    def unbuilt_history() -> Optional[Tuple[date, date]]:
+        """
+        Days of order history that predate the fact table, or None
+        
+        Facts are written as orders come in, so history from before the fact
+        table existed (or from a failed backfill) shows up as order
+        assignments older than the oldest fact.
+        
+        Returns:
+            (first_day, last_day) to rebuild, or None when facts cover all history
+        """
+        from saleor_extensions.orders.models import OrderBranchAssignment
+        from saleor_extensions.regions.models import Region
+        from saleor_extensions.reports.models import DailySalesFact
+        
+        first = (
+            OrderBranchAssignment.objects.filter(branch__isnull=False)
+            .order_by('created_at')
+            .values('created_at', 'branch__region_id')
+            .first()
+        )
+        if first is None:
+            return None
+        region = Region.objects.filter(id=first['branch__region_id']).only('id', 'timezone').first()
+        # Facts use region-local days, like record_assignment and rebuild
+        first_day = first['created_at'].astimezone(SalesReportService.report_timezone(region)).date()
+        first_fact = DailySalesFact.objects.order_by('date').values_list('date', flat=True).first()
+        if first_fact is not None and first_fact <= first_day:
+            return None
+        # One day of slack for regions west of the oldest order's region
+        start = first_day - timedelta(days=1)
+        if first_fact is None:
+            return start, timezone.localdate()
+        # The oldest fact's day may be partial (orders before the facts existed)
+        return start, first_fact
+
+
 class InventoryReportService:
     """Service for generating inventory reports"""
     
@@ -0,0 +1,58 @@
+"""
+Keep DailySalesFact and the dashboard cache in step with orders and inventory
+"""
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from saleor_extensions.inventory.models import BranchInventory
+from saleor_extensions.inventory.signals import stock_changed
+from saleor_extensions.orders.models import OrderBranchAssignment
+from saleor_extensions.reports.cache import INVENTORY, SALES, bump_generation, invalidate_on_commit
+from saleor_extensions.reports.services import SalesFactService
+
+logger = logging.getLogger(__name__)
+
+
+def _record(assignment, sign):
+    try:
+        # Savepoint so a reporting failure never aborts the order write
+        with transaction.atomic():
+            SalesFactService.record_assignment(assignment, sign=sign)
+    except Exception:
+        # The nightly rebuild_recent_sales_facts task repairs missed facts
+        logger.exception(
+            'Could not update daily sales facts for order assignment %s (order %s)',
+            assignment.pk, assignment.order_id,
+        )
+
+
+@receiver(post_save, sender=OrderBranchAssignment, dispatch_uid='reports_sales_fact_on_assignment_save')
+def add_assignment_to_sales_facts(sender, instance, created, raw=False, **kwargs):
+    """Count a newly assigned order in its day's fact row"""
+    # Reassignments and order edits are corrected by the nightly rebuild
+    if created and not raw:
+        _record(instance, 1)
+    invalidate_on_commit(SALES)
+
+
+@receiver(post_delete, sender=OrderBranchAssignment, dispatch_uid='reports_sales_fact_on_assignment_delete')
+def remove_assignment_from_sales_facts(sender, instance, **kwargs):
+    """Take a deleted assignment back out of its day's fact row"""
+    _record(instance, -1)
+    invalidate_on_commit(SALES)
+
+
+@receiver(post_save, sender=BranchInventory, dispatch_uid='reports_cache_on_inventory_save')
+@receiver(post_delete, sender=BranchInventory, dispatch_uid='reports_cache_on_inventory_delete')
+def invalidate_inventory_reports(sender, **kwargs):
+    """Drop cached inventory tiles when inventory rows are saved outside StockLedger"""
+    invalidate_on_commit(INVENTORY)
+
+
+@receiver(stock_changed, dispatch_uid='reports_cache_on_stock_changed')
+def invalidate_inventory_reports_on_stock_change(sender, branch_ids, **kwargs):
+    """Drop cached inventory tiles after StockLedger commits a stock change"""
+    bump_generation(INVENTORY)
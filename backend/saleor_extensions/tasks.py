@@ -29,6 +29,14 @@ Configuration:
             'task': 'saleor_extensions.tasks.process_low_stock_alerts',
             'schedule': crontab(hour=9, minute=0),  # Daily at 9 AM
         },
+        'reconcile-inventory-summaries': {
+            'task': 'saleor_extensions.tasks.reconcile_inventory_summaries',
+            'schedule': crontab(minute=30),  # Hourly
+        },
+        'rebuild-recent-sales-facts': {
+            'task': 'saleor_extensions.tasks.rebuild_recent_sales_facts',
+            'schedule': crontab(hour=2, minute=15),  # Daily at 2:15 AM
+        },
     }
 """
 import os
@@ -42,13 +50,16 @@ def update_currency_rates():
     """
     Update exchange rates for all active currencies
     Runs daily at midnight
+
+    There is no exchange-rate provider integration yet (CurrencyConverter has
+    no update_all_rates): rates are entered as ExchangeRate rows, and every
+    process reloads its matrix when the rate tables change. Until a provider
+    exists this only reloads this worker's matrix.
     """
-    try:
-        from saleor_extensions.currency.services import CurrencyConverter
-        CurrencyConverter.update_all_rates()
-        return "Currency rates updated successfully"
-    except Exception as e:
-        return f"Error updating currency rates: {str(e)}"
+    from saleor_extensions.currency.rates import invalidate
+
+    invalidate()
+    return "No exchange-rate provider configured; rate matrix reloaded"
 
 
 @shared_task
@@ -72,6 +83,7 @@ def generate_scheduled_reports():
     Runs daily at 6 AM
     """
     try:
+        from saleor_extensions.db_routing import replica_reads
         from saleor_extensions.reports.models import ScheduledReport
         
         now = timezone.now()
@@ -81,10 +93,12 @@ def generate_scheduled_reports():
         )
         
         count = 0
-        for report in due_reports:
-            # Generate report (implementation needed)
-            # This will use the ReportExecution model
-            count += 1
+        # Report queries are read-only; ReportExecution writes still go to the primary
+        with replica_reads():
+            for report in due_reports:
+                # Generate report (implementation needed)
+                # This will use the ReportExecution model
+                count += 1
         
         return f"Generated {count} scheduled reports"
     except Exception as e:
@@ -151,6 +165,40 @@ def process_low_stock_alerts():
         return f"Error processing low stock alerts: {str(e)}"
 
 
+@shared_task
+def reconcile_inventory_summaries():
+    """
+    Rebuild per-branch inventory summaries from branch_inventory
+    Corrects drift from writes that bypass StockLedger (admin, seed scripts)
+    Runs hourly
+    """
+    try:
+        from saleor_extensions.inventory.services import InventorySummaryService
+        
+        drifted = InventorySummaryService.reconcile()
+        return f"Reconciled inventory summaries ({drifted} corrected)"
+    except Exception as e:
+        return f"Error reconciling inventory summaries: {str(e)}"
+
+
+@shared_task
+def rebuild_recent_sales_facts(days=2):
+    """
+    Rebuild the last few days of daily sales facts from order assignments
+    Picks up order edits and branch reassignments made after assignment
+    Runs daily at 2:15 AM
+    """
+    try:
+        from datetime import timedelta
+        from saleor_extensions.reports.services import SalesFactService
+        
+        end = timezone.localdate()
+        written = SalesFactService.rebuild(end - timedelta(days=days), end)
+        return f"Rebuilt {written} daily sales facts"
+    except Exception as e:
+        return f"Error rebuilding daily sales facts: {str(e)}"
+
+
 @shared_task
 def cleanup_old_audit_logs():
     """
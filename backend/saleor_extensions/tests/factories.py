@@ -0,0 +1,56 @@
+"""
+Minimal model factories for the saleor_extensions tests
+
+Saleor models are looked up by app label so the factories only rely on the
+fields every Saleor 3.x release has.
+"""
+import itertools
+from decimal import Decimal
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+
+from saleor_extensions.branches.models import Branch
+from saleor_extensions.regions.models import Region
+
+_sequence = itertools.count(1)
+
+
+def create_region(code='UK', **kwargs):
+    defaults = {'name': code, 'default_currency': 'GBP', 'tax_rate': Decimal('20.00')}
+    defaults.update(kwargs)
+    region, _ = Region.objects.get_or_create(code=code, defaults=defaults)
+    return region
+
+
+def create_branch(region=None, **kwargs):
+    number = next(_sequence)
+    defaults = {
+        'name': f'Branch {number}',
+        'code': f'BR{number}',
+        'address_line_1': '1 High Street',
+        'city': 'London',
+        'state': 'London',
+        'postal_code': 'EC1A 1AA',
+        'country': 'GB',
+        'phone': '0200000000',
+        'email': f'branch{number}@example.com',
+        'region': region or create_region(),
+    }
+    defaults.update(kwargs)
+    return Branch.objects.create(**defaults)
+
+
+def create_variant():
+    number = next(_sequence)
+    ProductType = apps.get_model('product', 'ProductType')
+    Product = apps.get_model('product', 'Product')
+    ProductVariant = apps.get_model('product', 'ProductVariant')
+    product_type = ProductType.objects.create(name=f'Type {number}', slug=f'type-{number}')
+    product = Product.objects.create(name=f'Product {number}', slug=f'product-{number}', product_type=product_type)
+    return ProductVariant.objects.create(product=product, sku=f'SKU-{number}')
+
+
+def create_user(**kwargs):
+    number = next(_sequence)
+    return get_user_model().objects.create_user(email=f'user{number}@example.com', **kwargs)
@@ -0,0 +1,182 @@
+import tempfile
+
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from saleor_extensions.permissions import profile
+from saleor_extensions.permissions.models import (
+    BranchAccess,
+    Permission,
+    Role,
+    RolePermission,
+    UserRole,
+)
+from saleor_extensions.permissions.utils import PermissionChecker
+from saleor_extensions.tests.factories import create_branch, create_user
+
+
+# Reference implementation: the per-check queries PermissionChecker ran before
+# UserAccessProfile, kept to pin down the semantics the profile must match.
+
+def legacy_has_permission(user_id, code):
+    permission = Permission.objects.filter(code=code, is_active=True).first()
+    if permission is None:
+        return False
+    return RolePermission.objects.filter(
+        role__users__user_id=user_id, role__users__is_active=True, permission=permission, allowed=True
+    ).exists()
+
+
+def legacy_has_menu_access(user_id, menu_path):
+    permissions = Permission.objects.filter(
+        menu_path=menu_path, permission_type__in=['MENU', 'MODULE'], is_active=True
+    )
+    return any(legacy_has_permission(user_id, permission.code) for permission in permissions)
+
+
+def legacy_user_branches(user_id):
+    branch_ids = {
+        str(branch_id)
+        for branch_id in BranchAccess.objects.filter(user_id=user_id, is_active=True).values_list('branch_id', flat=True)
+    }
+    for user_role in UserRole.objects.filter(user_id=user_id, is_active=True).select_related('role'):
+        if user_role.can_access_all_branches or user_role.role.can_access_all_branches:
+            return []
+        if user_role.branch_id:
+            branch_ids.add(str(user_role.branch_id))
+        branch_ids.update(str(branch_id) for branch_id in user_role.role.default_branches.values_list('id', flat=True))
+    return sorted(branch_ids)
+
+
+def legacy_can_access_branch(user_id, branch_id):
+    if BranchAccess.objects.filter(user_id=user_id, branch_id=branch_id, is_active=True).exists():
+        return True
+    for user_role in UserRole.objects.filter(user_id=user_id, is_active=True).select_related('role'):
+        if user_role.can_access_all_branches or user_role.role.can_access_all_branches:
+            return True
+        if str(user_role.branch_id) == str(branch_id):
+            return True
+        if user_role.role.default_branches.filter(id=branch_id).exists():
+            return True
+    return False
+
+
+class AccessProfileParityTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.branches = [create_branch() for _ in range(4)]
+        manager = Role.objects.create(code='BRANCH_MANAGER', name='Branch Manager')
+        sales = Role.objects.create(code='SALES_EXECUTIVE', name='Sales Executive')
+        admin = Role.objects.create(code='ADMIN', name='Admin', can_access_all_branches=True)
+        sales.default_branches.add(cls.branches[2])
+
+        def permission(code, permission_type='ACTION', menu_path='', is_active=True):
+            return Permission.objects.create(
+                code=code, name=code, permission_type=permission_type, menu_path=menu_path, is_active=is_active
+            )
+
+        orders_menu = permission('orders.menu', 'MENU', 'orders')
+        stock_module = permission('inventory.module', 'MODULE', 'inventory')
+        refund = permission('orders.refund')
+        retired = permission('orders.retired', 'MENU', 'reports', is_active=False)
+        export = permission('reports.export', 'DATA', 'reports')
+        RolePermission.objects.create(role=manager, permission=orders_menu)
+        RolePermission.objects.create(role=manager, permission=refund)
+        RolePermission.objects.create(role=manager, permission=retired)
+        RolePermission.objects.create(role=sales, permission=stock_module)
+        RolePermission.objects.create(role=sales, permission=refund, allowed=False)
+        RolePermission.objects.create(role=sales, permission=export)
+        RolePermission.objects.create(role=admin, permission=export)
+
+        cls.users = {
+            'none': create_user(),
+            'manager': create_user(),
+            'sales': create_user(),
+            'both': create_user(),
+            'inactive': create_user(),
+            'admin': create_user(),
+            'all_branches': create_user(),
+        }
+        UserRole.objects.create(user=cls.users['manager'], role=manager, branch=cls.branches[0])
+        UserRole.objects.create(user=cls.users['sales'], role=sales)
+        UserRole.objects.create(user=cls.users['both'], role=manager, branch=cls.branches[1])
+        UserRole.objects.create(user=cls.users['both'], role=sales)
+        UserRole.objects.create(user=cls.users['inactive'], role=manager, branch=cls.branches[0], is_active=False)
+        UserRole.objects.create(user=cls.users['admin'], role=admin)
+        UserRole.objects.create(
+            user=cls.users['all_branches'], role=sales, branch=cls.branches[0], can_access_all_branches=True
+        )
+        BranchAccess.objects.create(user=cls.users['sales'], branch=cls.branches[3])
+        BranchAccess.objects.create(user=cls.users['manager'], branch=cls.branches[3], is_active=False)
+        BranchAccess.objects.create(user=cls.users['admin'], branch=cls.branches[3])
+
+        cls.codes = list(Permission.objects.values_list('code', flat=True)) + ['missing']
+        cls.menu_paths = ['orders', 'inventory', 'reports', 'missing']
+
+    def test_matches_the_legacy_checker(self):
+        for name, user in self.users.items():
+            user_id = str(user.id)
+            with self.subTest(user=name), profile.request_scope():
+                for code in self.codes:
+                    self.assertEqual(
+                        PermissionChecker.has_permission(user_id, code),
+                        legacy_has_permission(user_id, code),
+                        code,
+                    )
+                for menu_path in self.menu_paths:
+                    self.assertEqual(
+                        PermissionChecker.has_menu_access(user_id, menu_path),
+                        legacy_has_menu_access(user_id, menu_path),
+                        menu_path,
+                    )
+                for branch in self.branches:
+                    self.assertEqual(
+                        PermissionChecker.can_access_branch(user_id, str(branch.id)),
+                        legacy_can_access_branch(user_id, branch.id),
+                        branch.id,
+                    )
+                self.assertEqual(sorted(PermissionChecker.get_user_branches(user_id)), legacy_user_branches(user_id))
+                self.assertEqual(
+                    sorted(PermissionChecker.get_user_permissions(user_id)),
+                    sorted(code for code in self.codes if legacy_has_permission(user_id, code)),
+                )
+
+    def test_profile_is_built_in_three_queries(self):
+        with self.assertNumQueries(3):
+            built = profile.build_profile(self.users['both'].id)
+
+        self.assertEqual(built.permission_codes, {'orders.menu', 'orders.refund', 'inventory.module', 'reports.export'})
+        self.assertEqual(built.branch_ids, {str(self.branches[1].id), str(self.branches[2].id)})
+
+    def test_request_scope_reuses_the_profile(self):
+        user_id = str(self.users['manager'].id)
+        with profile.request_scope():
+            PermissionChecker.has_permission(user_id, 'orders.refund')
+            with self.assertNumQueries(0):
+                PermissionChecker.has_menu_access(user_id, 'orders')
+                PermissionChecker.can_access_branch(user_id, str(self.branches[0].id))
+
+
+class SharedProfileCacheTests(TransactionTestCase):
+    def test_per_process_cache_is_not_used(self):
+        user_id = str(create_user().id)
+        profile.get_profile(user_id)
+
+        with self.assertNumQueries(2):
+            profile.get_profile(user_id)
+
+    def test_shared_cache_is_used_and_invalidated(self):
+        location = tempfile.TemporaryDirectory()
+        self.addCleanup(location.cleanup)
+        shared = {'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': location.name,
+        }}
+        user = create_user()
+        with override_settings(CACHES=shared):
+            profile.get_profile(user.id)
+            with self.assertNumQueries(0):
+                profile.get_profile(user.id)
+
+            BranchAccess.objects.create(user=user, branch=create_branch())
+
+            self.assertEqual(len(profile.get_profile(user.id).branch_ids), 1)
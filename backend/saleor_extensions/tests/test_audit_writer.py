@@ -0,0 +1,56 @@
+from unittest import mock
+
+from django.db import transaction
+from django.test import TransactionTestCase, override_settings
+
+from saleor_extensions.audit import writer
+from saleor_extensions.audit.models import AuditLog
+
+
+def entry(number):
+    return {'action': 'UPDATE', 'model_name': 'Branch', 'object_id': str(number)}
+
+
+class AuditWriterTests(TransactionTestCase):
+    def setUp(self):
+        # Keep entries queued until drain() instead of racing the flusher thread
+        patcher = mock.patch.object(writer, '_run', lambda: None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(writer.drain)
+        self.before = writer.stats()
+
+    def counted(self, name):
+        return writer.stats()[name] - self.before[name]
+
+    def test_entries_are_queued_only_after_commit(self):
+        with transaction.atomic():
+            writer.enqueue(entry(1))
+            transaction.set_rollback(True)
+        with transaction.atomic():
+            writer.enqueue(entry(2))
+            self.assertEqual(self.counted('queued'), 0)
+
+        self.assertEqual(self.counted('queued'), 1)
+        self.assertEqual(writer.drain(), 1)
+        self.assertEqual(list(AuditLog.objects.values_list('object_id', flat=True)), ['2'])
+
+    @override_settings(AUDIT_QUEUE_SIZE=1, AUDIT_QUEUE_PUT_TIMEOUT=0)
+    def test_full_queue_writes_inline(self):
+        writer.enqueue(entry(1))
+        writer.enqueue(entry(2))
+
+        self.assertEqual(self.counted('queued'), 1)
+        self.assertEqual(self.counted('inline'), 1)
+        self.assertEqual(list(AuditLog.objects.values_list('object_id', flat=True)), ['2'])
+
+    @override_settings(AUDIT_BATCH_SIZE=2)
+    def test_drain_writes_every_queued_entry(self):
+        for number in range(5):
+            writer.enqueue(entry(number))
+
+        self.assertEqual(writer.stats()['pending'], 5)
+        self.assertEqual(writer.drain(), 5)
+        self.assertEqual(AuditLog.objects.count(), 5)
+        self.assertEqual(self.counted('written'), 5)
+        self.assertEqual(writer.drain(), 0)
@@ -0,0 +1,223 @@
+from datetime import timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from grandgold_graphql import execution
+from saleor_extensions.inventory.models import BranchInventory, LowStockAlert, StockTransfer
+from saleor_extensions.inventory.services import StockLedger
+from saleor_extensions.permissions.models import BranchAccess, Role, UserRole
+from saleor_extensions.reports.models import DailySalesFact
+from saleor_extensions.tests.factories import create_branch, create_user, create_variant
+
+
+def branch_ids(queryset):
+    return {row.branch_id for row in queryset}
+
+
+@override_settings(BRANCH_SCOPE_ENFORCED=True)
+class ForUserTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.branches = [create_branch() for _ in range(3)]
+        variant = create_variant()
+        for branch in cls.branches:
+            StockLedger.adjust(branch.id, variant.id, 'IN', 1)
+        cls.all_ids = {branch.id for branch in cls.branches}
+
+    def test_explicit_access_and_role_branches(self):
+        user = create_user()
+        role = Role.objects.create(code='SALES_EXECUTIVE', name='Sales')
+        role.default_branches.add(self.branches[1])
+        BranchAccess.objects.create(user=user, branch=self.branches[0])
+        BranchAccess.objects.create(user=user, branch=self.branches[2], is_active=False)
+        UserRole.objects.create(user=user, role=role)
+
+        self.assertEqual(
+            branch_ids(BranchInventory.objects.for_user(user)),
+            {self.branches[0].id, self.branches[1].id},
+        )
+
+    def test_assigned_branch_of_a_role(self):
+        user = create_user()
+        role = Role.objects.create(code='BRANCH_MANAGER', name='Manager')
+        UserRole.objects.create(user=user, role=role, branch=self.branches[2])
+
+        self.assertEqual(branch_ids(BranchInventory.objects.for_user(user)), {self.branches[2].id})
+
+    def test_all_branch_roles_and_superusers_are_not_filtered(self):
+        user = create_user()
+        role = Role.objects.create(code='ADMIN', name='Admin', can_access_all_branches=True)
+        UserRole.objects.create(user=user, role=role)
+        superuser = create_user(is_superuser=True, is_staff=True)
+
+        self.assertEqual(branch_ids(BranchInventory.objects.for_user(user)), self.all_ids)
+        self.assertEqual(branch_ids(BranchInventory.objects.for_user(superuser)), self.all_ids)
+
+    def test_users_without_access_and_anonymous_users_see_nothing(self):
+        self.assertFalse(BranchInventory.objects.for_user(create_user(is_staff=True)).exists())
+        self.assertFalse(BranchInventory.objects.for_user(AnonymousUser()).exists())
+        self.assertFalse(BranchInventory.objects.for_user(None).exists())
+
+    def test_active_apps_are_not_filtered(self):
+        anonymous = AnonymousUser()
+
+        self.assertEqual(
+            branch_ids(BranchInventory.objects.for_user(anonymous, SimpleNamespace(is_active=True))),
+            self.all_ids,
+        )
+        self.assertFalse(BranchInventory.objects.for_user(anonymous, SimpleNamespace(is_active=False)).exists())
+
+    def test_transfers_are_visible_from_both_branches(self):
+        user = create_user()
+        BranchAccess.objects.create(user=user, branch=self.branches[1])
+        outgoing = StockTransfer.objects.create(
+            transfer_number='TRF-1', from_branch=self.branches[1], to_branch=self.branches[0],
+            product_id='1', quantity=1,
+        )
+        incoming = StockTransfer.objects.create(
+            transfer_number='TRF-2', from_branch=self.branches[2], to_branch=self.branches[1],
+            product_id='1', quantity=1,
+        )
+        StockTransfer.objects.create(
+            transfer_number='TRF-3', from_branch=self.branches[0], to_branch=self.branches[2],
+            product_id='1', quantity=1,
+        )
+
+        self.assertEqual(set(StockTransfer.objects.for_user(user)), {outgoing, incoming})
+
+    @override_settings(BRANCH_SCOPE_ENFORCED=False)
+    def test_everything_is_visible_when_not_enforced(self):
+        self.assertEqual(branch_ids(BranchInventory.objects.for_user(AnonymousUser())), self.all_ids)
+
+
+@override_settings(BRANCH_SCOPE_ENFORCED=True)
+class InventoryResolverScopeTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        from grandgold_graphql.schema import schema
+
+        cls.schema = schema
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.own, cls.other = create_branch(), create_branch()
+        cls.variant = create_variant()
+        cls.own_row, _ = StockLedger.adjust(cls.own.id, cls.variant.id, 'IN', 1)
+        cls.other_row, _ = StockLedger.adjust(cls.other.id, cls.variant.id, 'IN', 1)
+        for row in (cls.own_row, cls.other_row):
+            LowStockAlert.objects.create(branch_inventory=row, current_quantity=1, threshold=10)
+        StockTransfer.objects.create(
+            transfer_number='TRF-1', from_branch=cls.own, to_branch=cls.other, product_id='1', quantity=1,
+        )
+        StockTransfer.objects.create(
+            transfer_number='TRF-2', from_branch=cls.other, to_branch=cls.own, product_id='1', quantity=1,
+            status='COMPLETED',
+        )
+        StockTransfer.objects.create(
+            transfer_number='TRF-3', from_branch=cls.other, to_branch=cls.other, product_id='1', quantity=1,
+        )
+        cls.user = create_user()
+        BranchAccess.objects.create(user=cls.user, branch=cls.own)
+
+    def execute(self, query, **variables):
+        context = SimpleNamespace(user=self.user, app=None)
+        response = execution.execute_request(self.schema, {'query': query, 'variables': variables}, context)
+        self.assertEqual(response.errors, [])
+        return response.data
+
+    def test_inventory_item_of_another_branch_is_not_found(self):
+        query = '''query ($id: ID, $branch: ID, $variant: ID) {
+            inventoryItem(id: $id, branchId: $branch, productVariantId: $variant) { id }
+        }'''
+
+        self.assertEqual(self.execute(query, id=self.own_row.id)['inventoryItem'], {'id': str(self.own_row.id)})
+        self.assertIsNone(self.execute(query, id=self.other_row.id)['inventoryItem'])
+        self.assertIsNone(self.execute(query, branch=self.other.id, variant=self.variant.id)['inventoryItem'])
+
+    def test_low_stock_alerts_are_scoped(self):
+        data = self.execute('{ lowStockAlerts { branchInventory { id } } }')
+
+        self.assertEqual(data['lowStockAlerts'], [{'branchInventory': {'id': str(self.own_row.id)}}])
+
+    def test_stock_transfers_can_be_filtered(self):
+        query = '''query ($from: ID, $to: ID, $status: String) {
+            stockTransfers(fromBranchId: $from, toBranchId: $to, status: $status) { transferNumber }
+        }'''
+
+        def numbers(**variables):
+            return {row['transferNumber'] for row in self.execute(query, **variables)['stockTransfers']}
+
+        self.assertEqual(numbers(), {'TRF-1', 'TRF-2'})
+        self.assertEqual(numbers(**{'from': self.own.id}), {'TRF-1'})
+        self.assertEqual(numbers(to=self.own.id, status='COMPLETED'), {'TRF-2'})
+
+
+@override_settings(BRANCH_SCOPE_ENFORCED=True)
+class ReportScopeTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        from grandgold_graphql.schema import schema
+
+        cls.schema = schema
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.own, cls.other = create_branch(), create_branch()
+        day = timezone.localdate() - timedelta(days=2)
+        for branch, gross in ((cls.own, Decimal('100.00')), (cls.other, Decimal('900.00'))):
+            DailySalesFact.objects.create(
+                date=day, branch=branch, currency='GBP', order_count=1, gross_total=gross, net_total=gross,
+            )
+            StockLedger.adjust(branch.id, create_variant().id, 'IN', 1)
+        cls.user = create_user()
+        BranchAccess.objects.create(user=cls.user, branch=cls.own)
+
+    def setUp(self):
+        cache.clear()
+
+    def execute(self, query, user=None):
+        context = SimpleNamespace(user=user or self.user, app=None)
+        response = execution.execute_request(self.schema, {'query': query}, context)
+        self.assertEqual(response.errors, [])
+        return response.data
+
+    def test_branch_performance_lists_only_accessible_branches(self):
+        data = self.execute('{ branchPerformance { branchId sales } }')
+
+        [branch] = data['branchPerformance']
+        self.assertEqual(branch['branchId'], str(self.own.id))
+        self.assertEqual(Decimal(branch['sales']), Decimal('100'))
+
+    def test_branch_kpis_of_another_branch_are_empty(self):
+        query = '{ branchKpis(branchId: "%s") { label } }'
+
+        self.assertTrue(self.execute(query % self.own.id)['branchKpis'])
+        self.assertEqual(self.execute(query % self.other.id)['branchKpis'], [])
+
+    def test_totals_cover_only_accessible_branches(self):
+        data = self.execute('''{
+            executiveKpis { label value }
+            inventoryStatus { totalItems }
+            revenueByRegion { branchCount sales }
+        }''')
+
+        kpis = {kpi['label']: kpi['value'] for kpi in data['executiveKpis']}
+        self.assertEqual(kpis['Active Branches'], '1')
+        self.assertEqual(data['inventoryStatus'], {'totalItems': 1})
+        [region] = data['revenueByRegion']
+        self.assertEqual(region['branchCount'], 1)
+        self.assertEqual(Decimal(region['sales']), Decimal('100'))
+
+    def test_all_branch_users_see_every_branch(self):
+        superuser = create_user(is_superuser=True, is_staff=True)
+
+        data = self.execute('{ branchPerformance { branchId } }', user=superuser)
+
+        self.assertEqual(len(data['branchPerformance']), 2)
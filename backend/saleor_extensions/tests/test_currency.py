@@ -0,0 +1,112 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from saleor_extensions.currency import rates
+from saleor_extensions.currency.models import Currency, ExchangeRate
+from saleor_extensions.currency.services import CurrencyConverter
+
+
+class RateMatrixVersionTests(TestCase):
+    def setUp(self):
+        self.gbp, self.aed = (
+            Currency.objects.create(code=code, name=code, symbol=code) for code in ('GBP', 'AED')
+        )
+        self.week_ago = timezone.now() - timedelta(days=7)
+        ExchangeRate.objects.create(
+            from_currency=self.aed, to_currency=self.gbp, rate=Decimal('0.20'), effective_date=self.week_ago
+        )
+        rates.invalidate()
+        self.addCleanup(rates.invalidate)
+
+    def rate(self):
+        return rates.get_matrix().rate('AED', 'GBP', timezone.now())
+
+    def expire_check(self):
+        # As if CURRENCY_RATE_CHECK_INTERVAL had passed in a process that saw no signal
+        rates._checked_at = 0.0
+
+    def test_rows_written_without_signals_are_picked_up(self):
+        self.assertEqual(self.rate(), Decimal('0.20'))
+        ExchangeRate.objects.bulk_create([ExchangeRate(
+            from_currency=self.aed, to_currency=self.gbp, rate=Decimal('0.25'),
+            effective_date=self.week_ago + timedelta(days=1),
+        )])
+
+        self.assertEqual(self.rate(), Decimal('0.20'))
+        self.expire_check()
+        self.assertEqual(self.rate(), Decimal('0.25'))
+
+    def test_deactivating_a_currency_changes_the_version(self):
+        self.assertEqual(self.rate(), Decimal('0.20'))
+        Currency.objects.filter(pk=self.aed.pk).update(is_active=False)
+
+        self.expire_check()
+        self.assertIsNone(self.rate())
+
+    def test_unchanged_tables_keep_the_loaded_matrix(self):
+        matrix = rates.get_matrix()
+        self.expire_check()
+
+        self.assertIs(rates.get_matrix(), matrix)
+
+
+class ConvertManyParityTests(TestCase):
+    def setUp(self):
+        currencies = {
+            code: Currency.objects.create(code=code, name=code, symbol=code)
+            for code in ('GBP', 'AED', 'INR', 'USD')
+        }
+        self.start = timezone.now() - timedelta(days=10)
+        for days, from_code, to_code, rate in [
+            (0, 'GBP', 'AED', '4.60'),
+            (3, 'GBP', 'AED', '4.70'),
+            (6, 'GBP', 'AED', '4.65'),
+            (0, 'INR', 'GBP', '0.0095'),
+            (5, 'INR', 'GBP', '0.0096'),
+        ]:
+            ExchangeRate.objects.create(
+                from_currency=currencies[from_code], to_currency=currencies[to_code],
+                rate=Decimal(rate), effective_date=self.start + timedelta(days=days),
+            )
+        rates.invalidate()
+        self.addCleanup(rates.invalidate)
+
+    def test_matches_convert_amount(self):
+        # Before the first rate, on and between rate changes, and today
+        dates = [self.start - timedelta(days=1)] + [
+            self.start + timedelta(days=days, hours=hours) for days in range(11) for hours in (0, 12)
+        ]
+        sources = ['GBP', 'AED', 'INR', 'USD']
+        amounts, codes, whens = [], [], []
+        for index, when in enumerate(dates):
+            for code in sources:
+                amounts.append(Decimal(index * 17 + 1) / 4)
+                codes.append(code)
+                whens.append(when)
+
+        for target in sources:
+            with self.subTest(target=target):
+                expected = [
+                    CurrencyConverter.convert_amount(amount, code, target, when)
+                    for amount, code, when in zip(amounts, codes, whens)
+                ]
+                self.assertEqual(CurrencyConverter.convert_many(amounts, codes, target, whens), expected)
+                self.assertIn(None, expected)
+
+    def test_single_code_date_and_none_amounts(self):
+        day = (self.start + timedelta(days=4)).date()
+        amounts = [Decimal('10'), None, Decimal('2.5')]
+
+        self.assertEqual(
+            CurrencyConverter.convert_many(amounts, 'AED', 'INR', day),
+            [CurrencyConverter.convert_amount(amount, 'AED', 'INR', day) if amount is not None else None
+             for amount in amounts],
+        )
+        self.assertEqual(CurrencyConverter.convert_many(amounts, 'GBP', 'GBP'), amounts)
+
+    def test_lengths_must_match(self):
+        with self.assertRaises(ValueError):
+            CurrencyConverter.convert_many([Decimal('1')], ['GBP', 'AED'], 'GBP')
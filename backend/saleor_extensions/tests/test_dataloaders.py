@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+
+from django.test import TestCase
+
+from grandgold_graphql import execution
+from saleor_extensions.inventory.services import StockLedger
+from saleor_extensions.tests.factories import create_branch, create_user, create_variant
+
+
+class InventoryDataLoaderTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        from grandgold_graphql.schema import schema
+
+        cls.schema = schema
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.branch = create_branch()
+        cls.variants = [create_variant() for _ in range(5)]
+        for variant in cls.variants:
+            StockLedger.adjust(cls.branch.id, variant.id, 'IN', 1)
+        cls.user = create_user(is_superuser=True, is_staff=True)
+
+    def test_variants_and_products_load_in_one_query_each(self):
+        query = '{ branchInventory(branchId: "%s") { productVariant { sku product { name } } } }' % self.branch.id
+        context = SimpleNamespace(user=self.user, app=None)
+
+        # Inventory rows, then one id__in query for variants and one for products
+        with self.assertNumQueries(3):
+            response = execution.execute_request(self.schema, {'query': query}, context)
+
+        self.assertEqual(response.errors, [])
+        self.assertEqual(
+            sorted(row['productVariant']['sku'] for row in response.data['branchInventory']),
+            sorted(variant.sku for variant in self.variants),
+        )
+        self.assertEqual(
+            {row['productVariant']['product']['name'] for row in response.data['branchInventory']},
+            {variant.product.name for variant in self.variants},
+        )
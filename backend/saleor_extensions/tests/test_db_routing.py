@@ -0,0 +1,119 @@
+from types import SimpleNamespace
+from unittest import mock
+
+import graphene
+from django.core.cache import cache
+from django.db import transaction
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from graphql import parse
+
+from grandgold_graphql import execution
+from saleor_extensions import db_routing
+from saleor_extensions.branches.models import Branch
+
+
+class ReplicaRouterTests(TransactionTestCase):
+    def setUp(self):
+        token = db_routing._replica_reads.set(True)
+        self.addCleanup(db_routing._replica_reads.reset, token)
+        self.router = db_routing.ReplicaRouter()
+
+    def test_reads_in_replica_block_use_the_replica(self):
+        self.assertEqual(self.router.db_for_read(Branch), db_routing.REPLICA_ALIAS)
+        self.assertEqual(self.router.db_for_write(Branch), db_routing.DEFAULT_ALIAS)
+
+    def test_reads_in_a_primary_transaction_stay_on_the_primary(self):
+        with transaction.atomic():
+            self.assertIsNone(self.router.db_for_read(Branch))
+
+
+class RoutingQuery(graphene.ObjectType):
+    routing_test_listing = graphene.Boolean()
+    routing_test_detail = graphene.Boolean()
+
+    def resolve_routing_test_listing(self, info):
+        return db_routing.using_replica()
+
+    def resolve_routing_test_detail(self, info):
+        return db_routing.using_replica()
+
+
+class RoutingMutation(graphene.ObjectType):
+    routing_test_update = graphene.Boolean()
+
+    def resolve_routing_test_update(self, info):
+        return db_routing.using_replica()
+
+
+db_routing.replica_fields('routing_test_listing')
+routing_schema = graphene.Schema(query=RoutingQuery, mutation=RoutingMutation)
+
+
+@mock.patch.object(db_routing, 'replica_enabled', lambda: True)
+class ReplicaSelectionTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(setattr, db_routing, '_replica_down_until', 0.0)
+        self.user = SimpleNamespace(pk=1, is_authenticated=True)
+
+    def test_callers_are_pinned_to_the_primary_after_a_write(self):
+        other = SimpleNamespace(pk=2, is_authenticated=True)
+        self.assertTrue(db_routing.allow_replica(self.user))
+
+        db_routing.pin_primary(self.user)
+
+        self.assertTrue(db_routing.is_pinned(self.user))
+        self.assertFalse(db_routing.allow_replica(self.user))
+        self.assertTrue(db_routing.allow_replica(other))
+
+    def test_anonymous_callers_are_never_pinned(self):
+        anonymous = SimpleNamespace(pk=None, is_authenticated=False)
+
+        db_routing.pin_primary(anonymous)
+
+        self.assertFalse(db_routing.is_pinned(anonymous))
+
+    def test_a_replica_marked_down_is_skipped(self):
+        with self.assertLogs('saleor_extensions.db_routing', 'WARNING'):
+            db_routing.mark_replica_down('connection refused')
+
+        self.assertFalse(db_routing.allow_replica(self.user))
+        self.assertFalse(db_routing.replica_available())
+        with db_routing.replica_reads() as on_replica:
+            self.assertFalse(on_replica)
+            self.assertIsNone(db_routing.ReplicaRouter().db_for_read(Branch))
+
+    @override_settings(REPLICA_RETRY_SECONDS=0)
+    def test_the_replica_is_retried_after_the_retry_window(self):
+        with self.assertLogs('saleor_extensions.db_routing', 'WARNING'):
+            db_routing.mark_replica_down('connection refused')
+
+        self.assertTrue(db_routing.allow_replica(self.user))
+
+
+@mock.patch.object(db_routing, 'replica_enabled', lambda: True)
+@mock.patch.object(db_routing, 'replica_available', lambda: True)
+class ExecuteRoutedTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def execute(self, query):
+        document = parse(query)
+        context = SimpleNamespace(user=SimpleNamespace(pk=1, is_authenticated=True), allow_replica=False)
+        result = execution._execute_routed(
+            routing_schema, document, execution._operation(document, None), context, None, None, None
+        )
+        self.assertFalse(result.errors)
+        return result.data, context.allow_replica
+
+    def test_replica_fields_run_on_the_replica(self):
+        self.assertEqual(self.execute('{ routingTestListing }'), ({'routingTestListing': True}, True))
+
+    def test_other_fields_run_on_the_primary(self):
+        data, allow_replica = self.execute('{ routingTestListing routingTestDetail }')
+
+        self.assertEqual(data, {'routingTestListing': False, 'routingTestDetail': False})
+        self.assertFalse(allow_replica)
+
+    def test_mutations_run_on_the_primary(self):
+        self.assertEqual(self.execute('mutation { routingTestUpdate }'), ({'routingTestUpdate': False}, False))
@@ -0,0 +1,88 @@
+import warnings
+from types import SimpleNamespace
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from grandgold_graphql import execution
+
+QUERY = '{ dashboardCacheStats { resolver } }'
+
+
+def persisted(sha256_hash, query=None):
+    payload = {'extensions': {'persistedQuery': {'version': 1, 'sha256Hash': sha256_hash}}}
+    if query is not None:
+        payload['query'] = query
+    return payload
+
+
+class PersistedQueryTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        from grandgold_graphql.schema import schema
+
+        cls.schema = schema
+
+    def setUp(self):
+        cache.clear()
+        execution.document_cache.clear()
+
+    def execute(self, payload):
+        return execution.execute_request(self.schema, payload, SimpleNamespace(user=None, app=None))
+
+    def test_unknown_hash_asks_for_the_query(self):
+        with self.assertRaises(execution.QueryError) as raised:
+            self.execute(persisted(execution.query_hash(QUERY)))
+
+        self.assertEqual(raised.exception.message, execution.PERSISTED_QUERY_NOT_FOUND)
+        self.assertEqual(raised.exception.code, 'PERSISTED_QUERY_NOT_FOUND')
+        self.assertEqual(raised.exception.status, 200)
+
+    def test_hash_mismatch_is_rejected_and_not_registered(self):
+        sha256_hash = execution.query_hash('{ other }')
+
+        with self.assertRaises(execution.QueryError) as raised:
+            self.execute(persisted(sha256_hash, QUERY))
+
+        self.assertEqual(raised.exception.code, 'PERSISTED_QUERY_HASH_MISMATCH')
+        self.assertIsNone(cache.get(execution._apq_key(sha256_hash)))
+
+    def test_registered_query_is_served_by_hash(self):
+        sha256_hash = execution.query_hash(QUERY)
+        self.assertEqual(self.execute(persisted(sha256_hash, QUERY)).errors, [])
+        # Another worker: the document is not parsed in this process yet
+        execution.document_cache.clear()
+
+        response = self.execute(persisted(sha256_hash))
+
+        self.assertEqual(response.errors, [])
+        self.assertIn('dashboardCacheStats', response.data)
+
+    def test_execution_does_not_use_deprecated_arguments(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.execute({'query': QUERY})
+
+        self.assertEqual([str(w.message) for w in caught if issubclass(w.category, DeprecationWarning)], [])
+
+
+class LRUCacheTests(SimpleTestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        lru = execution.LRUCache(2)
+        lru.put('a', 1)
+        lru.put('b', 2)
+        lru.get('a')
+        lru.put('c', 3)
+
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual((lru.get('a'), lru.get('c')), (1, 3))
+
+    def test_hits_and_misses_are_counted(self):
+        lru = execution.LRUCache(2)
+        lru.put('a', 1)
+        lru.get('a')
+        lru.get('a')
+        lru.get('missing')
+
+        self.assertEqual(lru.stats(), {'size': 1, 'hits': 2, 'misses': 1})
@@ -0,0 +1,43 @@
+from django.test import RequestFactory, TestCase
+
+from grandgold_graphql import execution, instrumentation
+from saleor_extensions.inventory.services import StockLedger
+from saleor_extensions.tests.factories import create_branch, create_user, create_variant
+
+
+class ResolverSqlTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        from grandgold_graphql.schema import schema
+
+        cls.schema = schema
+
+    @classmethod
+    def setUpTestData(cls):
+        branch = create_branch()
+        for _ in range(3):
+            StockLedger.adjust(branch.id, create_variant().id, 'IN', 5)
+
+    def execute(self, query):
+        request = RequestFactory().post('/graphql/', HTTP_X_GRANDGOLD_TRACE='1')
+        request.user = create_user(is_staff=True, is_superuser=True)
+        return execution.execute_request(self.schema, {'query': query}, execution.GraphQLContext(request))
+
+    def test_lazy_querysets_are_counted_against_their_field(self):
+        response = self.execute('{ branchInventory { id quantity } }')
+
+        self.assertEqual(response.errors, [])
+        self.assertEqual(len(response.data['branchInventory']), 3)
+        fields = {entry['field']: entry for entry in response.extensions['trace']['resolvers']}
+        self.assertGreater(fields['Query.branchInventory']['dbQueries'], 0)
+
+    def test_the_field_histogram_records_the_queries(self):
+        series = instrumentation.RESOLVER_DB_QUERIES._series
+        observed = series['Query.stockMovements'][2] if 'Query.stockMovements' in series else 0
+
+        self.execute('{ stockMovements { id } }')
+
+        _, total, count = series['Query.stockMovements']
+        self.assertEqual(count, observed + 1)
+        self.assertGreater(total, 0)
@@ -0,0 +1,72 @@
+import base64
+
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase, TestCase
+
+from saleor_extensions.inventory.models import BranchInventory
+from saleor_extensions.inventory.pagination import (
+    MAX_PAGE_SIZE,
+    clamp_page_size,
+    decode_cursor,
+    encode_cursor,
+    keyset_page,
+)
+from saleor_extensions.inventory.services import StockLedger
+from saleor_extensions.tests.factories import create_branch, create_variant
+
+
+class CursorTests(SimpleTestCase):
+    def test_round_trip(self):
+        self.assertEqual(decode_cursor(encode_cursor(12, 3456)), (12, 3456))
+
+    def test_malformed_cursors_are_rejected(self):
+        wrong_prefix = base64.urlsafe_b64encode(b'stockmovement:1:2').decode('ascii')
+        not_numeric = base64.urlsafe_b64encode(b'branchinventory:a:2').decode('ascii')
+        for cursor in ('not base64!', wrong_prefix, not_numeric, ''):
+            with self.subTest(cursor=cursor), self.assertRaises(ValidationError):
+                decode_cursor(cursor)
+
+    def test_page_size_is_clamped(self):
+        self.assertEqual(clamp_page_size(None), 50)
+        self.assertEqual(clamp_page_size(10), 10)
+        self.assertEqual(clamp_page_size(10000), MAX_PAGE_SIZE)
+        with self.assertRaises(ValidationError):
+            clamp_page_size(0)
+
+
+class KeysetPageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Branches created out of order so (branch_id, id) differs from insertion order
+        branches = [create_branch(), create_branch()]
+        for branch in (branches[1], branches[0], branches[1], branches[0], branches[1]):
+            StockLedger.adjust(branch.id, create_variant().id, 'IN', 1)
+        cls.ordered = list(BranchInventory.objects.order_by('branch_id', 'id'))
+
+    def test_pages_follow_branch_then_id(self):
+        rows, has_next_page = keyset_page(BranchInventory.objects.all(), first=2)
+        self.assertEqual(rows, self.ordered[:2])
+        self.assertTrue(has_next_page)
+
+        rows, has_next_page = keyset_page(
+            BranchInventory.objects.all(), first=2, after=encode_cursor(rows[-1].branch_id, rows[-1].id)
+        )
+        self.assertEqual(rows, self.ordered[2:4])
+        self.assertTrue(has_next_page)
+
+    def test_no_next_page_when_exactly_first_rows_remain(self):
+        last = self.ordered[1]
+
+        rows, has_next_page = keyset_page(
+            BranchInventory.objects.all(), first=3, after=encode_cursor(last.branch_id, last.id)
+        )
+
+        self.assertEqual(rows, self.ordered[2:])
+        self.assertFalse(has_next_page)
+
+    def test_one_query_per_page(self):
+        with self.assertNumQueries(1):
+            rows, has_next_page = keyset_page(BranchInventory.objects.all(), first=len(self.ordered))
+
+        self.assertEqual(len(rows), len(self.ordered))
+        self.assertFalse(has_next_page)
@@ -0,0 +1,112 @@
+import re
+import unittest
+from pathlib import Path
+
+from django.test import SimpleTestCase, override_settings
+from graphql import parse
+
+from grandgold_graphql import cost, execution
+
+FRONTEND_DIR = Path(__file__).resolve().parents[3] / 'frontend'
+GQL_TEMPLATE = re.compile(r'gql`(.*?)`', re.S)
+OPERATION_NAME = re.compile(r'^\s*(query|mutation)\s+(\w+)')
+PAGE_SIZE = re.compile(r'\b(?:first|last):\s*(\d+)')
+
+# Saleor rejects connection pages over 100 items before any cost is counted
+SALEOR_MAX_PAGE_SIZE = 100
+
+# Variables the pages send, by operation name (the larger page where names repeat)
+PAGE_VARIABLES = {
+    'GetProducts': {'first': 50},
+    'GetOrders': {'first': 50},
+    'GetCustomers': {'first': 50},
+    'GetUserOrders': {'first': 20},
+    'GetBranchStockMovements': {'limit': 10},
+}
+
+
+def frontend_queries():
+    """(path, operation name, query text) for every gql`` query in the frontends"""
+    for path in sorted(FRONTEND_DIR.glob('*/**/*.ts*')):
+        if 'node_modules' in path.parts:
+            continue
+        for match in GQL_TEMPLATE.finditer(path.read_text(encoding='utf-8')):
+            query = match.group(1)
+            operation = OPERATION_NAME.match(query)
+            if operation is not None and operation.group(1) == 'query':
+                yield path.relative_to(FRONTEND_DIR), operation.group(2), query
+
+
+class RequestContext:
+    user = None
+    request = None
+
+
+@unittest.skipUnless(FRONTEND_DIR.is_dir(), 'frontend sources not available')
+@override_settings(GRAPHQL_COST_ENFORCE=True, GRAPHQL_COST_RATE_LIMIT=0)
+class FrontendQueryCostTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        from grandgold_graphql.schema import schema
+
+        cls.schema = schema
+
+    def test_frontend_queries_fit_the_limits(self):
+        checked = 0
+        for path, name, query in frontend_queries():
+            page_sizes = [int(size) for size in PAGE_SIZE.findall(query)]
+            if any(size > SALEOR_MAX_PAGE_SIZE for size in page_sizes):
+                continue
+            with self.subTest(path=str(path), operation=name):
+                extensions, violation = cost.check(
+                    self.schema, parse(query), RequestContext(), PAGE_VARIABLES.get(name), name
+                )
+                self.assertIsNone(violation, f'{name} in {path}: {extensions}')
+                checked += 1
+        self.assertGreater(checked, 0)
+
+
+class ClientKeyTests(SimpleTestCase):
+    def context(self, **meta):
+        context = RequestContext()
+        context.request = type('Request', (), {'META': meta})()
+        return context
+
+    def test_uses_the_hop_appended_by_the_proxy(self):
+        context = self.context(HTTP_X_FORWARDED_FOR='1.2.3.4, 10.0.0.7', REMOTE_ADDR='10.0.0.1')
+
+        self.assertEqual(cost._client_key(context), 'ip:10.0.0.7')
+
+    def test_falls_back_to_the_remote_address(self):
+        self.assertEqual(cost._client_key(self.context(REMOTE_ADDR='10.0.0.1')), 'ip:10.0.0.1')
+
+
+class IntrospectionTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        from grandgold_graphql.schema import schema
+
+        cls.schema = schema
+
+    def test_formatting_and_unused_variables_share_a_cache_entry(self):
+        first = execution.execute_request(self.schema, {'query': '{ __schema { queryType { name } } }'}, None)
+        second = execution.execute_request(self.schema, {
+            'query': 'query {\n  # root type\n  __schema { queryType { name } }\n}',
+            'variables': {'unused': 1},
+        }, None)
+
+        self.assertEqual(first.etag, second.etag)
+        self.assertIsNone(first.data)
+        self.assertIn(b'"queryType"', first.body)
+
+    def test_depth_limit_applies(self):
+        query = '{ __schema { types { fields { type { ' + 'ofType { ' * 11 + 'name' + ' }' * 15 + ' }'
+
+        with self.assertRaises(execution.QueryError) as raised:
+            execution.execute_request(self.schema, {'query': query}, None)
+        self.assertEqual(raised.exception.code, 'QUERY_TOO_DEEP')
+
+    def test_full_introspection_fits_the_depth_limit(self):
+        self.assertIn('__schema', execution.introspect(self.schema))
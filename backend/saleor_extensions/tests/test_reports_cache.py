@@ -0,0 +1,72 @@
+from types import SimpleNamespace
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from grandgold_graphql import execution
+from saleor_extensions.inventory.models import BranchInventory
+from saleor_extensions.inventory.services import StockLedger
+from saleor_extensions.permissions.models import BranchAccess, Role, UserRole
+from saleor_extensions.reports import cache as reports_cache
+from saleor_extensions.tests.factories import create_branch, create_user, create_variant
+
+QUERY = '{ inventoryStatus { totalItems } }'
+
+
+class DashboardCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        from grandgold_graphql.schema import schema
+
+        cls.schema = schema
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.branches = [create_branch(), create_branch()]
+        StockLedger.adjust(cls.branches[0].id, create_variant().id, 'IN', 1)
+        StockLedger.adjust(cls.branches[1].id, create_variant().id, 'IN', 1)
+        cls.superuser = create_user(is_superuser=True, is_staff=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def total_items(self, user):
+        context = SimpleNamespace(user=user, app=None)
+        response = execution.execute_request(self.schema, {'query': QUERY}, context)
+        self.assertEqual(response.errors, [])
+        return response.data['inventoryStatus']['totalItems']
+
+    def test_second_call_is_served_from_the_cache(self):
+        self.assertEqual(self.total_items(self.superuser), 2)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.total_items(self.superuser), 2)
+        self.assertEqual(reports_cache.stats()['inventory_status'], {'hits': 1, 'misses': 1})
+
+    def test_saving_inventory_invalidates_inventory_reports(self):
+        self.assertEqual(self.total_items(self.superuser), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            BranchInventory.objects.create(branch=create_branch(), product_variant=create_variant(), quantity=3)
+
+        self.assertEqual(self.total_items(self.superuser), 3)
+
+    @override_settings(BRANCH_SCOPE_ENFORCED=True)
+    def test_users_with_different_branches_get_separate_entries(self):
+        first, second, everywhere, nowhere = (create_user() for _ in range(4))
+        BranchAccess.objects.create(user=first, branch=self.branches[0])
+        BranchAccess.objects.create(user=second, branch=self.branches[1])
+        UserRole.objects.create(
+            user=everywhere, role=Role.objects.create(code='ADMIN', name='Admin', can_access_all_branches=True)
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            # Extra stock only visible to the first user
+            StockLedger.adjust(self.branches[0].id, create_variant().id, 'IN', 1)
+
+        self.assertEqual(self.total_items(first), 2)
+        self.assertEqual(self.total_items(second), 1)
+        self.assertEqual(self.total_items(nowhere), 0)
+        self.assertEqual(self.total_items(everywhere), 3)
+        self.assertEqual(self.total_items(first), 2)
+        self.assertEqual(reports_cache.stats()['inventory_status'], {'hits': 1, 'misses': 4})
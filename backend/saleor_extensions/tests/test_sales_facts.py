@@ -0,0 +1,60 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from saleor_extensions.currency import rates
+from saleor_extensions.currency.models import Currency, ExchangeRate
+from saleor_extensions.reports.models import DailySalesFact
+from saleor_extensions.reports.services import SalesFactService
+from saleor_extensions.tests.factories import create_branch, create_region
+
+
+class DailyTotalsCurrencyTests(TestCase):
+    def setUp(self):
+        self.branch = create_branch(region=create_region(timezone='UTC'))
+        self.day = timezone.localdate() - timedelta(days=3)
+        gbp, aed = (
+            Currency.objects.create(code=code, name=code, symbol=code) for code in ('GBP', 'AED')
+        )
+        ExchangeRate.objects.create(
+            from_currency=aed, to_currency=gbp, rate=Decimal('0.20'),
+            effective_date=timezone.now() - timedelta(days=30),
+        )
+        rates.invalidate()
+        self.addCleanup(rates.invalidate)
+
+    def fact(self, currency, orders, gross):
+        DailySalesFact.objects.create(
+            date=self.day, branch=self.branch, currency=currency,
+            order_count=orders, gross_total=gross, net_total=gross,
+        )
+
+    def test_converts_into_the_reporting_currency(self):
+        self.fact('GBP', 2, Decimal('100.00'))
+        self.fact('AED', 1, Decimal('500.00'))
+
+        totals = SalesFactService.daily_totals(self.day, self.day, currency='GBP')
+
+        self.assertEqual(totals[(None, self.day)]['orders'], 3)
+        self.assertEqual(totals[(None, self.day)]['gross'], Decimal('200.00'))
+
+    def test_converts_per_branch_currency(self):
+        self.fact('GBP', 1, Decimal('100.00'))
+
+        totals = SalesFactService.daily_totals(
+            self.day, self.day, by_branch=True, currency={self.branch.id: 'AED'}
+        )
+
+        self.assertEqual(totals[(self.branch.id, self.day)]['gross'], Decimal('500.00'))
+
+    def test_amounts_without_a_rate_are_left_out(self):
+        self.fact('GBP', 1, Decimal('100.00'))
+        self.fact('INR', 4, Decimal('9000.00'))
+
+        with self.assertLogs('saleor_extensions.reports.services', 'WARNING'):
+            totals = SalesFactService.daily_totals(self.day, self.day, currency='GBP')
+
+        self.assertEqual(totals[(None, self.day)]['orders'], 5)
+        self.assertEqual(totals[(None, self.day)]['gross'], Decimal('100.00'))
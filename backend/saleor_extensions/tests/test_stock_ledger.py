@@ -0,0 +1,237 @@
+import threading
+import unittest
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from graphql_relay import to_global_id
+
+from saleor_extensions.inventory.models import (
+    BranchInventory,
+    BranchInventorySummary,
+    StockMovement,
+    StockTransfer,
+)
+from saleor_extensions.inventory.services import (
+    InsufficientStockError,
+    InventorySummaryService,
+    StockLedger,
+    parse_variant_id,
+)
+from saleor_extensions.tests.factories import create_branch, create_variant
+
+
+def stock(branch, variant):
+    return BranchInventory.objects.get(branch=branch, product_variant=variant)
+
+
+class StockLedgerAdjustTests(TestCase):
+    def setUp(self):
+        self.branch = create_branch()
+        self.variant = create_variant()
+
+    def test_inbound_movement_creates_row(self):
+        inventory_item, movement = StockLedger.adjust(self.branch.id, self.variant.id, 'IN', 5)
+
+        self.assertEqual(inventory_item.quantity, 5)
+        self.assertEqual(movement.movement_type, 'IN')
+        self.assertEqual(movement.quantity, 5)
+
+    def test_oversell_is_rejected_without_side_effects(self):
+        StockLedger.adjust(self.branch.id, self.variant.id, 'IN', 3)
+
+        with self.assertRaises(InsufficientStockError) as raised:
+            StockLedger.adjust(self.branch.id, self.variant.id, 'OUT', 4)
+
+        self.assertEqual(raised.exception.requested, 4)
+        self.assertEqual(raised.exception.available, 3)
+        self.assertEqual(stock(self.branch, self.variant).quantity, 3)
+        self.assertFalse(StockMovement.objects.filter(movement_type='OUT').exists())
+
+    def test_oversell_of_missing_row_reports_zero_available(self):
+        with self.assertRaises(InsufficientStockError) as raised:
+            StockLedger.adjust(self.branch.id, self.variant.id, 'OUT', 1)
+
+        self.assertEqual(raised.exception.available, 0)
+        self.assertFalse(BranchInventory.objects.exists())
+
+    def test_negative_adjustment_cannot_go_below_zero(self):
+        StockLedger.adjust(self.branch.id, self.variant.id, 'IN', 2)
+
+        with self.assertRaises(InsufficientStockError):
+            StockLedger.adjust(self.branch.id, self.variant.id, 'ADJUSTMENT', -3)
+        StockLedger.adjust(self.branch.id, self.variant.id, 'ADJUSTMENT', -2)
+
+        self.assertEqual(stock(self.branch, self.variant).quantity, 0)
+
+    def test_invalid_quantity_and_type_are_rejected(self):
+        with self.assertRaises(ValidationError):
+            StockLedger.adjust(self.branch.id, self.variant.id, 'OUT', 0)
+        with self.assertRaises(ValidationError):
+            StockLedger.adjust(self.branch.id, self.variant.id, 'LOST', 1)
+
+    def test_summary_follows_movements(self):
+        InventorySummaryService.reconcile([self.branch.id])
+        StockLedger.adjust(self.branch.id, self.variant.id, 'IN', 20)
+        StockLedger.adjust(self.branch.id, self.variant.id, 'OUT', 15)
+
+        summary = BranchInventorySummary.objects.get(branch=self.branch)
+        self.assertEqual(summary.total_items, 1)
+        self.assertEqual(summary.total_units, 5)
+        self.assertEqual(summary.low_stock_items, 1)
+        self.assertEqual(InventorySummaryService.reconcile([self.branch.id]), 0)
+
+    def test_totals_do_not_write_missing_summaries(self):
+        StockLedger.adjust(self.branch.id, self.variant.id, 'IN', 4)
+        BranchInventorySummary.objects.all().delete()
+        other = create_branch()
+        InventorySummaryService.reconcile([other.id])
+
+        totals = InventorySummaryService.totals()
+
+        self.assertEqual(totals['total_items'], 1)
+        self.assertEqual(totals['total_units'], 4)
+        self.assertEqual(totals['low_stock_items'], 1)
+        self.assertFalse(BranchInventorySummary.objects.filter(branch=self.branch).exists())
+
+
+class StockLedgerAdjustManyTests(TestCase):
+    def setUp(self):
+        self.branch = create_branch()
+        self.in_stock = create_variant()
+        self.other = create_variant()
+        StockLedger.adjust(self.branch.id, self.in_stock.id, 'IN', 5)
+
+    def test_rejects_lines_individually(self):
+        applied, rejected = StockLedger.adjust_many(self.branch.id, [
+            {'product_variant_id': self.in_stock.id, 'movement_type': 'OUT', 'quantity': 2},
+            {'product_variant_id': self.other.id, 'movement_type': 'OUT', 'quantity': 1},
+            {'product_variant_id': self.other.id, 'movement_type': 'IN', 'quantity': 0},
+            {'product_variant_id': self.other.id, 'movement_type': 'LOST', 'quantity': 1},
+            {'product_variant_id': 'not-an-id', 'movement_type': 'IN', 'quantity': 1},
+            {'product_variant_id': str(self.other.id), 'movement_type': 'IN', 'quantity': 4},
+        ])
+
+        self.assertEqual([index for index, _, _ in applied], [0, 5])
+        self.assertEqual([rejection['index'] for rejection in rejected], [1, 2, 3, 4])
+        self.assertEqual(rejected[0]['requested'], 1)
+        self.assertEqual(rejected[0]['available'], 0)
+        self.assertIn('Invalid product variant ID', rejected[3]['reason'])
+        self.assertEqual(stock(self.branch, self.in_stock).quantity, 3)
+        self.assertEqual(stock(self.branch, self.other).quantity, 4)
+        self.assertEqual(StockMovement.objects.filter(branch=self.branch).count(), 3)
+
+    def test_lines_for_the_same_variant_apply_in_order(self):
+        applied, rejected = StockLedger.adjust_many(self.branch.id, [
+            {'product_variant_id': self.in_stock.id, 'movement_type': 'OUT', 'quantity': 3},
+            {'product_variant_id': self.in_stock.id, 'movement_type': 'OUT', 'quantity': 3},
+            {'product_variant_id': self.in_stock.id, 'movement_type': 'IN', 'quantity': 1},
+        ])
+
+        self.assertEqual([index for index, _, _ in applied], [0, 2])
+        self.assertEqual(rejected[0]['index'], 1)
+        self.assertEqual(rejected[0]['available'], 2)
+        self.assertEqual(stock(self.branch, self.in_stock).quantity, 3)
+
+    def test_accepts_global_ids(self):
+        global_id = to_global_id('ProductVariant', self.other.id)
+
+        applied, rejected = StockLedger.adjust_many(self.branch.id, [
+            {'product_variant_id': global_id, 'movement_type': 'IN', 'quantity': 2},
+            {'product_variant_id': to_global_id('Product', self.other.id), 'movement_type': 'IN', 'quantity': 2},
+        ])
+
+        self.assertEqual(len(applied), 1)
+        self.assertEqual(rejected[0]['index'], 1)
+        self.assertEqual(stock(self.branch, self.other).quantity, 2)
+
+
+class StockTransferTests(TestCase):
+    def setUp(self):
+        self.source = create_branch()
+        self.target = create_branch()
+        self.variant = create_variant()
+        StockLedger.adjust(self.source.id, self.variant.id, 'IN', 5)
+
+    def transfer(self, quantity, product_id=None):
+        return StockTransfer.objects.create(
+            transfer_number=f'TRF-{StockTransfer.objects.count() + 1}',
+            from_branch=self.source,
+            to_branch=self.target,
+            product_id=str(self.variant.id) if product_id is None else product_id,
+            quantity=quantity,
+        )
+
+    def test_approval_moves_stock(self):
+        transfer = StockLedger.process_transfer(self.transfer(3).id)
+
+        self.assertEqual(transfer.status, 'COMPLETED')
+        self.assertEqual(stock(self.source, self.variant).quantity, 2)
+        self.assertEqual(stock(self.target, self.variant).quantity, 3)
+
+    def test_reserved_stock_is_not_transferred(self):
+        BranchInventory.objects.filter(branch=self.source).update(reserved_quantity=3)
+
+        with self.assertRaises(InsufficientStockError):
+            StockLedger.process_transfer(self.transfer(3).id)
+        self.assertEqual(stock(self.source, self.variant).quantity, 5)
+
+    def test_transfer_cannot_be_processed_twice(self):
+        transfer = self.transfer(1)
+        StockLedger.process_transfer(transfer.id)
+
+        with self.assertRaises(ValidationError):
+            StockLedger.process_transfer(transfer.id)
+        self.assertEqual(stock(self.source, self.variant).quantity, 4)
+
+    def test_invalid_product_id_is_a_validation_error(self):
+        transfer = self.transfer(1, product_id='ring-42')
+
+        with self.assertRaises(ValidationError):
+            StockLedger.process_transfer(transfer.id)
+        transfer.refresh_from_db()
+        self.assertEqual(transfer.status, 'PENDING')
+
+
+class ParseVariantIdTests(TestCase):
+    def test_parse_variant_id(self):
+        self.assertEqual(parse_variant_id(12), 12)
+        self.assertEqual(parse_variant_id(' 12 '), 12)
+        self.assertEqual(parse_variant_id(to_global_id('ProductVariant', 12)), 12)
+        self.assertIsNone(parse_variant_id(to_global_id('Product', 12)))
+        self.assertIsNone(parse_variant_id(to_global_id('ProductVariant', 'abc')))
+        self.assertIsNone(parse_variant_id('abc'))
+        self.assertIsNone(parse_variant_id(None))
+        self.assertIsNone(parse_variant_id('-1'))
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'needs row-level locking')
+class ConcurrentDecrementTests(TransactionTestCase):
+    def test_concurrent_decrements_never_oversell(self):
+        branch = create_branch()
+        variant = create_variant()
+        StockLedger.adjust(branch.id, variant.id, 'IN', 5)
+        start = threading.Barrier(10)
+        outcomes = []
+
+        def sell():
+            try:
+                start.wait()
+                StockLedger.adjust(branch.id, variant.id, 'OUT', 1)
+                outcomes.append('sold')
+            except InsufficientStockError:
+                outcomes.append('rejected')
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=sell) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(outcomes.count('sold'), 5)
+        self.assertEqual(outcomes.count('rejected'), 5)
+        self.assertEqual(stock(branch, variant).quantity, 0)
+        self.assertEqual(StockMovement.objects.filter(movement_type='OUT').count(), 5)
+        self.assertEqual(InventorySummaryService.reconcile([branch.id]), 0)
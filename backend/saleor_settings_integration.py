@@ -96,6 +96,18 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'saleor_extensions.tasks.process_low_stock_alerts',
         'schedule': crontab(hour=9, minute=0),
     },
+    
+    # Inventory summary reconciliation (hourly)
+    'reconcile-inventory-summaries': {
+        'task': 'saleor_extensions.tasks.reconcile_inventory_summaries',
+        'schedule': crontab(minute=30),
+    },
+    
+    # Daily sales fact rebuild for recent days (daily at 2:15 AM)
+    'rebuild-recent-sales-facts': {
+        'task': 'saleor_extensions.tasks.rebuild_recent_sales_facts',
+        'schedule': crontab(hour=2, minute=15),
+    },
 }
 
 # ============================================================================
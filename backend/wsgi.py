@@ -6,51 +6,13 @@ This file creates the WSGI application using our custom settings that extend Sal
 
 import os
 import sys
-import json
-import time
-import subprocess
 
 # CRITICAL: Set LD_LIBRARY_PATH for libmagic BEFORE any imports
 # This must happen before Django or Saleor imports, as Saleor imports magic during module load
-libmagic_found = False
-if 'LD_LIBRARY_PATH' not in os.environ or 'libmagic' not in os.environ.get('LD_LIBRARY_PATH', ''):
-    # Find libmagic.so in Nix store
-    try:
-        result = subprocess.run(
-            ['find', '/nix/store', '-name', 'libmagic.so*', '-type', 'f'],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        if result.returncode == 0 and result.stdout.strip():
-            # Get the directory containing libmagic.so
-            libmagic_path = result.stdout.strip().split('\n')[0]
-            libmagic_dir = os.path.dirname(libmagic_path)
-            # Add to LD_LIBRARY_PATH
-            current_ld_path = os.environ.get('LD_LIBRARY_PATH', '')
-            if libmagic_dir not in current_ld_path:
-                os.environ['LD_LIBRARY_PATH'] = f"{libmagic_dir}:{current_ld_path}" if current_ld_path else libmagic_dir
-                libmagic_found = True
-    except (subprocess.TimeoutExpired, FileNotFoundError, Exception):
-        # If find command fails, try using glob to find libmagic
-        try:
-            import glob
-            # Try to find libmagic in common Nix store locations
-            patterns = [
-                '/nix/store/*/lib/libmagic.so*',
-                '/nix/store/*-file-*/lib/libmagic.so*',
-            ]
-            for pattern in patterns:
-                matches = glob.glob(pattern)
-                if matches:
-                    libmagic_dir = os.path.dirname(matches[0])
-                    current_ld_path = os.environ.get('LD_LIBRARY_PATH', '')
-                    if libmagic_dir not in current_ld_path:
-                        os.environ['LD_LIBRARY_PATH'] = f"{libmagic_dir}:{current_ld_path}" if current_ld_path else libmagic_dir
-                        libmagic_found = True
-                        break
-        except Exception:
-            pass
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from boot import ensure_library_path  # noqa: E402
+
+ensure_library_path()
 
 # Monkey-patch magic import to handle missing libmagic gracefully
 # This must happen before Saleor imports magic (which happens during URL loading)
@@ -84,24 +46,10 @@ except (ImportError, OSError, Exception):
 
 # #region agent log
 def _log_msg(loc, msg, data, hyp):
-    try:
-        log_path = os.path.join(os.path.dirname(__file__), '.cursor', 'debug.log')
-        log_dir = os.path.dirname(log_path)
-        if not os.path.exists(log_dir):
-            log_path = '/tmp/debug.log'
-        entry = {
-            "timestamp": int(time.time() * 1000),
-            "location": loc,
-            "message": msg,
-            "data": data,
-            "sessionId": "debug-session",
-            "runId": "initial",
-            "hypothesisId": hyp
-        }
-        with open(log_path, 'a') as f:
-            f.write(json.dumps(entry) + '\n')
-    except:
-        pass
+    # Imported lazily: the backend directory is only added to sys.path below
+    from saleor_extensions.debug_log import get_logger
+
+    get_logger("wsgi").log(loc, msg, data, hyp, "initial")
 # #endregion
 
 # Add the backend directory to Python path so our local saleor package is found
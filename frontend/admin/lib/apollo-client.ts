@@ -1,6 +1,7 @@
 import { ApolloClient, InMemoryCache, createHttpLink, from, type FetchPolicy, type WatchQueryFetchPolicy } from '@apollo/client';
 import { setContext } from '@apollo/client/link/context';
 import { onError } from '@apollo/client/link/error';
+import { createPersistedQueryLink } from '@apollo/client/link/persisted-queries';
 
 // #region agent log
 const _debugLog = (location: string, message: string, data: Record<string, any>, hypothesisId: string) => {
@@ -237,8 +238,23 @@ const defaultOptionsConfig: {
 };
 // #endregion
 
+// Automatic persisted queries: send the query's SHA-256 hash instead of the full
+// document; the backend asks for the text once (PersistedQueryNotFound) and caches it.
+// Requires Web Crypto, which is only available in secure contexts.
+const sha256 = async (query: string): Promise<string> => {
+  const digest = await crypto.subtle.digest('SHA-256', new TextEncoder().encode(query));
+  return Array.from(new Uint8Array(digest))
+    .map((byte) => byte.toString(16).padStart(2, '0'))
+    .join('');
+};
+
+const persistedQueriesLink =
+  typeof crypto !== 'undefined' && crypto.subtle && process.env.NEXT_PUBLIC_GRAPHQL_APQ !== 'false'
+    ? [createPersistedQueryLink({ sha256, useGETForHashedQueries: false })]
+    : [];
+
 export const apolloClient = new ApolloClient({
-  link: from([errorLink, authLink, httpLink]),
+  link: from([errorLink, authLink, ...persistedQueriesLink, httpLink]),
   cache: new InMemoryCache({
     typePolicies: {
       Query: {